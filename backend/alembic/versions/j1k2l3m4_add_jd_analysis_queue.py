@@ -0,0 +1,39 @@
+"""Add background JD analysis queue table and jobs.jd_analysis_status."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "j1k2l3m4"
+down_revision = "i0j1k2l3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("jd_analysis_status", sa.String(), nullable=True))
+    op.create_table(
+        "jd_analysis_queue",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_jd_analysis_queue_id"), "jd_analysis_queue", ["id"], unique=False)
+    op.create_index(op.f("ix_jd_analysis_queue_job_id"), "jd_analysis_queue", ["job_id"], unique=False)
+    op.create_index(op.f("ix_jd_analysis_queue_fingerprint"), "jd_analysis_queue", ["fingerprint"], unique=False)
+    op.create_index(op.f("ix_jd_analysis_queue_status"), "jd_analysis_queue", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_jd_analysis_queue_status"), table_name="jd_analysis_queue")
+    op.drop_index(op.f("ix_jd_analysis_queue_fingerprint"), table_name="jd_analysis_queue")
+    op.drop_index(op.f("ix_jd_analysis_queue_job_id"), table_name="jd_analysis_queue")
+    op.drop_index(op.f("ix_jd_analysis_queue_id"), table_name="jd_analysis_queue")
+    op.drop_table("jd_analysis_queue")
+    op.drop_column("jobs", "jd_analysis_status")
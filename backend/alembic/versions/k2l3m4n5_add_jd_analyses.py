@@ -0,0 +1,28 @@
+"""Add content-addressed jd_analyses table (one Model 1 analysis per distinct JD)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "k2l3m4n5"
+down_revision = "j1k2l3m4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jd_analyses",
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("model_version", sa.String(), nullable=False),
+        sa.Column("skills", sa.JSON(), nullable=False),
+        sa.Column("analyzed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("fingerprint"),
+    )
+    op.create_index(op.f("ix_jd_analyses_model_version"), "jd_analyses", ["model_version"], unique=False)
+    op.create_index(op.f("ix_jobs_jd_analysis_hash"), "jobs", ["jd_analysis_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_jobs_jd_analysis_hash"), table_name="jobs")
+    op.drop_index(op.f("ix_jd_analyses_model_version"), table_name="jd_analyses")
+    op.drop_table("jd_analyses")
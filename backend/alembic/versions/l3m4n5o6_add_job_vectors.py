@@ -0,0 +1,27 @@
+"""Add job_vectors table (persisted Doc2Vec vectors for the match-jobs fallback)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "l3m4n5o6"
+down_revision = "k2l3m4n5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_vectors",
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("model_version", sa.String(), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("fingerprint"),
+    )
+    op.create_index(op.f("ix_job_vectors_model_version"), "job_vectors", ["model_version"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_job_vectors_model_version"), table_name="job_vectors")
+    op.drop_table("job_vectors")
@@ -0,0 +1,27 @@
+"""Cache resume text, content hash and derived matching features on user_profiles."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "m4n5o6p7"
+down_revision = "l3m4n5o6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_profiles", sa.Column("resume_text", sa.Text(), nullable=True))
+    op.add_column("user_profiles", sa.Column("resume_hash", sa.String(), nullable=True))
+    op.add_column("user_profiles", sa.Column("resume_skills", sa.JSON(), nullable=True))
+    op.add_column("user_profiles", sa.Column("profile_features", sa.JSON(), nullable=True))
+    op.add_column("user_profiles", sa.Column("doc2vec_vector", sa.LargeBinary(), nullable=True))
+    op.create_index(op.f("ix_user_profiles_resume_hash"), "user_profiles", ["resume_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_profiles_resume_hash"), table_name="user_profiles")
+    op.drop_column("user_profiles", "doc2vec_vector")
+    op.drop_column("user_profiles", "profile_features")
+    op.drop_column("user_profiles", "resume_skills")
+    op.drop_column("user_profiles", "resume_hash")
+    op.drop_column("user_profiles", "resume_text")
@@ -0,0 +1,34 @@
+"""Add resume_uploads table (background resume parsing status)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "n5o6p7q8"
+down_revision = "m4n5o6p7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_uploads",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("resume_hash", sa.String(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_resume_uploads_user_id"), "resume_uploads", ["user_id"], unique=False)
+    op.create_index(op.f("ix_resume_uploads_status"), "resume_uploads", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_resume_uploads_status"), table_name="resume_uploads")
+    op.drop_index(op.f("ix_resume_uploads_user_id"), table_name="resume_uploads")
+    op.drop_table("resume_uploads")
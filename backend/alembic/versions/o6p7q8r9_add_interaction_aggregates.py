@@ -0,0 +1,42 @@
+"""Add interaction_aggregates table (incremental bandit state counters)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "o6p7q8r9"
+down_revision = "n5o6p7q8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "interaction_aggregates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("roadmap_key", sa.Integer(), nullable=False),
+        sa.Column("task_key", sa.String(), nullable=False),
+        sa.Column("interaction_count", sa.Integer(), nullable=False),
+        sa.Column("skip_count", sa.Integer(), nullable=False),
+        sa.Column("complete_count", sa.Integer(), nullable=False),
+        sa.Column("regenerate_count", sa.Integer(), nullable=False),
+        sa.Column("too_hard_count", sa.Integer(), nullable=False),
+        sa.Column("last_difficulty_signal", sa.Float(), nullable=True),
+        sa.Column("last_signal_index", sa.Integer(), nullable=True),
+        sa.Column("recent", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "roadmap_key", "task_key", name="uq_interaction_aggregate_scope"),
+    )
+    op.create_index(op.f("ix_interaction_aggregates_id"), "interaction_aggregates", ["id"], unique=False)
+    op.create_index(op.f("ix_interaction_aggregates_user_id"), "interaction_aggregates", ["user_id"], unique=False)
+    # Backfill (first touch per user) and the remaining per-user scans look up interactions by user.
+    op.create_index("ix_job_interactions_user_id", "job_interactions", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_interactions_user_id", table_name="job_interactions")
+    op.drop_index(op.f("ix_interaction_aggregates_user_id"), table_name="interaction_aggregates")
+    op.drop_index(op.f("ix_interaction_aggregates_id"), table_name="interaction_aggregates")
+    op.drop_table("interaction_aggregates")
@@ -0,0 +1,26 @@
+"""Add bandit_policies table (bandit theta shared by all workers)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "p7q8r9s0"
+down_revision = "o6p7q8r9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bandit_policies",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("rows", sa.Integer(), nullable=False),
+        sa.Column("cols", sa.Integer(), nullable=False),
+        sa.Column("theta", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bandit_policies")
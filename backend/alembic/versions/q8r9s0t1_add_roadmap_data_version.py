@@ -0,0 +1,20 @@
+"""Add roadmaps.data_version (invalidates the in-memory roadmap task index)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "q8r9s0t1"
+down_revision = "p7q8r9s0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "roadmaps",
+        sa.Column("data_version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("roadmaps", "data_version")
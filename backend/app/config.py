@@ -43,8 +43,30 @@ def gemini_model_names() -> list:
             names.append(name)
     return names
 
+# Model 1 MiniLM embedding cache: in-memory LRU byte budget + optional shared disk tier
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", str(BASE_DIR / "embedding_cache"))
+EMBEDDING_CACHE_READ_ONLY = os.getenv("EMBEDDING_CACHE_READ_ONLY", "").strip().lower() in ("1", "true", "yes", "on")
+
 # RL
 RL_MODEL_PATH = str(BASE_DIR / "rl_model.pkl")
+# Bandit weights: .npy checkpoint written behind the request path (every N updates or T seconds,
+# and on shutdown) plus numbered snapshots for rollback. RL_MODEL_PATH is only read to seed it.
+RL_THETA_PATH = os.getenv("RL_THETA_PATH", str(BASE_DIR / "rl_model.npy"))
+RL_SNAPSHOT_DIR = os.getenv("RL_SNAPSHOT_DIR", str(BASE_DIR / "rl_snapshots"))
+RL_CHECKPOINT_EVERY = int(os.getenv("RL_CHECKPOINT_EVERY", "50"))
+RL_CHECKPOINT_SECONDS = float(os.getenv("RL_CHECKPOINT_SECONDS", "30"))
+RL_SNAPSHOTS_KEEP = int(os.getenv("RL_SNAPSHOTS_KEEP", "20"))
+# Share theta between workers through the bandit_policies table (merged every RL_POLICY_SYNC_SECONDS)
+RL_SHARED_POLICY = os.getenv("RL_SHARED_POLICY", "1").strip().lower() in ("1", "true", "yes", "on")
+RL_POLICY_SYNC_SECONDS = float(os.getenv("RL_POLICY_SYNC_SECONDS", "2"))
+# /interactions/log enqueues rewards; a consumer applies them in micro-batches (0 = update inline)
+RL_REWARD_ASYNC = os.getenv("RL_REWARD_ASYNC", "1").strip().lower() in ("1", "true", "yes", "on")
+RL_REWARD_BATCH_SIZE = int(os.getenv("RL_REWARD_BATCH_SIZE", "64"))
+RL_REWARD_BATCH_WAIT_MS = float(os.getenv("RL_REWARD_BATCH_WAIT_MS", "50"))
+RL_REWARD_QUEUE_MAX = int(os.getenv("RL_REWARD_QUEUE_MAX", "10000"))
+# In-memory task index per roadmap version (app.services.roadmap.task_index), LRU size
+ROADMAP_TASK_INDEX_CACHE_SIZE = int(os.getenv("ROADMAP_TASK_INDEX_CACHE_SIZE", "2048"))
 
 # Adaptive roadmap QA: forced_action on /api/phase2/recommend only when enabled (never treat prod as debug by accident)
 ENVIRONMENT = os.getenv("ENVIRONMENT", "production").strip().lower()
@@ -59,3 +81,29 @@ ADAPTIVE_RL_DEBUG = _env_truthy("ADAPTIVE_RL_DEBUG")
 
 def adaptive_rl_debug_enabled() -> bool:
     return ENVIRONMENT in ("development", "dev", "test", "testing") or ADAPTIVE_RL_DEBUG
+
+# Load ML services (Model 1, RAG, bandit, career models) in a background thread at startup.
+# When off, each service loads on its first request.
+ML_WARMUP = _env_truthy("ML_WARMUP", "1")
+
+# Background Model 1 JD analysis queue (jd_analysis_queue table). 0 workers = analyze inline on enqueue.
+JD_ANALYSIS_WORKERS = int(os.getenv("JD_ANALYSIS_WORKERS", "1"))
+JD_ANALYSIS_BATCH_SIZE = int(os.getenv("JD_ANALYSIS_BATCH_SIZE", "16"))
+JD_ANALYSIS_MAX_ATTEMPTS = int(os.getenv("JD_ANALYSIS_MAX_ATTEMPTS", "3"))
+JD_ANALYSIS_POLL_SECONDS = float(os.getenv("JD_ANALYSIS_POLL_SECONDS", "5"))
+
+# Model 2 candidate generation (skill -> job inverted index)
+JOB_INDEX_SYNC_SECONDS = float(os.getenv("JOB_INDEX_SYNC_SECONDS", "30"))
+MATCH_CANDIDATE_LIMIT = int(os.getenv("MATCH_CANDIDATE_LIMIT", "2000"))
+
+# Resume upload: streamed to disk, parsed and skill-extracted in the background (resume_uploads table)
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", "2"))
+# PDFs with at least this many pages are split across RESUME_PDF_PROCESSES processes (0 = never)
+RESUME_PDF_PROCESSES = int(os.getenv("RESUME_PDF_PROCESSES", str(min(4, os.cpu_count() or 1))))
+RESUME_PDF_PARALLEL_MIN_PAGES = int(os.getenv("RESUME_PDF_PARALLEL_MIN_PAGES", "16"))
+
+# Career ML artifacts (job vectors, job metadata, Doc2Vec) converted once to mmap-friendly files
+# under ML_MMAP_DIR and opened read-only, so uvicorn workers share one page-cache copy.
+ML_MMAP_ARTIFACTS = _env_truthy("ML_MMAP_ARTIFACTS", "1")
+ML_MMAP_DIR = os.getenv("ML_MMAP_DIR", str(ML_MODELS_DIR / "mmap"))
@@ -8,7 +8,9 @@ from datetime import datetime, timedelta
 from app import models, schemas, auth
 from app.database import get_db
 from app.job_roadmap_service import generate_job_roadmap
-from app.services.job_skills_store import analyze_and_save_job_skills
+from app.services.jd_analysis_queue import enqueue_job_analysis
+from app.services.job_index import skill_job_index
+from app.services.ml.job_vectors import job_vector_store
 from app.services.roadmap.roadmap_store import upsert_job_roadmap
 from app.utils.job_serialize import job_to_response
 
@@ -60,9 +62,11 @@ def create_job_enhanced(
     db.commit()
     db.refresh(db_job)
     try:
-        analyze_and_save_job_skills(db, db_job)
+        enqueue_job_analysis(db, db_job)
     except Exception as e:
-        print(f"Warning: Model 1 JD analysis on create failed: {e}")
+        print(f"Warning: could not queue Model 1 JD analysis on create: {e}")
+    skill_job_index.update_job(db_job)
+    job_vector_store.schedule(db_job.id)
     return db_job
 
 
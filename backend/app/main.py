@@ -1,4 +1,9 @@
+from contextlib import asynccontextmanager
+import os
+
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -13,17 +18,53 @@ from app.job_routes import router as job_router
 from app.phase2_routes import router as phase2_router
 from app.match_routes import router as match_router
 from app.job_roadmap_service import generate_job_roadmap
-from app.services.job_skills_store import analyze_and_save_job_skills, get_or_analyze_job_skills
-from app.services.model2_service import model2_service
+from app.services.jd_analysis_queue import enqueue_job_analysis, jd_analysis_worker, skills_for_ranking
+from app.services.job_skills_store import get_or_analyze_job_skills
+from app.services.job_index import candidate_jobs, skill_job_index
+from app.services.ml.job_vectors import job_vector_store
+from app.services.model2_ranking import model2_ranker
+from app.services.ml.career_ml import career_models
+from app.services.profile_features import (
+    career_recommendations,
+    get_profile_features,
+    profile_doc2vec_vector,
+    refresh_profile_features,
+)
+from app.services.resume_uploads import UploadTooLarge, resume_upload_worker, save_upload_stream
+from app.config import ML_WARMUP
+from app.services.registry import readiness, start_background_warm_up
+from app.services.rl import rl_service
+from app.services.rl.reward_queue import reward_queue
 from app.services.roadmap.roadmap_store import get_roadmap_for_job, upsert_job_roadmap
-from app.utils.db_migrate import ensure_job_analysis_columns
+from app.services.roadmap.task_index import mark_roadmap_changed, task_index_cache
+from app.utils.db_migrate import (
+    ensure_job_analysis_columns,
+    ensure_profile_feature_columns,
+    ensure_roadmap_version_column,
+)
 from app.utils.job_serialize import job_to_response
-from app.utils.user_profile_builder import build_doc2vec_profile_text, build_model2_user_profile
 
 models.Base.metadata.create_all(bind=engine)
 ensure_job_analysis_columns()
+ensure_profile_feature_columns()
+ensure_roadmap_version_column()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if ML_WARMUP:
+        start_background_warm_up()
+    jd_analysis_worker.start()
+    resume_upload_worker.start()
+    yield
+    resume_upload_worker.stop()
+    jd_analysis_worker.stop()
+    reward_queue.stop()
+    if rl_service.loaded:
+        rl_service.close()
 
-app = FastAPI(title="PathFinder AI API")
+
+app = FastAPI(title="PathFinder AI API", lifespan=lifespan)
 
 # Include enhanced job routes
 app.include_router(job_router)
@@ -111,6 +152,7 @@ def create_user_profile(profile: schemas.UserProfileCreate, current_user: models
         raise HTTPException(status_code=400, detail="Profile already exists. Use PUT to update.")
     
     db_profile = models.UserProfile(user_id=current_user.id, **profile.dict())
+    refresh_profile_features(db_profile)
     db.add(db_profile)
     db.commit()
     db.refresh(db_profile)
@@ -125,61 +167,46 @@ def update_user_profile(profile: schemas.UserProfileUpdate, current_user: models
     
     for key, value in profile.dict(exclude_unset=True).items():
         setattr(db_profile, key, value)
+    refresh_profile_features(db_profile)
     
     db.commit()
     db.refresh(db_profile)
     return db_profile
 
 
-@app.post("/api/user/upload-resume")
-async def upload_resume(file: UploadFile = File(...), current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
+@app.post("/api/user/upload-resume", status_code=202)
+async def upload_resume(file: UploadFile = File(...), current_user: models.User = Depends(auth.get_current_user)):
+    """
+    Save the resume (chunked, off the event loop) and queue parsing and skill
+    extraction; poll GET /api/user/upload-resume/{upload_id} for the result.
+    """
     if not file.filename.endswith(('.pdf', '.doc', '.docx')):
         raise HTTPException(status_code=400, detail="Only PDF and DOC files allowed")
     
-    file_path = f"uploads/{current_user.id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    
-    resume_text = gemini_service.extract_text_from_file(file_path)
-    
-    if not resume_text or len(resume_text.strip()) < 10:
-        raise HTTPException(
-            status_code=400, 
-            detail="Could not extract text from resume. Please ensure the file is a valid PDF or DOC file."
-        )
-    
-    skills_data = gemini_service.extract_skills(resume_text)
-    
-    profile = db.query(models.UserProfile).filter(models.UserProfile.user_id == current_user.id).first()
-    if profile:
-        profile.resume_path = file_path
-        # Combine technical and soft skills, filter out any error messages
-        all_skills = []
-        if skills_data.get('technical_skills'):
-            all_skills.extend(skills_data['technical_skills'])
-        if skills_data.get('soft_skills'):
-            all_skills.extend(skills_data['soft_skills'])
-        profile.extracted_skills = all_skills
-        db.commit()
+    file_path = f"uploads/{current_user.id}_{os.path.basename(file.filename)}"
+    try:
+        resume_hash = await run_in_threadpool(save_upload_stream, file.file, file_path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        await file.close()
     
-    # Return response with error info if present
-    response = {
-        "message": "Resume Uploaded Successfully",
-        "extracted_skills": {
-            "technical_skills": skills_data.get('technical_skills', []),
-            "soft_skills": skills_data.get('soft_skills', [])
-        }
+    upload_id = await run_in_threadpool(resume_upload_worker.create, current_user.id, file_path, resume_hash)
+    return {
+        "message": "Resume uploaded. Extracting skills...",
+        "upload_id": upload_id,
+        "status": "queued",
+        "status_url": f"/api/user/upload-resume/{upload_id}",
     }
-    
-    if skills_data.get("warning"):
-        response["extraction_warning"] = skills_data["warning"]
-        response["message"] = "Resume uploaded. Skills extracted locally (Gemini quota unavailable)."
-    elif skills_data.get("error"):
-        response["extraction_error"] = skills_data["error"]
-        response["message"] = "Resume uploaded, but skill extraction had issues"
 
-    return response
+
+@app.get("/api/user/upload-resume/{upload_id}")
+def get_resume_upload_status(upload_id: str, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
+    """Status of a resume upload: queued, parsing, extracting, done (result = extracted skills) or failed."""
+    status = resume_upload_worker.status(db, upload_id, current_user.id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return status
 
 
 @app.post("/api/recruiter/jobs", response_model=schemas.JobResponse)
@@ -188,6 +215,8 @@ def create_job(job: schemas.JobCreate, current_recruiter: models.Recruiter = Dep
     db.add(db_job)
     db.commit()
     db.refresh(db_job)
+    skill_job_index.update_job(db_job)
+    job_vector_store.schedule(db_job.id)
     return db_job
 
 
@@ -229,9 +258,11 @@ def update_job(job_id: int, job: schemas.JobUpdateEnhanced, current_recruiter: m
     db.refresh(db_job)
     if "jd_text" in update_data or "job_title" in update_data:
         try:
-            analyze_and_save_job_skills(db, db_job, force=True)
+            enqueue_job_analysis(db, db_job)
         except Exception as e:
-            print(f"Warning: Model 1 JD re-analysis on update failed: {e}")
+            print(f"Warning: could not queue Model 1 JD re-analysis on update: {e}")
+    skill_job_index.update_job(db_job)
+    job_vector_store.schedule(db_job.id)
     return db_job
 
 
@@ -243,6 +274,8 @@ def close_job(job_id: int, current_recruiter: models.Recruiter = Depends(auth.ge
     
     db_job.status = "closed"
     db.commit()
+    skill_job_index.remove(job_id)
+    model2_ranker.forget(job_id)
     return {"message": "Job closed successfully"}
 
 
@@ -300,9 +333,11 @@ def create_job_enhanced(
     db.commit()
     db.refresh(db_job)
     try:
-        analyze_and_save_job_skills(db, db_job)
+        enqueue_job_analysis(db, db_job)
     except Exception as e:
-        print(f"Warning: Model 1 JD analysis on create failed: {e}")
+        print(f"Warning: could not queue Model 1 JD analysis on create: {e}")
+    skill_job_index.update_job(db_job)
+    job_vector_store.schedule(db_job.id)
     return db_job
 
 
@@ -505,7 +540,8 @@ def recommend_careers(current_user: models.User = Depends(auth.get_current_user)
     if not all_skills:
         raise HTTPException(status_code=400, detail="No skills found in profile. Please add skills or upload a resume first.")
     
-    recommendations = ml_service.recommend_careers_knn(all_skills)
+    # Precomputed by the nightly batch (POST /ml/career-recommendations/precompute) while the profile is unchanged.
+    recommendations = career_recommendations(db, profile)
     
     if not recommendations:
         raise HTTPException(status_code=503, detail="Career recommendation service is unavailable. ML models may not be loaded properly.")
@@ -513,31 +549,20 @@ def recommend_careers(current_user: models.User = Depends(auth.get_current_user)
     return {"careers": recommendations}
 
 
-def _rank_jobs_model2(db: Session, profile: models.UserProfile, jobs: list, top_k: int = 20) -> list[dict]:
-    user_m2 = build_model2_user_profile(profile)
+def _rank_jobs_model2(db: Session, profile: models.UserProfile, top_k: int = 20) -> list[dict]:
+    user_m2 = get_profile_features(db, profile)["model2"]
     if not user_m2.get("skills"):
         return []
 
+    # Candidates from the skill -> job index (whole table), not a fixed newest-N scan.
+    jobs = candidate_jobs(db, user_m2["skills"], min_jobs=top_k)
+    # Stored Model 1 rows only; jobs still queued fall back to recruiter skills.
+    analyzed_by_job = skills_for_ranking(db, jobs)
+
     ranked: list[dict] = []
-    for job in jobs:
+    for job, pred in model2_ranker.rank(user_m2, jobs, analyzed_by_job, top_k):
         title = job.job_title or job.title or "Untitled Job"
         jd_text = job.jd_text or job.description or ""
-        try:
-            analyzed = analyze_and_save_job_skills(db, job)
-        except Exception as e:
-            print(f"Warning: JD analysis for job {job.id}: {e}")
-            analyzed = None
-
-        pred = model2_service.match_user_job(
-            user_m2,
-            {
-                "title": title,
-                "jd_text": jd_text,
-                "required_experience": job.min_experience_years or 0,
-                "job_id": job.id,
-            },
-            analyzed_skills=analyzed,
-        )
         jd_preview = (jd_text[:200] + "...") if len(jd_text) > 200 else jd_text
         ranked.append(
             {
@@ -564,9 +589,7 @@ def _rank_jobs_model2(db: Session, profile: models.UserProfile, jobs: list, top_
                 "experience_score": pred.get("experience_score"),
             }
         )
-
-    ranked.sort(key=lambda r: r["match_score"], reverse=True)
-    return ranked[:top_k]
+    return ranked
 
 
 @app.post("/api/ai/match-jobs")
@@ -588,7 +611,7 @@ def match_jobs(current_user: models.User = Depends(auth.get_current_user), db: S
         return {"jobs": [], "message": "No jobs available in the database"}
 
     try:
-        ranked = _rank_jobs_model2(db, profile, jobs_from_db, top_k=20)
+        ranked = _rank_jobs_model2(db, profile, top_k=20)
         if ranked:
             return {
                 "jobs": ranked,
@@ -599,14 +622,18 @@ def match_jobs(current_user: models.User = Depends(auth.get_current_user), db: S
     except Exception as e:
         print(f"Model 2 matching failed, trying Doc2Vec fallback: {e}")
 
-    combined_text = build_doc2vec_profile_text(profile, gemini_service)
+    # Profile text and vector are cached on the profile (resume parsed once, at upload).
+    features = get_profile_features(db, profile, career_models.get().DOC2VEC_MODEL)
+    combined_text = features["doc2vec_text"]
     if not combined_text or len(combined_text.strip()) < 10:
         raise HTTPException(
             status_code=400,
             detail="Insufficient profile information. Please add skills, upload a resume, or complete your profile.",
         )
 
-    matched_jobs = ml_service.match_jobs_from_database(combined_text, jobs_from_db, top_k=20)
+    matched_jobs = ml_service.match_jobs_from_database(
+        combined_text, jobs_from_db, top_k=20, db=db, resume_vector=profile_doc2vec_vector(profile)
+    )
     if not matched_jobs:
         return {
             "jobs": [],
@@ -714,8 +741,8 @@ def skill_gap_analysis(current_user: models.User = Depends(auth.get_current_user
         raise HTTPException(status_code=404, detail="Profile not found")
     
     user_skills = (profile.skills or []) + (profile.extracted_skills or [])
-    career_recommendations = ml_service.recommend_careers_knn(user_skills, top_k=1)
-    required_skills = career_recommendations[0]['required_skills'] if career_recommendations else []
+    top_careers = career_recommendations(db, profile, top_k=1)
+    required_skills = top_careers[0]['required_skills'] if top_careers else []
     
     gap_analysis = gemini_service.analyze_skill_gap(user_skills, required_skills)
     
@@ -765,24 +792,14 @@ def regenerate_roadmap_task(
     if not roadmap_data or "roadmap" not in roadmap_data:
         raise HTTPException(status_code=400, detail="Invalid roadmap data structure")
         
-    # 2. Find the Task to Regenerate
-    target_phase = None
-    target_task_index = -1
-    found_task = None
-    
-    for phase in roadmap_data["roadmap"]["phases"]:
-        for idx, task in enumerate(phase["tasks"]):
-            # Check by ID if available, otherwise fallback to title matching (legacy)
-            if task.get("task_id") == task_id or task.get("title") == task_id:
-                target_phase = phase
-                target_task_index = idx
-                found_task = task
-                break
-        if found_task:
-            break
-            
-    if not found_task:
+    # 2. Find the Task to Regenerate (by ID, or title for legacy tasks) via the cached task index
+    index = task_index_cache.for_roadmap(roadmap)
+    entry = index.find(task_id) if index is not None else None
+    if entry is None:
         raise HTTPException(status_code=404, detail="Task not found in roadmap")
+    target_phase = roadmap_data["roadmap"]["phases"][entry.phase_index]
+    target_task_index = entry.task_index
+    found_task = target_phase["tasks"][target_task_index]
         
     # 3. Call AI to Regenerate
     from app.job_roadmap_service import regenerate_task
@@ -796,10 +813,9 @@ def regenerate_roadmap_task(
     # Replace the old task with the new one
     target_phase["tasks"][target_task_index] = new_task
     
-    # Check if we need to update the flag to force SQLAlchemy to detect change in JSON
-    from sqlalchemy.orm.attributes import flag_modified
+    # Flag the JSON change for SQLAlchemy and bump the roadmap's data_version
     roadmap.roadmap_data = roadmap_data
-    flag_modified(roadmap, "roadmap_data")
+    mark_roadmap_changed(roadmap)
     
     db.commit()
     db.refresh(roadmap)
@@ -927,5 +943,12 @@ def root():
     return {"message": "PathFinder AI API", "status": "running"}
 
 
+@app.get("/health/ready")
+def health_ready():
+    """503 until every registered ML service has loaded (see app.services.registry)."""
+    status = readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8001, reload=True)
\ No newline at end of file
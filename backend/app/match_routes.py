@@ -5,9 +5,17 @@ from sqlalchemy.orm import Session
 
 from app import schemas, models
 from app.database import get_db
+from app.services.jd_analysis_queue import jd_analysis_worker, skills_for_ranking
+from app.services.job_index import candidate_jobs, skill_job_index
+from app.services.ml.job_vectors import job_vector_store
 from app.services.job_skills_store import analyze_and_save_job_skills, get_or_analyze_job_skills
 from app.services.model1_service import model1_service
+from app.services.model2_ranking import model2_ranker
 from app.services.model2_service import model2_service
+from app.services.profile_features import precompute_career_recommendations
+from app.services.rl import rl_service
+from app.services.rl.reward_queue import reward_queue
+from app.services.roadmap.task_index import task_index_cache
 
 
 router = APIRouter(tags=["ml-matching"])
@@ -93,34 +101,17 @@ def match_user_job(request: schemas.MatchUserJobRequest, db: Session = Depends(g
 def recommend_jobs(request: schemas.RecommendJobsRequest, db: Session = Depends(get_db)):
     """Rank jobs by weighted skill similarity + experience (no high/medium/low labels)."""
     try:
-        jobs = (
-            db.query(models.Job)
-            .filter(models.Job.status.in_(["active", "open"]))
-            .order_by(models.Job.created_at.desc())
-            .limit(500)
-            .all()
-        )
-        results = []
         user = request.user_profile.model_dump()
-        for job in jobs:
-            title = job.job_title or job.title or "Untitled Job"
-            jd_text = job.jd_text or job.description or ""
-            required_experience = job.min_experience_years or 0
-            analyzed = analyze_and_save_job_skills(db, job)
-            pred = model2_service.match_user_job(
-                user_profile=user,
-                job_description={
-                    "title": title,
-                    "jd_text": jd_text,
-                    "required_experience": required_experience,
-                    "job_id": job.id,
-                },
-                analyzed_skills=analyzed,
-            )
+        # Candidates from the skill -> job index (whole table), not a fixed newest-500 scan.
+        jobs = candidate_jobs(db, user.get("skills") or [], min_jobs=request.top_k)
+        # Stored Model 1 rows only; jobs still queued fall back to recruiter skills.
+        analyzed_by_job = skills_for_ranking(db, jobs)
+        results = []
+        for job, pred in model2_ranker.rank(user, jobs, analyzed_by_job, request.top_k):
             results.append(
                 {
                     "job_id": int(job.id),
-                    "job_title": title,
+                    "job_title": job.job_title or job.title or "Untitled Job",
                     "company_name": job.company_name,
                     "similarity_score": pred["similarity_score"],
                     "match_score": pred["match_score"],
@@ -130,9 +121,49 @@ def recommend_jobs(request: schemas.RecommendJobsRequest, db: Session = Depends(
                     "experience_score": pred.get("experience_score"),
                 }
             )
-
-        results.sort(key=lambda r: r["similarity_score"], reverse=True)
-        top_k = request.top_k
-        return {"results": results[:top_k]}
+        return {"results": results}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to recommend jobs: {exc}")
+
+
+@router.get("/ml/embedding-cache/stats")
+def embedding_cache_stats():
+    """Hit/miss/eviction counters of the Model 1 MiniLM embedding cache."""
+    return model1_service.sim.cache.stats()
+
+
+@router.get("/ml/jd-analysis-queue/stats")
+def jd_analysis_queue_stats(db: Session = Depends(get_db)):
+    """Background Model 1 queue: worker count and task counts by status."""
+    return jd_analysis_worker.stats(db)
+
+
+@router.get("/ml/job-index/stats")
+def job_index_stats():
+    """Size of the in-memory skill -> active job index used for Model 2 candidates."""
+    return skill_job_index.stats()
+
+
+@router.get("/ml/job-vectors/stats")
+def job_vector_stats():
+    """Persisted Doc2Vec job vectors used by the match-jobs fallback: cache and inference counters."""
+    return job_vector_store.stats()
+
+
+@router.get("/ml/bandit/stats")
+def bandit_stats():
+    """Bandit reward queue (depth, lag, batches), checkpoint, shared-policy sync and roadmap task index counters."""
+    out = {"reward_queue": reward_queue.stats(), "task_index": task_index_cache.stats(), "loaded": rl_service.loaded}
+    if rl_service.loaded:
+        out["checkpoint"] = rl_service.checkpointer.stats()
+        out["policy_sync"] = rl_service.policy_sync.stats() if rl_service.policy_sync is not None else None
+    return out
+
+
+@router.post("/ml/career-recommendations/precompute", response_model=schemas.CareerRecommendationBatchResponse)
+def precompute_careers(request: schemas.CareerRecommendationBatchRequest, db: Session = Depends(get_db)):
+    """Batch KNN career recommendations for every profile (or user_ids); run nightly to warm /api/ai/recommend-careers."""
+    try:
+        return precompute_career_recommendations(db, request.user_ids, request.top_k, request.batch_size)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to precompute career recommendations: {exc}")
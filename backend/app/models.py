@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, Text, DateTime, ForeignKey, Boolean, Date
+from sqlalchemy import Column, Integer, String, Float, JSON, Text, DateTime, ForeignKey, Boolean, Date, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db import Base
@@ -42,6 +42,12 @@ class UserProfile(Base):
     career_interests = Column(JSON)
     resume_path = Column(String)
     extracted_skills = Column(JSON)
+    # Cached at upload (app.services.profile_features): matching never re-parses the file
+    resume_text = Column(Text, nullable=True)
+    resume_hash = Column(String, nullable=True, index=True)  # sha256 of the uploaded bytes
+    resume_skills = Column(JSON, nullable=True)  # extract_skills result for resume_text
+    profile_features = Column(JSON, nullable=True)  # {signature, skills, model2, doc2vec_text, doc2vec_version}
+    doc2vec_vector = Column(LargeBinary, nullable=True)  # unit float32 Doc2Vec vector of doc2vec_text
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="profile")
@@ -103,9 +109,10 @@ class Job(Base):
     # Status & Metadata
     status = Column(String, default="active")  # active, closed, draft
     roadmap_json = Column(JSON, nullable=True)  # For AI-generated roadmap
-    jd_analyzed_skills = Column(JSON, nullable=True)  # Model 1: [{skill, importance_label, ...}]
-    jd_analysis_hash = Column(String, nullable=True)  # fingerprint of title+jd_text
+    jd_analyzed_skills = Column(JSON, nullable=True)  # legacy per-job Model 1 rows (now in jd_analyses)
+    jd_analysis_hash = Column(String, nullable=True, index=True)  # jd_analyses.fingerprint (Model 1 version + title + jd_text)
     jd_skills_analyzed_at = Column(DateTime, nullable=True)
+    jd_analysis_status = Column(String, nullable=True)  # pending, done, failed (background queue)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -118,6 +125,60 @@ class Job(Base):
     recruiter = relationship("Recruiter", back_populates="jobs")
 
 
+class JDAnalysis(Base):
+    """Model 1 skill rows for one distinct JD version, shared by every job with that fingerprint."""
+
+    __tablename__ = "jd_analyses"
+
+    fingerprint = Column(String, primary_key=True)  # jd_fingerprint: Model 1 version + title + jd_text
+    model_version = Column(String, nullable=False, index=True)
+    skills = Column(JSON, nullable=False)  # [{skill, importance_label, ...}]
+    analyzed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JDAnalysisTask(Base):
+    """Persistent queue row for background Model 1 JD analysis (survives restarts)."""
+
+    __tablename__ = "jd_analysis_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    fingerprint = Column(String, nullable=False, index=True)  # jd_fingerprint at enqueue time
+    status = Column(String, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ResumeUpload(Base):
+    """One resume upload: parsed and skill-extracted in the background, polled by upload id."""
+
+    __tablename__ = "resume_uploads"
+
+    id = Column(String, primary_key=True)  # uuid4 hex, returned to the client
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, default="queued", index=True)  # queued, parsing, extracting, done, failed
+    file_path = Column(String, nullable=False)
+    resume_hash = Column(String, nullable=True)  # sha256 of the uploaded bytes
+    result = Column(JSON, nullable=True)  # upload response body once done
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class JobVector(Base):
+    """Unit-normalized Doc2Vec vector of one job text, shared by every job with the same text."""
+
+    __tablename__ = "job_vectors"
+
+    fingerprint = Column(String, primary_key=True)  # vector_fingerprint: Doc2Vec version + job text
+    model_version = Column(String, nullable=False, index=True)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32 bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Roadmap(Base):
     __tablename__ = "roadmaps"
     
@@ -125,6 +186,8 @@ class Roadmap(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     target_career = Column(String, nullable=True)  # For career-based roadmaps
     roadmap_data = Column(JSON)
+    # Bumped on every roadmap_data write; keys the in-memory task index (services/roadmap/task_index.py)
+    data_version = Column(Integer, nullable=False, default=1, server_default="1")
     selected_variant = Column(Integer, nullable=True)
     feedback_rating = Column(Integer, nullable=True)
     # New fields for job-based roadmaps
@@ -169,6 +232,31 @@ class JobInteraction(Base):
     user = relationship("User")
 
 
+class InteractionAggregate(Base):
+    """
+    Running JobInteraction counters of one user scope, updated with every logged
+    interaction (app.services.rl.interaction_stats). roadmap_key 0 = all roadmaps,
+    task_key "" = all tasks.
+    """
+
+    __tablename__ = "interaction_aggregates"
+    __table_args__ = (UniqueConstraint("user_id", "roadmap_key", "task_key", name="uq_interaction_aggregate_scope"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    roadmap_key = Column(Integer, nullable=False, default=0)
+    task_key = Column(String, nullable=False, default="")
+    interaction_count = Column(Integer, nullable=False, default=0)
+    skip_count = Column(Integer, nullable=False, default=0)  # skip + skip_regenerate
+    complete_count = Column(Integer, nullable=False, default=0)
+    regenerate_count = Column(Integer, nullable=False, default=0)
+    too_hard_count = Column(Integer, nullable=False, default=0)
+    last_difficulty_signal = Column(Float, nullable=True)
+    last_signal_index = Column(Integer, nullable=True)  # interaction_count when that signal was logged
+    recent = Column(JSON, nullable=True)  # task_key "" rows: last 15 [task_key, skipped]
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class RewardLog(Base):
     __tablename__ = "reward_logs"
 
@@ -182,6 +270,22 @@ class RewardLog(Base):
     user = relationship("User")
 
 
+class BanditPolicy(Base):
+    """
+    Shared bandit weights (theta) of one policy. version increases with every
+    write; workers merge their local updates with compare-and-set on it.
+    """
+
+    __tablename__ = "bandit_policies"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    rows = Column(Integer, nullable=False)
+    cols = Column(Integer, nullable=False)
+    theta = Column(LargeBinary, nullable=False)  # float64 bytes, row-major
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class RoadmapBanditDecision(Base):
     """
     One row per /phase2/recommend call: selected bandit action + state at decision time.
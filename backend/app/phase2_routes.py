@@ -1,8 +1,9 @@
+from dataclasses import dataclass
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import and_, bindparam, select
+from sqlalchemy.orm import Session, aliased
 
 from app.config import adaptive_rl_debug_enabled
 from app.database import get_db
@@ -14,10 +15,13 @@ from app.services.rl.bandit import (
     get_valid_actions,
     normalize_action,
 )
+from app.services.rl.interaction_stats import record_interaction, task_key
+from app.services.rl.reward_queue import reward_queue
 from app.services.rl_service import rl_service
 from app.services.rag_service import rag_service
 from app.services.roadmap.roadmap_adaptation import apply_roadmap_action
 from app.services.roadmap.roadmap_rl_explainer import explain_action
+from app.services.roadmap.task_index import mark_roadmap_changed, task_index_cache
 
 _ALLOWED_FORCED_ACTIONS = frozenset(BANDIT_ACTIONS)
 
@@ -76,91 +80,30 @@ def _roadmap_context_for_task(
     tid = _norm_task_id(task_id)
     if roadmap_id is None or not tid:
         return None, None
-    rm = (
-        db.query(models.Roadmap)
-        .filter(models.Roadmap.id == roadmap_id, models.Roadmap.user_id == user_id)
-        .first()
-    )
-    if not rm or not rm.roadmap_data:
-        return None, rm.job_id if rm else None
-    data = rm.roadmap_data
-    inner = data.get("roadmap") if isinstance(data.get("roadmap"), dict) else data
-    phases = inner.get("phases") if isinstance(inner, dict) else None
-    if not phases:
-        return None, rm.job_id
-    n_phases = len(phases)
-    max_pi = float(max(n_phases - 1, 1))
-    for pi, phase in enumerate(phases):
-        tasks = phase.get("tasks") or []
-        n_tasks = len(tasks)
-        max_ti = float(max(n_tasks - 1, 1))
-        for ti, task in enumerate(tasks):
-            id_ok = tid == _norm_task_id(task.get("task_id"))
-            title_ok = tid == _norm_task_id(task.get("title"))
-            if id_ok or title_ok:
-                ctx = {
-                    "phase_index": float(pi),
-                    "max_phase_index": max_pi,
-                    "task_index": float(ti),
-                    "max_task_index": max_ti,
-                }
-                td = task.get("difficulty") or task.get("task_difficulty")
-                if td is not None:
-                    try:
-                        ctx["task_difficulty"] = float(td)
-                    except (TypeError, ValueError):
-                        pass
-                ja = task.get("jd_alignment") or []
-                if isinstance(ja, list):
-                    ctx["jd_importance_score"] = float(
-                        min(1.0, max(0.0, 0.15 + 0.17 * min(len(ja), 5)))
-                    )
-                sg = task.get("skills_gained") or []
-                if isinstance(sg, list):
-                    ctx["prerequisite_missing_score"] = float(
-                        min(1.0, max(0.0, 0.4 + 0.06 * min(len(sg), 8)))
-                    )
-                    ctx["user_skill_match_score"] = _user_skill_match_for_task_skills(
-                        db, user_id, sg
-                    )
-                else:
-                    ctx.setdefault("user_skill_match_score", 0.5)
-                return ctx, rm.job_id
-    return None, rm.job_id
-
-
-def _task_jd_importance(
-    db: Session,
-    user_id: int,
-    roadmap_id: Optional[int],
-    task_id: Optional[str],
-) -> float:
-    """Match heuristic used in roadmap_context jd_importance_score; safe default 0.5."""
-    tid = _norm_task_id(task_id)
-    if roadmap_id is None or not tid:
-        return 0.5
-    rm = (
-        db.query(models.Roadmap)
-        .filter(models.Roadmap.id == roadmap_id, models.Roadmap.user_id == user_id)
-        .first()
-    )
-    if not rm or not rm.roadmap_data:
-        return 0.5
-    data = rm.roadmap_data
-    inner = data.get("roadmap") if isinstance(data.get("roadmap"), dict) else data
-    phases = inner.get("phases") if isinstance(inner, dict) else None
-    if not phases:
-        return 0.5
-    for phase in phases:
-        for task in phase.get("tasks") or []:
-            id_ok = tid == _norm_task_id(task.get("task_id"))
-            title_ok = tid == _norm_task_id(task.get("title"))
-            if id_ok or title_ok:
-                ja = task.get("jd_alignment") or []
-                if isinstance(ja, list):
-                    return float(min(1.0, max(0.0, 0.15 + 0.17 * min(len(ja), 5))))
-                return 0.5
-    return 0.5
+    index, job_id = task_index_cache.load(db, user_id, roadmap_id)
+    entry = index.find(tid) if index is not None else None
+    if entry is None:
+        return None, job_id
+    ctx = {
+        "phase_index": float(entry.phase_index),
+        "max_phase_index": float(max(index.n_phases - 1, 1)),
+        "task_index": float(entry.task_index),
+        "max_task_index": float(max(entry.n_tasks - 1, 1)),
+    }
+    if entry.difficulty is not None:
+        ctx["task_difficulty"] = entry.difficulty
+    if entry.jd_importance is not None:
+        ctx["jd_importance_score"] = entry.jd_importance
+    if entry.skills is not None:
+        ctx["prerequisite_missing_score"] = float(
+            min(1.0, max(0.0, 0.4 + 0.06 * min(len(entry.skills), 8)))
+        )
+        ctx["user_skill_match_score"] = _user_skill_match_for_task_skills(
+            db, user_id, entry.skills
+        )
+    else:
+        ctx.setdefault("user_skill_match_score", 0.5)
+    return ctx, job_id
 
 
 def _prior_skip_regenerate_count(
@@ -240,12 +183,13 @@ def _compute_reward(
     user_id: int,
     request: schemas.InteractionLogRequest,
     logical: str,
-    pending: Optional[models.RoadmapBanditDecision],
+    ctx: "_LogContext",
 ) -> float:
     if logical == "neutral":
         return 0.0
 
-    jd_imp = _task_jd_importance(db, user_id, request.roadmap_id, request.task_id)
+    pending = ctx.pending
+    jd_imp = ctx.jd_importance
     tid = _norm_task_id(request.task_id)
     roadmap_id = request.roadmap_id
 
@@ -257,7 +201,9 @@ def _compute_reward(
         return 1.3 if jd_imp >= HIGH_JD_THRESHOLD else 1.0
 
     if logical == "too_hard":
-        prior_th = _prior_too_hard_count(db, user_id, roadmap_id, tid)
+        prior_th = ctx.prior_too_hard_count
+        if prior_th is None:
+            prior_th = _prior_too_hard_count(db, user_id, roadmap_id, tid)
         if prior_th >= 1:
             return -1.1
         if jd_imp >= HIGH_JD_THRESHOLD:
@@ -268,7 +214,9 @@ def _compute_reward(
         return -0.3
 
     if logical == "skip_regenerate":
-        prior = _prior_skip_regenerate_count(db, user_id, roadmap_id, tid)
+        prior = ctx.prior_skip_count
+        if prior is None:
+            prior = _prior_skip_regenerate_count(db, user_id, roadmap_id, tid)
         if jd_imp >= HIGH_JD_THRESHOLD:
             return -1.2
         if prior >= 1:
@@ -292,43 +240,17 @@ def _user_skill_from_state_vector(state_vector: object) -> float:
     return 0.5
 
 
-def _maybe_credit_open_skip_optional_decision(
-    db: Session,
-    user_id: int,
-    request: schemas.InteractionLogRequest,
-    interaction_id: int,
-) -> None:
+def _skip_optional_credit(
+    candidate: Optional[models.RoadmapBanditDecision],
+) -> Optional[tuple[str, float, Optional[list]]]:
     """Deferred positive credit for SKIP_OPTIONAL when learner later completes progress."""
-    if request.roadmap_id is None:
-        return
-    cand = (
-        db.query(models.RoadmapBanditDecision)
-        .filter(
-            models.RoadmapBanditDecision.user_id == user_id,
-            models.RoadmapBanditDecision.roadmap_id == request.roadmap_id,
-            models.RoadmapBanditDecision.selected_action == "SKIP_OPTIONAL_TASK",
-            models.RoadmapBanditDecision.reward_value.is_(None),
-        )
-        .order_by(models.RoadmapBanditDecision.created_at.desc())
-        .first()
-    )
-    if cand is None:
-        return
-    if _user_skill_from_state_vector(cand.state_vector) < 0.8:
-        return
+    if candidate is None:
+        return None
+    if _user_skill_from_state_vector(candidate.state_vector) < 0.8:
+        return None
     bonus = 0.75
-    cand.reward_value = bonus
-    db.add(cand)
-    db.commit()
-    rl_service.update_policy(
-        user_id,
-        "SKIP_OPTIONAL_TASK",
-        bonus,
-        db,
-        roadmap_context=None,
-        state_vector=cand.state_vector,
-        interaction_id=interaction_id,
-    )
+    candidate.reward_value = bonus
+    return "SKIP_OPTIONAL_TASK", bonus, candidate.state_vector
 
 
 def _state_vector_dict(vec: list) -> dict[str, float]:
@@ -412,6 +334,107 @@ def _load_decision_for_adapt(
     return None, None, DEFAULT_BANDIT_ACTION, None, None
 
 
+@dataclass
+class _LogContext:
+    """Everything /interactions/log reads before writing (see _load_log_context)."""
+
+    pending: Optional[models.RoadmapBanditDecision] = None
+    skip_optional_candidate: Optional[models.RoadmapBanditDecision] = None
+    jd_importance: float = 0.5
+    # Prior interactions on this roadmap task; None = no aggregates yet, count the history.
+    prior_skip_count: Optional[int] = 0
+    prior_too_hard_count: Optional[int] = 0
+
+
+def _build_log_context_query():
+    """
+    Latest pending decision for (user, roadmap, task), latest open SKIP_OPTIONAL
+    decision of the roadmap, the (roadmap, task) and user-wide aggregate rows and the
+    roadmap's version, as one row. Built once; a NULL task_key matches no pending
+    decision and no task aggregate.
+    """
+    D = models.RoadmapBanditDecision
+    A = models.InteractionAggregate
+    R = models.Roadmap
+    user_id, roadmap_id, tkey = bindparam("user_id"), bindparam("roadmap_id"), bindparam("task_key")
+
+    def latest_open_id(d, condition):
+        return (
+            select(d.id)
+            .where(d.user_id == user_id, d.roadmap_id == roadmap_id, d.reward_value.is_(None), condition)
+            .order_by(d.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    Pending, PendingSub = aliased(D), aliased(D)
+    Candidate, CandidateSub = aliased(D), aliased(D)
+    TaskAgg, UserAgg = aliased(A), aliased(A)
+    return (
+        select(
+            Pending,
+            Candidate,
+            TaskAgg.skip_count,
+            TaskAgg.too_hard_count,
+            UserAgg.id.label("user_aggregate_id"),
+            R.id.label("roadmap_id"),
+            R.data_version,
+            R.created_at,
+        )
+        .select_from(models.User)
+        .outerjoin(Pending, Pending.id == latest_open_id(PendingSub, PendingSub.task_id == tkey))
+        .outerjoin(
+            Candidate,
+            Candidate.id == latest_open_id(CandidateSub, CandidateSub.selected_action == "SKIP_OPTIONAL_TASK"),
+        )
+        .outerjoin(
+            TaskAgg,
+            and_(TaskAgg.user_id == user_id, TaskAgg.roadmap_key == roadmap_id, TaskAgg.task_key == tkey),
+        )
+        .outerjoin(UserAgg, and_(UserAgg.user_id == user_id, UserAgg.roadmap_key == 0, UserAgg.task_key == ""))
+        .outerjoin(R, and_(R.id == roadmap_id, R.user_id == user_id))
+        .where(models.User.id == user_id)
+    )
+
+
+_LOG_CONTEXT_QUERY = _build_log_context_query()
+
+
+def _load_log_context(
+    db: Session,
+    user_id: int,
+    roadmap_id: Optional[int],
+    task_id: Optional[str],
+) -> _LogContext:
+    """
+    One query (_LOG_CONTEXT_QUERY) for the pending decision, the SKIP_OPTIONAL
+    credit candidate, the prior skip / too_hard counts and the roadmap version.
+    JD importance then comes from the cached task index; roadmap_data is only
+    read when that version is not indexed yet.
+    """
+    if roadmap_id is None:
+        return _LogContext()
+    tid = _norm_task_id(task_id)
+    row = db.execute(
+        _LOG_CONTEXT_QUERY,
+        {"user_id": user_id, "roadmap_id": roadmap_id, "task_key": task_key(tid) if tid else None},
+    ).first()
+    if row is None:
+        return _LogContext()
+    ctx = _LogContext(pending=row[0], skip_optional_candidate=row[1])
+    if row.user_aggregate_id is None:
+        ctx.prior_skip_count = ctx.prior_too_hard_count = None
+    else:
+        ctx.prior_skip_count = row.skip_count or 0
+        ctx.prior_too_hard_count = row.too_hard_count or 0
+    if row.roadmap_id is not None and tid:
+        index = task_index_cache.for_version(db, roadmap_id, row.data_version, row.created_at)
+        entry = index.find(tid) if index is not None else None
+        if entry is not None and entry.jd_importance is not None:
+            ctx.jd_importance = entry.jd_importance
+    return ctx
+
+
 @router.post("/interactions/log")
 def log_interaction(
     request: schemas.InteractionLogRequest,
@@ -421,15 +444,20 @@ def log_interaction(
     """
     Log roadmap task feedback. Maps legacy rate_difficulty / skip to new vocabulary.
     Attributes reward to the latest pending RoadmapBanditDecision when present.
+    One unit of work: a single context read (_load_log_context), the interaction,
+    aggregate and decision writes, and one commit. The policy update itself is
+    queued (app.services.rl.reward_queue) once the rows are committed.
     """
-    pending = _find_pending_decision(db, current_user.id, request.roadmap_id, request.task_id)
+    user_id = current_user.id
+    ctx = _load_log_context(db, user_id, request.roadmap_id, request.task_id)
+    pending = ctx.pending
     pending_action = pending.selected_action if pending else None
     logical = _logical_action(request)
     store_action, store_rating = _storage_action_and_rating(request)
-    reward = _compute_reward(db, current_user.id, request, logical, pending)
+    reward = _compute_reward(db, user_id, request, logical, ctx)
 
     interaction = models.JobInteraction(
-        user_id=current_user.id,
+        user_id=user_id,
         job_id=request.job_id,
         roadmap_id=request.roadmap_id,
         task_id=request.task_id,
@@ -438,30 +466,37 @@ def log_interaction(
         duration_seconds=request.duration_seconds,
     )
     db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    db.flush()
+    record_interaction(db, interaction)
+    interaction_id = interaction.id
 
-    action_arm = DEFAULT_BANDIT_ACTION
-    state_vec: Optional[list] = None
+    # (arm, reward, decision-time state) to credit, in the order they were earned
+    credits: list[tuple[str, float, Optional[list]]] = []
     if reward != 0.0:
         if pending:
-            action_arm = pending.selected_action
-            state_vec = pending.state_vector
             pending.reward_value = reward
-            db.add(pending)
-            db.commit()
-        rl_service.update_policy(
-            current_user.id,
-            action_arm,
-            reward,
-            db,
-            roadmap_context=None,
-            state_vector=state_vec,
-            interaction_id=interaction.id,
-        )
-
+            credits.append((pending.selected_action, reward, pending.state_vector))
+        else:
+            credits.append((DEFAULT_BANDIT_ACTION, reward, None))
     if logical == "complete" and pending_action not in ("INCREASE_DIFFICULTY", "SKIP_OPTIONAL_TASK"):
-        _maybe_credit_open_skip_optional_decision(db, current_user.id, request, interaction.id)
+        credit = _skip_optional_credit(ctx.skip_optional_candidate)
+        if credit is not None:
+            credits.append(credit)
+
+    queued = reward_queue.enabled
+    if not queued:
+        for arm, value, state_vec in credits:
+            rl_service.update_policy(
+                user_id, arm, value, db, state_vector=state_vec, interaction_id=interaction_id, commit=False
+            )
+    db.commit()
+    if queued:
+        for arm, value, state_vec in credits:
+            if not reward_queue.submit(user_id, arm, value, state_vector=state_vec, interaction_id=interaction_id):
+                # Queue full: apply inline (RewardLog in its own commit).
+                rl_service.update_policy(
+                    user_id, arm, value, db, state_vector=state_vec, interaction_id=interaction_id
+                )
 
     return {"status": "success", "reward_calculated": reward}
 
@@ -621,13 +656,15 @@ def apply_roadmap_adaptation(
         state_vector=state_vector,
         user_context=None,
         feedback_type=ft,
+        task_index=task_index_cache.for_roadmap(roadmap),
     )
 
     if result.get("applied"):
         roadmap.roadmap_data = result["updated_roadmap"]
-        flag_modified(roadmap, "roadmap_data")
+        mark_roadmap_changed(roadmap)
         db.commit()
         db.refresh(roadmap)
+        task_index_cache.for_roadmap(roadmap)  # index the new version for the /interactions/log that follows
 
     internal_action = result.get("selected_action", action_internal)
     if ft == "complete":
@@ -220,6 +220,7 @@ class JobResponseEnhanced(BaseModel):
     application_deadline: Optional[date]
     status: str
     roadmap_json: Optional[dict] = None
+    jd_analysis_status: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
@@ -455,4 +456,15 @@ class RecommendedJob(BaseModel):
 
 
 class RecommendJobsResponse(BaseModel):
-    results: List[RecommendedJob]
\ No newline at end of file
+    results: List[RecommendedJob]
+
+class CareerRecommendationBatchRequest(BaseModel):
+    user_ids: Optional[List[int]] = None  # None = every profile
+    top_k: int = Field(default=5, ge=1, le=32)
+    batch_size: int = Field(default=1000, ge=1, le=10000)
+
+
+class CareerRecommendationBatchResponse(BaseModel):
+    profiles: int
+    with_skills: int
+    seconds: float
@@ -0,0 +1,308 @@
+"""
+Background Model 1 JD analysis.
+
+Job create/update enqueue a row in jd_analysis_queue and return immediately. An
+in-process worker pool claims pending rows, analyzes each distinct JD fingerprint
+once (one batched analyze_jds call per claim) and stores the rows on every queued
+job with that fingerprint. The queue lives in the database, so work left behind by
+a restart is picked up again: rows still 'running' at start are reset to 'pending'.
+
+Ranking endpoints never run Model 1 themselves: skills_for_ranking() returns stored
+rows, enqueues jobs that have none, and falls back to the recruiter-entered skills
+for jobs still pending.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    JD_ANALYSIS_BATCH_SIZE,
+    JD_ANALYSIS_MAX_ATTEMPTS,
+    JD_ANALYSIS_POLL_SECONDS,
+    JD_ANALYSIS_WORKERS,
+)
+from app.db import SessionLocal
+from app.services.job_skills_store import (
+    get_stored_job_skills,
+    jd_fingerprint,
+    job_title_and_jd,
+    load_analyses,
+    store_job_skills,
+)
+from app.services.model1_service import model1_service
+
+Task = models.JDAnalysisTask
+_OPEN = ("pending", "running")
+
+
+def _job_fingerprint(job: models.Job) -> str:
+    return jd_fingerprint(*job_title_and_jd(job))
+
+
+def enqueue_jobs_analysis(db: Session, jobs: list[models.Job], *, force: bool = False) -> dict[int, str]:
+    """
+    Queue Model 1 analysis for jobs whose stored rows are missing or stale.
+    A job already queued for the same fingerprint is not queued twice. Returns
+    {job_id: jd_analysis_status}.
+    """
+    statuses: dict[int, str] = {}
+    todo: dict[int, tuple[models.Job, str]] = {}
+    fps = {job.id: _job_fingerprint(job) for job in jobs}
+    known = {} if force else load_analyses(db, fps.values())
+    analyzed_at = datetime.utcnow()
+    linked = False
+    for job in jobs:
+        fp = fps[job.id]
+        if fp in known:
+            # Same JD already analyzed (this job or a duplicate posting): just link it.
+            if job.jd_analysis_hash != fp or job.jd_analysis_status != "done":
+                store_job_skills(db, job, known[fp], fp, analyzed_at)
+                linked = True
+            statuses[job.id] = "done"
+        else:
+            todo[job.id] = (job, fp)
+    if not todo:
+        if linked:
+            db.commit()
+        return statuses
+
+    open_tasks = (
+        db.query(Task)
+        .filter(Task.job_id.in_(list(todo)), Task.status.in_(_OPEN))
+        .all()
+    )
+    queued = {(t.job_id, t.fingerprint) for t in open_tasks}
+    for t in open_tasks:
+        # JD edited again before the worker got to it: the old version is moot.
+        if t.status == "pending" and t.fingerprint != todo[t.job_id][1]:
+            t.status = "superseded"
+    added = 0
+    for job_id, (job, fp) in todo.items():
+        if (job_id, fp) not in queued:
+            db.add(Task(job_id=job_id, fingerprint=fp, status="pending"))
+            added += 1
+        job.jd_analysis_status = "pending"
+        statuses[job_id] = "pending"
+    db.commit()
+    if added:
+        jd_analysis_worker.notify(db)
+        if jd_analysis_worker.workers == 0:
+            statuses.update({job_id: job.jd_analysis_status for job_id, (job, _) in todo.items()})
+    return statuses
+
+
+def enqueue_job_analysis(db: Session, job: models.Job, *, force: bool = False) -> str:
+    return enqueue_jobs_analysis(db, [job], force=force)[job.id]
+
+
+def _claim(db: Session, limit: int) -> list[models.JDAnalysisTask]:
+    candidates = (
+        db.query(Task.id)
+        .filter(Task.status == "pending")
+        .order_by(Task.id)
+        .limit(limit)
+        .all()
+    )
+    claimed: list[int] = []
+    for (task_id,) in candidates:
+        # Conditional update: only one worker (thread or process) wins each row.
+        n = (
+            db.query(Task)
+            .filter(Task.id == task_id, Task.status == "pending")
+            .update(
+                {
+                    Task.status: "running",
+                    Task.attempts: Task.attempts + 1,
+                    Task.updated_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        if n:
+            claimed.append(task_id)
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(Task).filter(Task.id.in_(claimed)).all()
+
+
+def process_pending(db: Session, limit: int = JD_ANALYSIS_BATCH_SIZE) -> int:
+    """Claim up to limit pending tasks and analyze them. Returns the number claimed."""
+    tasks = _claim(db, limit)
+    if not tasks:
+        return 0
+    jobs = {
+        j.id: j
+        for j in db.query(models.Job).filter(models.Job.id.in_({t.job_id for t in tasks})).all()
+    }
+    by_fp: dict[str, list[models.JDAnalysisTask]] = {}
+    for t in tasks:
+        job = jobs.get(t.job_id)
+        if job is None or _job_fingerprint(job) != t.fingerprint:
+            t.status = "superseded"
+            continue
+        by_fp.setdefault(t.fingerprint, []).append(t)
+
+    # Reuse rows already stored for the same JD (analyzed since this task was queued).
+    results = load_analyses(db, by_fp)
+
+    todo = [fp for fp in by_fp if fp not in results]
+    error: str | None = None
+    if todo:
+        pairs = [job_title_and_jd(jobs[by_fp[fp][0].job_id]) for fp in todo]
+        try:
+            for fp, rows in zip(todo, model1_service.analyze_jds(pairs)):
+                results[fp] = rows
+        except Exception as e:
+            error = str(e)
+            print(f"Warning: background JD analysis failed for {len(todo)} JDs: {e}")
+
+    claimed = [t.id for t in tasks]
+    try:
+        analyzed_at = datetime.utcnow()
+        for fp, fp_tasks in by_fp.items():
+            rows = results.get(fp)
+            for t in fp_tasks:
+                job = jobs[t.job_id]
+                if rows is not None:
+                    store_job_skills(db, job, rows, fp, analyzed_at)
+                    t.status, t.last_error = "done", None
+                elif (t.attempts or 0) < JD_ANALYSIS_MAX_ATTEMPTS:
+                    t.status, t.last_error = "pending", error
+                else:
+                    t.status, t.last_error = "failed", error
+                    job.jd_analysis_status = "failed"
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: could not persist background JD analysis: {e}")
+        db.query(Task).filter(Task.id.in_(claimed), Task.status == "running").update(
+            {Task.status: "pending"}, synchronize_session=False
+        )
+        db.commit()
+    return len(tasks)
+
+
+def skills_for_ranking(db: Session, jobs: list[models.Job]) -> dict[int, list[dict[str, Any]]]:
+    """
+    Skill rows to rank each job with, without running Model 1 in the request.
+    Jobs with no stored analysis are queued and scored on their recruiter-entered
+    skills (required -> important, nice-to-have -> optional) until the worker
+    catches up; jobs with neither are left out.
+    """
+    out: dict[int, list[dict[str, Any]]] = {}
+    missing: list[models.Job] = []
+    analyses = load_analyses(db, (job.jd_analysis_hash for job in jobs))
+    for job in jobs:
+        rows = get_stored_job_skills(job, analyses)
+        if rows is not None:
+            out[job.id] = rows
+        else:
+            missing.append(job)
+    if not missing:
+        return out
+    try:
+        enqueue_jobs_analysis(db, missing)
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: could not queue JD analysis: {e}")
+    for job in missing:
+        rows = get_stored_job_skills(job)  # set when the queue drained inline
+        if rows is not None:
+            out[job.id] = rows
+            continue
+        required = job.skills_required if isinstance(job.skills_required, list) else []
+        nice = job.nice_to_have_skills if isinstance(job.nice_to_have_skills, list) else []
+        rows = [{"skill": s, "importance_label": "important"} for s in required if str(s).strip()]
+        rows += [{"skill": s, "importance_label": "optional"} for s in nice if str(s).strip()]
+        if rows:
+            out[job.id] = rows
+    return out
+
+
+class JDAnalysisWorker:
+    """In-process pool of threads draining jd_analysis_queue."""
+
+    def __init__(
+        self,
+        workers: int = JD_ANALYSIS_WORKERS,
+        batch_size: int = JD_ANALYSIS_BATCH_SIZE,
+        poll_seconds: float = JD_ANALYSIS_POLL_SECONDS,
+    ) -> None:
+        self.workers = max(0, workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        if self.workers == 0 or self.running:
+            return
+        db = SessionLocal()
+        try:
+            n = db.query(Task).filter(Task.status == "running").update(
+                {Task.status: "pending"}, synchronize_session=False
+            )
+            db.commit()
+            if n:
+                print(f"Requeued {n} JD analysis tasks left running by a previous process")
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not recover JD analysis queue: {e}")
+        finally:
+            db.close()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"jd-analysis-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def notify(self, db: Session | None = None) -> None:
+        """Wake the pool; with no workers configured, drain inline on db instead."""
+        if self.workers == 0 and db is not None:
+            while process_pending(db, self.batch_size):
+                pass
+            return
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                n = process_pending(db, self.batch_size)
+            except Exception as e:
+                db.rollback()
+                print(f"Warning: JD analysis worker error: {e}")
+                n = 0
+            finally:
+                db.close()
+            if n == 0:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def stats(self, db: Session) -> dict[str, Any]:
+        counts = dict(db.query(Task.status, func.count(Task.id)).group_by(Task.status).all())
+        return {"workers": self.workers, "running": self.running, "tasks": counts}
+
+
+jd_analysis_worker = JDAnalysisWorker()
@@ -0,0 +1,230 @@
+"""
+In-memory inverted index: canonical skill (lowercase, as Model 2 matches it) ->
+active job ids. Used to pick Model 2 candidates from the whole job table by
+skill overlap instead of scoring the newest N postings.
+
+A job is indexed under its Model 1 skills (jd_analyses) plus its recruiter-entered
+required / nice-to-have skills, so jobs still waiting for analysis are findable.
+The index is built from the database on first use and kept current by hooks on
+job create / update / close and when an analysis is stored; rows changed by other
+processes are picked up by an incremental sync on updated_at /
+jd_skills_analyzed_at every JOB_INDEX_SYNC_SECONDS.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterable
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import JOB_INDEX_SYNC_SECONDS, MATCH_CANDIDATE_LIMIT
+from app.db import SessionLocal
+from app.services.model2_service import _normalize_user_skills
+from app.services.registry import register
+
+ACTIVE_STATUSES = ("active", "open")
+
+
+def _row_skills(rows: Iterable[dict[str, Any]] | None) -> set[str]:
+    out = set()
+    for row in rows or []:
+        skill = str(row.get("skill") or row.get("competency") or "").strip()
+        if skill:
+            out.add(skill.lower())
+    return out
+
+
+def _recruiter_skills(required: Any, nice_to_have: Any) -> set[str]:
+    out = set()
+    for field in (required, nice_to_have):
+        if isinstance(field, list):
+            out.update(str(s).strip().lower() for s in field if str(s).strip())
+    return out
+
+
+class SkillJobIndex:
+    def __init__(self, sync_seconds: float = JOB_INDEX_SYNC_SECONDS) -> None:
+        self.sync_seconds = sync_seconds
+        self._postings: dict[str, set[int]] = {}
+        self._job_skills: dict[int, frozenset[str]] = {}
+        self._by_fingerprint: dict[str, frozenset[str]] = {}
+        self._lock = threading.Lock()
+        self._built = False
+        self._watermark: datetime | None = None
+        self._last_sync = 0.0
+
+    def _set(self, job_id: int, skills: set[str]) -> None:
+        old = self._job_skills.get(job_id, frozenset())
+        new = frozenset(skills)
+        for s in old - new:
+            ids = self._postings.get(s)
+            if ids is not None:
+                ids.discard(job_id)
+                if not ids:
+                    del self._postings[s]
+        for s in new - old:
+            self._postings.setdefault(s, set()).add(job_id)
+        if new:
+            self._job_skills[job_id] = new
+        else:
+            self._job_skills.pop(job_id, None)
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            self._set(job_id, set())
+
+    def update_job(self, job: models.Job, rows: list[dict[str, Any]] | None = None) -> None:
+        """
+        Re-index one job. rows are its new Model 1 rows; without them (JD edited,
+        analysis pending) the previously indexed skills are kept alongside the
+        recruiter skills until the analysis lands.
+        """
+        if job.id is None:
+            return
+        with self._lock:
+            if job.status not in ACTIVE_STATUSES:
+                self._set(job.id, set())
+                return
+            skills = _recruiter_skills(job.skills_required, job.nice_to_have_skills)
+            skills |= _row_skills(rows) if rows is not None else self._job_skills.get(job.id, frozenset())
+            self._set(job.id, skills)
+
+    def _analysis_skills(self, db: Session, fingerprints: set[str]) -> dict[str, frozenset[str]]:
+        """Skill sets of jd_analyses rows, decoded once per fingerprint (duplicates share them)."""
+        missing = [fp for fp in fingerprints if fp not in self._by_fingerprint]
+        for i in range(0, len(missing), 900):
+            found = (
+                db.query(models.JDAnalysis.fingerprint, models.JDAnalysis.skills)
+                .filter(models.JDAnalysis.fingerprint.in_(missing[i:i + 900]))
+                .all()
+            )
+            for fp, rows in found:
+                self._by_fingerprint[fp] = frozenset(_row_skills(rows))
+        return self._by_fingerprint
+
+    def _load(self, db: Session, since: datetime | None) -> None:
+        Job = models.Job
+        q = db.query(
+            Job.id,
+            Job.status,
+            Job.skills_required,
+            Job.nice_to_have_skills,
+            Job.jd_analysis_hash,
+            Job.updated_at,
+            Job.jd_skills_analyzed_at,
+        )
+        if since is None:
+            q = q.filter(Job.status.in_(ACTIVE_STATUSES))
+        else:
+            q = q.filter(or_(Job.updated_at > since, Job.jd_skills_analyzed_at > since))
+        rows = q.all()
+        by_fp = self._analysis_skills(db, {r.jd_analysis_hash for r in rows if r.jd_analysis_hash})
+        watermark = self._watermark
+        for job_id, status, required, nice, fp, updated_at, analyzed_at in rows:
+            for ts in (updated_at, analyzed_at):
+                if ts is not None and (watermark is None or ts > watermark):
+                    watermark = ts
+            if status not in ACTIVE_STATUSES:
+                self._set(job_id, set())
+                continue
+            self._set(job_id, _recruiter_skills(required, nice) | by_fp.get(fp, frozenset()))
+        self._watermark = watermark
+
+    def ensure(self, db: Session) -> None:
+        """Build on first use; afterwards pull rows changed elsewhere, at most every sync_seconds."""
+        now = time.monotonic()
+        if self._built and now - self._last_sync < self.sync_seconds:
+            return
+        with self._lock:
+            if not self._built:
+                start = time.perf_counter()
+                self._load(db, None)
+                self._built = True
+                print(
+                    f"Skill->job index built: {len(self._job_skills)} jobs, "
+                    f"{len(self._postings)} skills in {time.perf_counter() - start:.2f}s"
+                )
+            elif now - self._last_sync >= self.sync_seconds:
+                self._load(db, self._watermark)
+            self._last_sync = now
+
+    def candidates(self, db: Session, skills: Iterable[str], limit: int | None = None) -> list[int]:
+        """
+        Active job ids sharing at least one skill, most shared skills first (newer
+        ids first on ties), capped at limit.
+        """
+        self.ensure(db)
+        keys = {str(s).strip().lower() for s in skills if str(s).strip()}
+        with self._lock:
+            counts: Counter[int] = Counter()
+            for s in keys:
+                counts.update(self._postings.get(s, ()))
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], -kv[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [job_id for job_id, _ in ranked]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "built": self._built,
+                "jobs": len(self._job_skills),
+                "skills": len(self._postings),
+                "postings": sum(len(v) for v in self._postings.values()),
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+            }
+
+
+skill_job_index = SkillJobIndex()
+
+
+def _build_skill_job_index() -> SkillJobIndex:
+    db = SessionLocal()
+    try:
+        skill_job_index.ensure(db)
+    finally:
+        db.close()
+    return skill_job_index
+
+
+# Built by the startup warm-up (app.services.registry) so the first match request does not pay for it.
+register("job_index", _build_skill_job_index)
+
+
+def candidate_jobs(
+    db: Session,
+    user_skills: Iterable[str],
+    *,
+    limit: int = MATCH_CANDIDATE_LIMIT,
+    min_jobs: int = 0,
+    pad_recent: int = 100,
+) -> list[models.Job]:
+    """
+    Active jobs sharing a skill with the user (at most limit, by overlap), newest
+    first like the old fixed scan. When fewer than min_jobs share a skill, the
+    newest pad_recent active jobs are added so sparse profiles still get results.
+    """
+    ids = skill_job_index.candidates(db, _normalize_user_skills(list(user_skills)), limit)
+    Job = models.Job
+    jobs: list[models.Job] = []
+    for i in range(0, len(ids), 900):
+        jobs.extend(
+            db.query(Job).filter(Job.id.in_(ids[i:i + 900]), Job.status.in_(ACTIVE_STATUSES)).all()
+        )
+    if len(jobs) < min_jobs:
+        seen = {j.id for j in jobs}
+        recent = (
+            db.query(Job)
+            .filter(Job.status.in_(ACTIVE_STATUSES))
+            .order_by(Job.created_at.desc())
+            .limit(pad_recent)
+            .all()
+        )
+        jobs.extend(j for j in recent if j.id not in seen)
+    jobs.sort(key=lambda j: (j.created_at or datetime.min, j.id), reverse=True)
+    return jobs
@@ -1,18 +1,25 @@
-"""Persist Model 1 JD skill analysis per job (fixed until JD changes)."""
+"""
+Persist Model 1 JD skill analysis (fixed until the JD or the model/lexicon changes).
+
+Rows are content-addressed: one jd_analyses row per jd_fingerprint, referenced by
+jobs.jd_analysis_hash, so duplicate postings share one analysis and one copy.
+"""
 from __future__ import annotations
 
 import hashlib
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 
 from app import models
-from app.services.model1_service import model1_service
+from app.services.job_index import skill_job_index
+from app.services.model1_service import analysis_version, model1_service
 
 
 def jd_fingerprint(title: str, jd_text: str) -> str:
-    payload = f"{(title or '').strip()}\n{(jd_text or '').strip()}"
+    """Hash of title + JD and the Model 1 / lexicon version that analyzed it."""
+    payload = f"{analysis_version()}\n{(title or '').strip()}\n{(jd_text or '').strip()}"
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
 
 
@@ -22,15 +29,64 @@ def job_title_and_jd(job: models.Job) -> tuple[str, str]:
     return title, jd
 
 
-def get_stored_job_skills(job: models.Job) -> Optional[list[dict[str, Any]]]:
-    stored = getattr(job, "jd_analyzed_skills", None)
-    if not stored or not isinstance(stored, list):
-        return None
+def load_analyses(db: Session, fingerprints) -> dict[str, list[dict[str, Any]]]:
+    """Stored analyses for the given fingerprints, one query: {fingerprint: rows}."""
+    fps = list({fp for fp in fingerprints if fp})
+    if not fps:
+        return {}
+    found = (
+        db.query(models.JDAnalysis.fingerprint, models.JDAnalysis.skills)
+        .filter(models.JDAnalysis.fingerprint.in_(fps))
+        .all()
+    )
+    return {fp: rows for fp, rows in found if isinstance(rows, list)}
+
+
+def get_stored_job_skills(
+    job: models.Job,
+    analyses: Optional[dict[str, list[dict[str, Any]]]] = None,
+) -> Optional[list[dict[str, Any]]]:
+    """
+    Rows for the job's current JD version, or None. Pass analyses (from
+    load_analyses) when checking many jobs to avoid one query per job.
+    """
     title, jd = job_title_and_jd(job)
     fp = jd_fingerprint(title, jd)
     if getattr(job, "jd_analysis_hash", None) != fp:
         return None
-    return stored
+    if analyses is None:
+        db = object_session(job)
+        analyses = load_analyses(db, [fp]) if db is not None else {}
+    return analyses.get(fp)
+
+
+def store_job_skills(
+    db: Session,
+    job: models.Job,
+    rows: list[dict[str, Any]],
+    fingerprint: str,
+    analyzed_at: datetime,
+) -> None:
+    """Save rows under fingerprint (once per distinct JD) and point job at them; caller commits."""
+    analysis = db.get(models.JDAnalysis, fingerprint)
+    if analysis is None:
+        db.add(
+            models.JDAnalysis(
+                fingerprint=fingerprint,
+                model_version=analysis_version(),
+                skills=rows,
+                analyzed_at=analyzed_at,
+            )
+        )
+        db.flush()
+    elif analysis.skills != rows:
+        analysis.skills = rows
+        analysis.analyzed_at = analyzed_at
+    job.jd_analyzed_skills = None  # legacy per-job copy; rows live in jd_analyses
+    job.jd_analysis_hash = fingerprint
+    job.jd_skills_analyzed_at = analyzed_at
+    job.jd_analysis_status = "done"
+    skill_job_index.update_job(job, rows)
 
 
 def analyze_and_save_job_skills(
@@ -39,18 +95,20 @@ def analyze_and_save_job_skills(
     *,
     force: bool = False,
 ) -> list[dict[str, Any]]:
-    """Run Model 1 once per JD version; reuse stored rows until title/JD changes."""
+    """Run Model 1 once per distinct JD version; reuse stored rows (from any job) until it changes."""
+    title, jd = job_title_and_jd(job)
+    fp = jd_fingerprint(title, jd)
     if not force:
-        cached = get_stored_job_skills(job)
+        cached = load_analyses(db, [fp]).get(fp)
         if cached is not None:
+            if job.jd_analysis_hash != fp:
+                store_job_skills(db, job, cached, fp, datetime.utcnow())
+                db.commit()
             return cached
 
-    title, jd = job_title_and_jd(job)
     rows = model1_service.analyze_jd(title, jd)
     try:
-        job.jd_analyzed_skills = rows
-        job.jd_analysis_hash = jd_fingerprint(title, jd)
-        job.jd_skills_analyzed_at = datetime.utcnow()
+        store_job_skills(db, job, rows, fp, datetime.utcnow())
         db.commit()
         db.refresh(job)
     except Exception as e:
@@ -59,6 +117,41 @@ def analyze_and_save_job_skills(
     return rows
 
 
+def analyze_and_save_jobs_skills(
+    db: Session,
+    jobs: list[models.Job],
+    *,
+    force: bool = False,
+) -> dict[int, list[dict[str, Any]]]:
+    """Batch analyze_and_save_job_skills: one Model 1 call for all unseen JDs, one commit."""
+    out: dict[int, list[dict[str, Any]]] = {}
+    fps = {job.id: jd_fingerprint(*job_title_and_jd(job)) for job in jobs}
+    known = {} if force else load_analyses(db, fps.values())
+    todo: dict[str, tuple[str, str]] = {}
+    for job in jobs:
+        fp = fps[job.id]
+        if fp in known:
+            out[job.id] = known[fp]
+        else:
+            todo.setdefault(fp, job_title_and_jd(job))
+
+    results = dict(zip(todo, model1_service.analyze_jds(list(todo.values())))) if todo else {}
+    for job in jobs:
+        if job.id not in out:
+            out[job.id] = results[fps[job.id]]
+    try:
+        analyzed_at = datetime.utcnow()
+        for job in jobs:
+            fp = fps[job.id]
+            if fp in results or job.jd_analysis_hash != fp:
+                store_job_skills(db, job, out[job.id], fp, analyzed_at)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: could not persist JD skills (run alembic upgrade head): {e}")
+    return out
+
+
 def get_or_analyze_job_skills(
     db: Session,
     job_id: int,
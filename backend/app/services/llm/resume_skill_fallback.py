@@ -1,11 +1,10 @@
 """Lexicon-based skill extraction when Gemini is unavailable (quota, offline, etc.)."""
 from __future__ import annotations
 
-import json
 import re
-from pathlib import Path
 
 from app.config import BASE_DIR
+from services.lexicon_matcher import LexiconMatcher, load_lexicon_matcher
 
 _SOFT_KEYWORDS = {
     "communication",
@@ -33,19 +32,9 @@ _TECH_HINTS = re.compile(
     re.I,
 )
 
-_lexicon: dict[str, list[str]] | None = None
-
-
-def _load_lexicon() -> dict[str, list[str]]:
-    global _lexicon
-    if _lexicon is not None:
-        return _lexicon
-    path = BASE_DIR.parent / "datasets" / "skills.json"
-    if not path.exists():
-        _lexicon = {}
-        return _lexicon
-    _lexicon = json.loads(path.read_text(encoding="utf-8"))
-    return _lexicon
+def _lexicon_matcher() -> LexiconMatcher:
+    """Compiled matcher shared with services.skill_extractor (same skills.json)."""
+    return load_lexicon_matcher(BASE_DIR.parent / "datasets" / "skills.json")
 
 
 def _is_soft(canonical: str) -> bool:
@@ -60,26 +49,15 @@ def extract_skills_from_text(text: str) -> dict:
     if not text or len(text.strip()) < 10:
         return {"technical_skills": [], "soft_skills": []}
 
-    lexicon = _load_lexicon()
     technical: set[str] = set()
     soft: set[str] = set()
 
-    for canonical, synonyms in lexicon.items():
-        for token in synonyms:
-            t = str(token).strip()
-            if len(t) < 2:
-                continue
-            parts = [re.escape(p) for p in t.lower().split()]
-            if parts:
-                parts[-1] = parts[-1] + r"s?"
-            pattern = r"\b" + r"\s+".join(parts) + r"\b"
-            if re.search(pattern, text, flags=re.IGNORECASE):
-                label = canonical.title() if canonical.islower() else canonical
-                if _is_soft(canonical):
-                    soft.add(label)
-                else:
-                    technical.add(label)
-                break
+    for canonical in _lexicon_matcher().find(text, min_synonym_length=2):
+        label = canonical.title() if canonical.islower() else canonical
+        if _is_soft(canonical):
+            soft.add(label)
+        else:
+            technical.add(label)
 
     for m in _TECH_HINTS.finditer(text):
         technical.add(m.group(0).title())
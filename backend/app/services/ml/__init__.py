@@ -3,6 +3,7 @@ ML service: career KNN, job matching (Doc2Vec), roadmap selection.
 """
 from app.services.ml.career_ml import (
     recommend_careers_knn,
+    recommend_careers_knn_batch,
     match_jobs_from_database,
     match_jobs_doc2vec,
     select_best_roadmap,
@@ -11,6 +12,7 @@ from app.services.ml.career_ml import (
 
 __all__ = [
     "recommend_careers_knn",
+    "recommend_careers_knn_batch",
     "match_jobs_from_database",
     "match_jobs_doc2vec",
     "select_best_roadmap",
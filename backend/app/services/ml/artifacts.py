@@ -0,0 +1,188 @@
+"""
+Memory-mapped ML artifacts shared by every uvicorn worker.
+
+The pickled artifacts in ml_models/ are converted once into mmap-friendly files
+under ML_MMAP_DIR (rebuilt when the source is newer):
+
+    job_vectors.pkl          -> job_vectors.npy (np.load(mmap_mode="r"))
+    job_metadata.pkl         -> job_metadata/<column>.npy (numeric columns) and
+                                <column>.utf8.npy + <column>.offsets.npy (string
+                                columns, one UTF-8 buffer per column)
+    doc2vec_job_model.model  -> gensim save with every array in its own .npy,
+                                loaded with mmap="r"
+
+Opened read-only and memory-mapped, these pages live in the OS page cache once
+and are shared by all worker processes instead of each unpickling a private
+copy. Conversion writes to a temporary name and renames, so workers starting
+together do not see half-written files. With ML_MMAP_ARTIFACTS=0 the pickles
+are loaded as before.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+
+from app.config import ML_MMAP_ARTIFACTS, ML_MMAP_DIR
+
+
+def _fresh(target: Path, source: Path) -> bool:
+    return target.exists() and target.stat().st_mtime >= source.stat().st_mtime
+
+
+def _publish(tmp: Path, target: Path) -> None:
+    """Move a finished temp file/dir into place; another worker may have won the race."""
+    try:
+        if target.is_dir() and tmp.is_dir():
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+    except OSError:
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        elif tmp.exists():
+            tmp.unlink()
+        if not target.exists():
+            raise
+
+
+def load_array(pkl_path: Path) -> np.ndarray:
+    """Pickled ndarray as a read-only memory map of its .npy conversion."""
+    if not ML_MMAP_ARTIFACTS:
+        return joblib.load(pkl_path)
+    target = Path(ML_MMAP_DIR) / f"{pkl_path.stem}.npy"
+    if not _fresh(target, pkl_path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(joblib.load(pkl_path)))
+        _publish(Path(tmp), target)
+    return np.load(target, mmap_mode="r")
+
+
+class StringColumn:
+    """Read-only string column: one UTF-8 buffer plus int64 offsets (both memory-mapped)."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, stop = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._data[start:stop].tobytes().decode("utf-8")
+
+    @staticmethod
+    def write(values: list[Any], directory: Path, name: str) -> None:
+        encoded = [("" if v is None else str(v)).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        np.save(directory / f"{name}.utf8.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        np.save(directory / f"{name}.offsets.npy", offsets)
+
+
+class ColumnarTable:
+    """
+    Minimal read-only table over per-column memory maps. Rows are dicts, and
+    table.iloc[i] works like the DataFrame it replaces (row["job_title"], ...).
+    """
+
+    def __init__(self, columns: dict[str, Any]) -> None:
+        self.columns = list(columns)
+        self._cols = columns
+        self.iloc = self
+
+    def __len__(self) -> int:
+        return len(next(iter(self._cols.values()))) if self._cols else 0
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        row = {}
+        for name, col in self._cols.items():
+            value = col[i]
+            row[name] = value.item() if isinstance(value, np.generic) else value
+        return row
+
+    def column(self, name: str) -> Any:
+        return self._cols[name]
+
+    @classmethod
+    def write(cls, df: Any, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        order = []
+        for name in df.columns:
+            series = df[name]
+            if series.dtype.kind in "biuf":
+                np.save(directory / f"{name}.npy", series.to_numpy())
+            else:
+                StringColumn.write(series.tolist(), directory, name)
+            order.append(name)
+        (directory / "columns.txt").write_text("\n".join(order), encoding="utf-8")
+
+    @classmethod
+    def open(cls, directory: Path) -> "ColumnarTable":
+        columns: dict[str, Any] = {}
+        for name in (directory / "columns.txt").read_text(encoding="utf-8").splitlines():
+            numeric = directory / f"{name}.npy"
+            if numeric.exists():
+                columns[name] = np.load(numeric, mmap_mode="r")
+            else:
+                columns[name] = StringColumn(
+                    np.load(directory / f"{name}.utf8.npy", mmap_mode="r"),
+                    np.load(directory / f"{name}.offsets.npy", mmap_mode="r"),
+                )
+        return cls(columns)
+
+
+def load_table(pkl_path: Path) -> Any:
+    """Pickled DataFrame as a memory-mapped ColumnarTable (the DataFrame itself when disabled)."""
+    if not ML_MMAP_ARTIFACTS:
+        return joblib.load(pkl_path)
+    target = Path(ML_MMAP_DIR) / pkl_path.stem
+    marker = target / "columns.txt"
+    if not _fresh(marker, pkl_path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{pkl_path.stem}."))
+        ColumnarTable.write(joblib.load(pkl_path), tmp)
+        _publish(tmp, target)
+    return ColumnarTable.open(target)
+
+
+def load_doc2vec(model_path: Path) -> Any:
+    """Doc2Vec with its weight arrays memory-mapped read-only (infer_vector does not write them)."""
+    from gensim.models.doc2vec import Doc2Vec
+
+    if not ML_MMAP_ARTIFACTS:
+        return Doc2Vec.load(str(model_path))
+    target_dir = Path(ML_MMAP_DIR) / model_path.stem
+    target = target_dir / model_path.name
+    if not _fresh(target, model_path):
+        target_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=target_dir.parent, prefix=f".{model_path.stem}."))
+        # sep_limit=0: every ndarray goes to its own .npy next to the model file.
+        Doc2Vec.load(str(model_path)).save(str(tmp / model_path.name), sep_limit=0)
+        _publish(tmp, target_dir)
+    return Doc2Vec.load(str(target), mmap="r")
+
+
+def memory_usage() -> dict[str, int]:
+    """
+    This process's RSS, PSS (shared pages split between the processes mapping
+    them) and shared resident kB, from /proc (Linux). Empty elsewhere.
+    """
+    out: dict[str, int] = {}
+    fields = {"Rss:": "rss_kb", "Pss:": "pss_kb", "Shared_Clean:": "shared_clean_kb", "Shared_Dirty:": "shared_dirty_kb"}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    out[fields[parts[0]]] = int(parts[1])
+    except OSError:
+        pass
+    return out
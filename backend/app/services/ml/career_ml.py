@@ -1,75 +1,139 @@
 """
 Career ML: KNN career recommendation, Doc2Vec job matching.
-Uses app.config for ML_MODELS_DIR.
+Uses app.config for ML_MODELS_DIR. Artifacts load on first use (or at warm-up)
+through the service registry, not at import time.
 """
 import pickle
 import joblib
 import numpy as np
-from gensim.models.doc2vec import Doc2Vec
-from gensim.utils import simple_preprocess
 from sklearn.metrics.pairwise import cosine_similarity
+from sqlalchemy.orm import object_session
 
 from app.config import ML_MODELS_DIR
+from app.services.ml.artifacts import load_array, load_doc2vec, load_table
+from app.services.ml.job_vectors import infer_unit_vector, job_vector_store
+from app.services.registry import register
 
-try:
-    KNN_MODEL = joblib.load(ML_MODELS_DIR / "knn_career_model.pkl")
-    MLB = joblib.load(ML_MODELS_DIR / "skills_mlb.pkl")
-    CAREER_REF = joblib.load(ML_MODELS_DIR / "career_reference.pkl")
-    DOC2VEC_MODEL = Doc2Vec.load(str(ML_MODELS_DIR / "doc2vec_job_model.model"))
-    JOB_VECTORS = joblib.load(ML_MODELS_DIR / "job_vectors.pkl")
-    JOB_METADATA = joblib.load(ML_MODELS_DIR / "job_metadata.pkl")
-    try:
-        with open(ML_MODELS_DIR / "contextual_bandit.pkl", "rb") as f:
-            BANDIT_DATA = pickle.load(f)
-    except Exception:
-        BANDIT_DATA = None
-    print("ML models loaded successfully")
-except Exception as e:
-    print(f"Warning: Could not load ML models: {e}")
-    KNN_MODEL = MLB = CAREER_REF = None
-    DOC2VEC_MODEL = JOB_VECTORS = JOB_METADATA = BANDIT_DATA = None
 
+class CareerModels:
+    """KNN, MultiLabelBinarizer, career reference, Doc2Vec and job vectors; None when unavailable."""
 
-def recommend_careers_knn(user_skills, top_k=5):
-    if not KNN_MODEL or not MLB or CAREER_REF is None:
-        return []
+    def __init__(self) -> None:
+        try:
+            self.KNN_MODEL = joblib.load(ML_MODELS_DIR / "knn_career_model.pkl")
+            self.MLB = joblib.load(ML_MODELS_DIR / "skills_mlb.pkl")
+            self.CAREER_REF = joblib.load(ML_MODELS_DIR / "career_reference.pkl")
+            # Memory-mapped read-only (app.services.ml.artifacts): one copy shared by all workers.
+            self.DOC2VEC_MODEL = load_doc2vec(ML_MODELS_DIR / "doc2vec_job_model.model")
+            self.JOB_VECTORS = load_array(ML_MODELS_DIR / "job_vectors.pkl")
+            self.JOB_METADATA = load_table(ML_MODELS_DIR / "job_metadata.pkl")
+            try:
+                with open(ML_MODELS_DIR / "contextual_bandit.pkl", "rb") as f:
+                    self.BANDIT_DATA = pickle.load(f)
+            except Exception:
+                self.BANDIT_DATA = None
+            self._pack_career_skills()
+            print("ML models loaded successfully")
+        except Exception as e:
+            print(f"Warning: Could not load ML models: {e}")
+            self.KNN_MODEL = self.MLB = self.CAREER_REF = None
+            self.DOC2VEC_MODEL = self.JOB_VECTORS = self.JOB_METADATA = self.BANDIT_DATA = None
+            self.CAREER_BITS = None
+
+    def _pack_career_skills(self) -> None:
+        """
+        Career skill sets as bit-packed rows over the MLB columns (the vectors the
+        cosine KNN was fit on), so batch recommendation is popcounts of ANDs.
+        """
+        self.SKILL_NAMES = np.asarray(self.MLB.classes_, dtype=object)
+        self.SKILL_COLUMNS = {skill: i for i, skill in enumerate(self.MLB.classes_)}
+        self.CAREER_NAMES = self.CAREER_REF["Career"].tolist()
+        self.CAREER_SKILLS = self.CAREER_REF["Skills"].tolist()
+        dense = np.asarray(self.MLB.transform(self.CAREER_SKILLS), dtype=bool)
+        self.CAREER_BITS = np.packbits(dense, axis=1)
+        self.CAREER_SIZES = dense.sum(axis=1).astype(np.float64)
+
+
+career_models = register("career_ml", CareerModels)
+
+
+def _preprocess(text, **kwargs):
+    from gensim.utils import simple_preprocess
+
+    return simple_preprocess(text, **kwargs)
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _pack_users(m, users_skills) -> np.ndarray:
+    """(n_users, n_bytes) packed skill bits; skills outside the MLB vocabulary are ignored, as in MLB.transform."""
+    dense = np.zeros((len(users_skills), len(m.SKILL_NAMES)), dtype=bool)
+    for row, skills in enumerate(users_skills):
+        cols = [m.SKILL_COLUMNS[s] for s in (skills or []) if s in m.SKILL_COLUMNS]
+        dense[row, cols] = True
+    return np.packbits(dense, axis=1)
+
+
+def recommend_careers_knn_batch(users_skills, top_k=5, chunk_size=4096):
+    """
+    recommend_careers_knn for many users at once: cosine similarity to every
+    career from popcounts of packed skill bits (|A & B| / sqrt(|A| |B|), the
+    KNN's metric on binary vectors), top-k per row, and matched / missing skills
+    from the same bit arrays. Returns one recommendation list per user.
+    """
+    m = career_models.get()
+    if not m.KNN_MODEL or not m.MLB or m.CAREER_REF is None or m.CAREER_BITS is None:
+        return [[] for _ in users_skills]
     try:
-        user_skills_encoded = MLB.transform([user_skills])
-        distances, indices = KNN_MODEL.kneighbors(
-            user_skills_encoded, n_neighbors=min(top_k, len(CAREER_REF))
-        )
-        recommendations = []
-        for dist, idx in zip(distances[0], indices[0]):
-            similarity = 1 - dist
-            career = CAREER_REF.iloc[idx]["Career"]
-            career_skills = CAREER_REF.iloc[idx]["Skills"]
-            matching_skills = set(user_skills) & set(career_skills)
-            missing_skills = set(career_skills) - set(user_skills)
-            recommendations.append({
-                "career": career,
-                "similarity_score": round(similarity * 100, 2),
-                "matching_skills": list(matching_skills),
-                "missing_skills": list(missing_skills)[:5],
-                "required_skills": career_skills,
-            })
-        return recommendations
+        k = min(top_k, len(m.CAREER_NAMES))
+        out = []
+        for start in range(0, len(users_skills), chunk_size):
+            user_bits = _pack_users(m, users_skills[start:start + chunk_size])
+            overlap = _POPCOUNT[user_bits[:, None, :] & m.CAREER_BITS[None, :, :]].sum(axis=2, dtype=np.int64)
+            user_sizes = _POPCOUNT[user_bits].sum(axis=1, dtype=np.int64).astype(np.float64)
+            denom = np.sqrt(user_sizes[:, None] * m.CAREER_SIZES[None, :])
+            similarity = np.divide(overlap, denom, out=np.zeros(overlap.shape), where=denom > 0)
+            # Most similar first; equal scores in career order.
+            top = np.argsort(-similarity, axis=1, kind="stable")[:, :k]
+            top_bits = m.CAREER_BITS[top]
+            n_cols = len(m.SKILL_NAMES)
+            matched = np.unpackbits(top_bits & user_bits[:, None, :], axis=2, count=n_cols).astype(bool)
+            missing = np.unpackbits(top_bits & ~user_bits[:, None, :], axis=2, count=n_cols).astype(bool)
+            for row in range(len(user_bits)):
+                recs = []
+                for j, idx in enumerate(top[row].tolist()):
+                    recs.append({
+                        "career": m.CAREER_NAMES[idx],
+                        "similarity_score": round(float(similarity[row, idx]) * 100, 2),
+                        "matching_skills": m.SKILL_NAMES[matched[row, j]].tolist(),
+                        "missing_skills": m.SKILL_NAMES[missing[row, j]].tolist()[:5],
+                        "required_skills": m.CAREER_SKILLS[idx],
+                    })
+                out.append(recs)
+        return out
     except Exception as e:
         print(f"Error in KNN recommendation: {e}")
-        return []
+        return [[] for _ in users_skills]
+
+
+def recommend_careers_knn(user_skills, top_k=5):
+    return recommend_careers_knn_batch([user_skills], top_k)[0]
 
 
 def match_jobs_doc2vec(resume_text, top_k=10):
-    if not DOC2VEC_MODEL:
+    m = career_models.get()
+    if not m.DOC2VEC_MODEL:
         return []
     try:
-        resume_tokens = simple_preprocess(resume_text, deacc=True, min_len=2, max_len=15)
-        resume_vector = DOC2VEC_MODEL.infer_vector(resume_tokens, epochs=20)
+        resume_tokens = _preprocess(resume_text, deacc=True, min_len=2, max_len=15)
+        resume_vector = m.DOC2VEC_MODEL.infer_vector(resume_tokens, epochs=20)
         resume_vector = resume_vector.reshape(1, -1)
-        similarities = cosine_similarity(resume_vector, JOB_VECTORS)[0]
+        similarities = cosine_similarity(resume_vector, m.JOB_VECTORS)[0]
         top_indices = np.argsort(similarities)[-top_k:][::-1]
         results = []
         for idx in top_indices:
-            job = JOB_METADATA.iloc[idx]
+            job = m.JOB_METADATA.iloc[idx]
             results.append({
                 "job_id": int(job["ID_num"]),
                 "job_title": job["job_title"],
@@ -85,41 +149,24 @@ def match_jobs_doc2vec(resume_text, top_k=10):
         return []
 
 
-def match_jobs_from_database(resume_text, jobs_from_db, top_k=10):
-    if not DOC2VEC_MODEL or not jobs_from_db:
+def match_jobs_from_database(resume_text, jobs_from_db, top_k=10, db=None, resume_vector=None):
+    """
+    Rank DB jobs by Doc2Vec similarity to resume_text. Job vectors come from the
+    persisted job_vectors store (inferred once per JD version), so a call costs one
+    infer_vector for the resume (none when the caller passes its cached unit
+    resume_vector) and one matrix product.
+    """
+    m = career_models.get()
+    if not m.DOC2VEC_MODEL or not jobs_from_db:
         return []
     try:
-        resume_tokens = simple_preprocess(resume_text, deacc=True, min_len=2, max_len=15)
-        resume_vector = DOC2VEC_MODEL.infer_vector(resume_tokens, epochs=20)
-        resume_vector = resume_vector.reshape(1, -1)
-        job_texts, job_objects = [], []
-        for job in jobs_from_db:
-            parts = []
-            if job.job_title:
-                parts.append(job.job_title)
-            if job.jd_text:
-                parts.append(job.jd_text)
-            elif job.description:
-                parts.append(job.description)
-            if job.skills_required:
-                parts.append(" ".join(job.skills_required) if isinstance(job.skills_required, list) else str(job.skills_required))
-            if job.nice_to_have_skills and isinstance(job.nice_to_have_skills, list):
-                parts.append(" ".join(job.nice_to_have_skills))
-            if job.industry:
-                parts.append(job.industry)
-            if job.experience_level:
-                parts.append(job.experience_level)
-            text = " ".join(parts)
-            if text.strip():
-                job_texts.append(text)
-                job_objects.append(job)
-        if not job_texts:
+        db = db if db is not None else object_session(jobs_from_db[0])
+        job_objects, job_vectors = job_vector_store.vectors(db, m.DOC2VEC_MODEL, list(jobs_from_db))
+        if not job_objects:
             return []
-        job_vectors = np.array([
-            DOC2VEC_MODEL.infer_vector(simple_preprocess(t, deacc=True, min_len=2, max_len=15), epochs=20)
-            for t in job_texts
-        ])
-        similarities = cosine_similarity(resume_vector, job_vectors)[0]
+        if resume_vector is None:
+            resume_vector = infer_unit_vector(m.DOC2VEC_MODEL, resume_text)
+        similarities = job_vectors @ resume_vector
         top_indices = np.argsort(similarities)[-top_k:][::-1]
         results = []
         for idx in top_indices:
@@ -167,9 +214,10 @@ def match_jobs_from_database(resume_text, jobs_from_db, top_k=10):
 
 
 def select_best_roadmap(roadmaps, user_profile):
+    m = career_models.get()
     if not roadmaps:
         return None
-    if not BANDIT_DATA:
+    if not m.BANDIT_DATA:
         return roadmaps[1] if len(roadmaps) > 1 else roadmaps[0]
     try:
         exp_level = user_profile.get("experience_level", "beginner")
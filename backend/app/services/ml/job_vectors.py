@@ -0,0 +1,215 @@
+"""
+Persisted Doc2Vec vectors of database jobs for the /api/ai/match-jobs fallback.
+
+A job's vector depends only on its Doc2Vec text (title, JD, skills, industry,
+experience level) and the Doc2Vec model, so it is inferred once per
+(text, model) fingerprint and stored unit-normalized as float32 bytes in the
+job_vectors table; duplicate postings share one row. Job create / update hand
+the job to a single background thread that infers and stores its vector, so a
+match request normally does one infer_vector (the resume) and one matrix
+product. Vectors missing at request time (older rows, a new model) are inferred
+then and stored for next time.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import ML_MODELS_DIR
+from app.db import SessionLocal
+
+DOC2VEC_PATH = ML_MODELS_DIR / "doc2vec_job_model.model"
+INFER_EPOCHS = 20
+
+
+@lru_cache(maxsize=1)
+def doc2vec_version() -> str:
+    """Content hash of the Doc2Vec model file; part of every vector fingerprint."""
+    h = hashlib.sha256()
+    try:
+        with open(DOC2VEC_PATH, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        h.update(b"missing")
+    return h.hexdigest()[:12]
+
+
+def job_doc2vec_text(job: models.Job) -> str:
+    parts = []
+    if job.job_title:
+        parts.append(job.job_title)
+    if job.jd_text:
+        parts.append(job.jd_text)
+    elif job.description:
+        parts.append(job.description)
+    if job.skills_required:
+        parts.append(" ".join(job.skills_required) if isinstance(job.skills_required, list) else str(job.skills_required))
+    if job.nice_to_have_skills and isinstance(job.nice_to_have_skills, list):
+        parts.append(" ".join(job.nice_to_have_skills))
+    if job.industry:
+        parts.append(job.industry)
+    if job.experience_level:
+        parts.append(job.experience_level)
+    return " ".join(parts)
+
+
+def vector_fingerprint(text: str) -> str:
+    payload = f"{doc2vec_version()}\n{text.strip()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def infer_unit_vector(doc2vec_model: Any, text: str) -> np.ndarray:
+    from app.services.ml.career_ml import _preprocess
+
+    vec = np.asarray(
+        doc2vec_model.infer_vector(_preprocess(text, deacc=True, min_len=2, max_len=15), epochs=INFER_EPOCHS),
+        dtype=np.float32,
+    )
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+
+class JobVectorStore:
+    """fingerprint -> unit float32 vector: in-process LRU over the job_vectors table."""
+
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self.max_entries = max(1, max_entries)
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self.hits = 0
+        self.db_hits = 0
+        self.inferred = 0
+
+    def _remember(self, fp: str, vec: np.ndarray) -> None:
+        with self._lock:
+            self._cache[fp] = vec
+            self._cache.move_to_end(fp)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _load(self, db: Session, fps: list[str]) -> dict[str, np.ndarray]:
+        out: dict[str, np.ndarray] = {}
+        missing = []
+        with self._lock:
+            for fp in fps:
+                vec = self._cache.get(fp)
+                if vec is None:
+                    missing.append(fp)
+                else:
+                    self._cache.move_to_end(fp)
+                    out[fp] = vec
+        self.hits += len(out)
+        for i in range(0, len(missing), 900):
+            rows = (
+                db.query(models.JobVector.fingerprint, models.JobVector.vector)
+                .filter(models.JobVector.fingerprint.in_(missing[i:i + 900]))
+                .all()
+            )
+            for fp, blob in rows:
+                vec = np.frombuffer(blob, dtype=np.float32)
+                out[fp] = vec
+                self._remember(fp, vec)
+                self.db_hits += 1
+        return out
+
+    def vectors(self, db: Session, doc2vec_model: Any, jobs: list[models.Job]) -> tuple[list[models.Job], np.ndarray]:
+        """
+        (jobs with non-empty text, (n, dim) matrix of their unit vectors). Missing
+        vectors are inferred now and stored (one commit).
+        """
+        texts = {job.id: job_doc2vec_text(job) for job in jobs}
+        kept = [job for job in jobs if texts[job.id].strip()]
+        fps = {job.id: vector_fingerprint(texts[job.id]) for job in kept}
+        found = self._load(db, list(set(fps.values())))
+        new: dict[str, np.ndarray] = {}
+        for job in kept:
+            fp = fps[job.id]
+            if fp not in found and fp not in new:
+                new[fp] = infer_unit_vector(doc2vec_model, texts[job.id])
+        if new:
+            self._store(db, new)
+            found.update(new)
+        if not kept:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return kept, np.vstack([found[fps[job.id]] for job in kept])
+
+    def _store(self, db: Session, new: dict[str, np.ndarray]) -> None:
+        version, now = doc2vec_version(), datetime.utcnow()
+        for fp, vec in new.items():
+            self._remember(fp, vec)
+            self.inferred += 1
+        try:
+            existing = {
+                fp
+                for (fp,) in db.query(models.JobVector.fingerprint)
+                .filter(models.JobVector.fingerprint.in_(list(new)))
+                .all()
+            }
+            db.bulk_insert_mappings(
+                models.JobVector,
+                [
+                    {
+                        "fingerprint": fp,
+                        "model_version": version,
+                        "dim": int(vec.shape[0]),
+                        "vector": vec.astype(np.float32).tobytes(),
+                        "created_at": now,
+                    }
+                    for fp, vec in new.items()
+                    if fp not in existing
+                ],
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not persist job vectors (run alembic upgrade head): {e}")
+
+    def refresh_job(self, job_id: int) -> None:
+        """Infer and store the vector of one job (no-op when current or the model is unavailable)."""
+        from app.services.ml.career_ml import career_models
+
+        model = career_models.get().DOC2VEC_MODEL
+        if model is None:
+            return
+        db = SessionLocal()
+        try:
+            job = db.query(models.Job).filter(models.Job.id == job_id).first()
+            if job is not None:
+                self.vectors(db, model, [job])
+        except Exception as e:
+            print(f"Warning: job vector refresh failed for job {job_id}: {e}")
+        finally:
+            db.close()
+
+    def schedule(self, job_id: int | None) -> None:
+        """Refresh a job's vector on the background thread (called after job writes)."""
+        if job_id is None:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-vectors")
+        self._executor.submit(self.refresh_job, job_id)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "inferred": self.inferred,
+                "model_version": doc2vec_version(),
+            }
+
+
+job_vector_store = JobVectorStore()
@@ -1,20 +1,22 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import math
 import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import joblib
+import numpy as np
+from app.config import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_READ_ONLY
+from app.services.registry import register
+from services.embedding_cache import EmbeddingCache
 from services.skill_extractor import competency_extractor
+from services.similarity_engine import SimilarityEngine
 from services.skill_normalizer import competency_normalizer
-
-try:
-    from sentence_transformers import SentenceTransformer, util
-except Exception:  # pragma: no cover
-    SentenceTransformer = None
-    util = None
+from services.tokenizer import lexical_similarity
 
 CONTEXT_PATTERNS = {
     "required": 1.0,
@@ -45,51 +47,143 @@ def _repo_root() -> Path:
     return Path(__file__).resolve().parents[3]
 
 
-def _token_set(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9\+\#\.]+", (text or "").lower()))
+MODEL1_PATH = _repo_root() / "models/model1_skill_importance/model1.pkl"
+LABEL_ENCODER_PATH = _repo_root() / "models/model1_skill_importance/label_encoder.pkl"
+SKILLS_PATH = _repo_root() / "datasets/skills.json"
 
 
-def _lexical_similarity(a: str, b: str) -> float:
-    ta, tb = _token_set(a), _token_set(b)
-    if not ta or not tb:
-        return 0.0
-    return len(ta & tb) / math.sqrt(len(ta) * len(tb))
+@lru_cache(maxsize=1)
+def analysis_version() -> str:
+    """
+    Content hash of the Model 1 artifacts and the skills lexicon. Part of
+    jd_fingerprint, so stored JD analyses go stale when either is retrained or
+    edited (read once per process, like the model itself).
+    """
+    h = hashlib.sha256()
+    for path in (MODEL1_PATH, LABEL_ENCODER_PATH, SKILLS_PATH):
+        h.update(path.name.encode("utf-8"))
+        try:
+            h.update(path.read_bytes())
+        except OSError:
+            h.update(b"<missing>")
+    return h.hexdigest()[:12]
 
 
-class _SimilarityEngine:
-    def __init__(self) -> None:
-        self.model = None
-        self._cache = {}
-        if SentenceTransformer is not None:
-            try:
-                self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-            except Exception:
-                self.model = None
-
-    def _embed(self, text: str):
-        if text in self._cache:
-            return self._cache[text]
-        emb = self.model.encode(text, convert_to_tensor=True)
-        self._cache[text] = emb
-        return emb
-
-    def similarity(self, a: str, b: str) -> float:
-        if not a or not b:
+_BOUNDARY = re.compile(r"\b")
+_CONTEXT_WINDOW = 80
+_SECTION_WINDOW = 700
+
+
+def _occurrences(text: str, needle: str) -> list[int]:
+    """Start offsets of every (possibly overlapping) occurrence of needle."""
+    out: list[int] = []
+    if not needle:
+        return out
+    i = text.find(needle)
+    while i != -1:
+        out.append(i)
+        i = text.find(needle, i + 1)
+    return out
+
+
+class _JDFeatureIndex:
+    """
+    Per-JD positions of context phrases, section headers, sentence breaks and word
+    boundaries, built once per analyze_jd call. Context / section / frequency
+    features for each skill are then bisect lookups over these positions instead of
+    fresh regexes over the whole JD, with the same values as the regex definitions:
+
+    context:   phrase[^.\\n]{0,80}skill | skill[^.\\n]{0,80}phrase   (max weight)
+    section:   |first(skill) - first(section)| < 700                  (max weight, 0.4 floor)
+    frequency: non-overlapping \\bskill\\b count / 4                  (capped at 1)
+    """
+
+    def __init__(self, jd_text: str) -> None:
+        self.text = (jd_text or "").lower()
+        self.breaks = [i for i, ch in enumerate(self.text) if ch in ".\n"]
+        self.bounds = {m.start() for m in _BOUNDARY.finditer(self.text)}
+        self.phrase_starts = {
+            phrase: _occurrences(self.text, phrase)
+            for phrase in sorted(CONTEXT_PATTERNS, key=CONTEXT_PATTERNS.get, reverse=True)
+        }
+        self.section_first = {
+            section: self.text.find(section) for section in SECTION_PATTERNS
+        }
+        self._mentions: dict[str, list[int]] = {}
+
+    def mentions(self, skill: str) -> list[int]:
+        if skill not in self._mentions:
+            self._mentions[skill] = _occurrences(self.text, skill)
+        return self._mentions[skill]
+
+    def _clear(self, start: int, end: int) -> bool:
+        """True when text[start:end] contains no '.' or newline."""
+        k = bisect_left(self.breaks, start)
+        return k == len(self.breaks) or self.breaks[k] >= end
+
+    def context_score(self, skill: str) -> float:
+        hits = self.mentions(skill)
+        if not hits:
+            return 0.0
+        n = len(skill)
+        for phrase, starts in self.phrase_starts.items():
+            if not starts:
+                continue
+            plen = len(phrase)
+            for s in hits:
+                # phrase ... skill: nearest phrase ending at or before s.
+                k = bisect_right(starts, s - plen) - 1
+                if k >= 0:
+                    pe = starts[k] + plen
+                    if s - pe <= _CONTEXT_WINDOW and self._clear(pe, s):
+                        return float(CONTEXT_PATTERNS[phrase])
+                # skill ... phrase: nearest phrase starting at or after the skill end.
+                se = s + n
+                k = bisect_left(starts, se)
+                if k < len(starts):
+                    p = starts[k]
+                    if p - se <= _CONTEXT_WINDOW and self._clear(se, p):
+                        return float(CONTEXT_PATTERNS[phrase])
+        return 0.0
+
+    def section_score(self, skill: str) -> float:
+        hits = self.mentions(skill.lower())
+        if not hits:
             return 0.0
-        if self.model is not None:
-            ea = self._embed(a)
-            eb = self._embed(b)
-            return float(util.cos_sim(ea, eb).item())
-        return _lexical_similarity(a, b)
+        idx = hits[0]
+        score = 0.4
+        for section, weight in SECTION_PATTERNS.items():
+            s_idx = self.section_first[section]
+            if s_idx != -1 and abs(idx - s_idx) < _SECTION_WINDOW:
+                score = max(score, weight)
+        return float(score)
+
+    def frequency_score(self, skill: str) -> float:
+        key = skill.lower()
+        n = len(key)
+        count = 0
+        last_end = 0
+        for s in self.mentions(key):
+            if s >= last_end and s in self.bounds and s + n in self.bounds:
+                count += 1
+                last_end = s + n
+        return min(1.0, count / 4.0)
 
 
 class Model1Service:
     def __init__(self) -> None:
-        root = _repo_root()
-        self.model = joblib.load(root / "models/model1_skill_importance/model1.pkl")
-        self.label_encoder = joblib.load(root / "models/model1_skill_importance/label_encoder.pkl")
-        self.lexicon = json.loads((root / "datasets/skills.json").read_text(encoding="utf-8"))
-        self.sim = _SimilarityEngine()
+        self.version = analysis_version()
+        self.model = joblib.load(MODEL1_PATH)
+        self.label_encoder = joblib.load(LABEL_ENCODER_PATH)
+        self.lexicon = json.loads(SKILLS_PATH.read_text(encoding="utf-8"))
+        self.sim = SimilarityEngine(
+            lexical_similarity,
+            cache=EmbeddingCache(
+                max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+                disk_dir=Path(EMBEDDING_CACHE_DIR) if EMBEDDING_CACHE_DIR else None,
+                read_only=EMBEDDING_CACHE_READ_ONLY,
+            ),
+        )
         self.type_code = {
             "technical_skill": 0,
             "tool_or_platform": 1,
@@ -107,46 +201,33 @@ class Model1Service:
     def extract_competencies_with_types(self, text: str) -> list[dict[str, str]]:
         return competency_extractor.extract_with_types(text)
 
-    def _context_score(self, jd_text: str, skill: str) -> float:
-        text = jd_text.lower()
-        score = 0.0
-        for phrase, weight in CONTEXT_PATTERNS.items():
-            pattern = rf"{re.escape(phrase)}[^.\n]{{0,80}}{re.escape(skill)}|{re.escape(skill)}[^.\n]{{0,80}}{re.escape(phrase)}"
-            if re.search(pattern, text):
-                score = max(score, weight)
-        return float(score)
-
-    def _section_score(self, jd_text: str, skill: str) -> float:
-        text = jd_text.lower()
-        idx = text.find(skill.lower())
-        if idx == -1:
-            return 0.0
-        score = 0.4
-        for section, weight in SECTION_PATTERNS.items():
-            s_idx = text.find(section)
-            if s_idx != -1 and abs(idx - s_idx) < 700:
-                score = max(score, weight)
-        return float(score)
-
-    def _frequency_score(self, jd_text: str, skill: str) -> float:
-        count = len(re.findall(rf"\b{re.escape(skill.lower())}\b", jd_text.lower()))
-        return min(1.0, count / 4.0)
-
     def _build_features(
-        self, title: str, jd_text: str, skill: str, competency_type: str | None = None
+        self,
+        title: str,
+        jd_text: str,
+        skill: str,
+        competency_type: str | None = None,
+        index: _JDFeatureIndex | None = None,
+        similarities: tuple[float, float] | None = None,
     ) -> list[float]:
         ctype = competency_type or competency_normalizer.classify_competency_type(skill)
         type_code = float(self.type_code.get(ctype, self.type_code["discard"]))
+        index = index or _JDFeatureIndex(jd_text)
+        if similarities is None:
+            similarities = (
+                self.sim.similarity(title, skill),
+                self.sim.similarity(jd_text[:2500], skill),
+            )
         return [
-            self._context_score(jd_text, skill),
-            self._section_score(jd_text, skill),
-            self.sim.similarity(title, skill),
-            self.sim.similarity(jd_text[:2500], skill),
-            self._frequency_score(jd_text, skill),
+            index.context_score(skill),
+            index.section_score(skill),
+            float(similarities[0]),
+            float(similarities[1]),
+            index.frequency_score(skill),
             type_code,
         ]
 
-    def analyze_jd(self, title: str, jd_text: str) -> list[dict[str, Any]]:
+    def _candidate_skills(self, jd_text: str) -> list[tuple[str, str]]:
         typed = self.extract_competencies_with_types(jd_text)
         skills = [r["competency"] for r in typed if r.get("competency_type") != "discard"]
         competency_type_lookup = {r["competency"]: r["competency_type"] for r in typed}
@@ -157,37 +238,91 @@ class Model1Service:
         for generic, specific in suppression.items():
             if specific in skills and generic in skills:
                 skills.remove(generic)
-        if not skills:
-            return []
-
-        rows = []
-        for skill in skills:
-            ctype = competency_type_lookup.get(skill, competency_normalizer.classify_competency_type(skill))
-            feat = self._build_features(title, jd_text, skill, ctype)
-            pred_idx = int(self.model.predict([feat])[0])
-            pred_label = str(self.label_encoder.inverse_transform([pred_idx])[0])
-            score = None
-            if hasattr(self.model, "predict_proba"):
-                proba = self.model.predict_proba([feat])[0]
-                score = float(max(proba))
-            rows.append(
-                {
-                    "skill": skill,
-                    "competency": skill,
-                    "competency_type": ctype,
-                    "importance_label": pred_label,
-                    "importance_score": round(score, 4) if score is not None else None,
-                    "features": {
-                        "context_score": round(feat[0], 4),
-                        "section_score": round(feat[1], 4),
-                        "title_similarity": round(feat[2], 4),
-                        "semantic_similarity": round(feat[3], 4),
-                        "frequency_score": round(feat[4], 4),
-                        "competency_type_code": int(feat[5]),
-                    },
-                }
+        return [
+            (skill, competency_type_lookup.get(skill, competency_normalizer.classify_competency_type(skill)))
+            for skill in skills
+        ]
+
+    def _predict(self, features: list[list[float]]) -> tuple[np.ndarray, np.ndarray | None]:
+        """One model call for every feature row; labels decoded in a single vectorized pass."""
+        X = np.asarray(features, dtype=np.float64)
+        if hasattr(self.model, "predict_proba"):
+            proba = np.asarray(self.model.predict_proba(X))
+            pred_idx = proba.argmax(axis=1)
+            scores = proba.max(axis=1)
+        else:
+            pred_idx = np.asarray(self.model.predict(X)).astype(int).reshape(-1)
+            scores = None
+        labels = np.asarray(self.label_encoder.inverse_transform(pred_idx))
+        return labels, scores
+
+    def analyze_jds(self, jds: list[tuple[str, str]]) -> list[list[dict[str, Any]]]:
+        """
+        Batch analyze_jd over (title, jd_text) pairs: the skill rows of every JD are
+        stacked into one feature matrix and scored with a single model call.
+        """
+        candidates_per_jd = [self._candidate_skills(jd_text) for _, jd_text in jds]
+        if self.sim.model is not None:
+            # One MiniLM batch for every title, JD prefix and skill in the request.
+            self.sim.embed_many(
+                [
+                    t
+                    for (title, jd_text), candidates in zip(jds, candidates_per_jd)
+                    if candidates
+                    for t in (title, jd_text[:2500], *(skill for skill, _ in candidates))
+                    if t
+                ]
             )
-        return rows
+
+        per_jd: list[list[tuple[str, str, list[float]]]] = []
+        features: list[list[float]] = []
+        for (title, jd_text), candidates in zip(jds, candidates_per_jd):
+            entries = []
+            if candidates:
+                index = _JDFeatureIndex(jd_text)
+                sims = self.sim.similarity_columns(
+                    [title, jd_text[:2500]], [skill for skill, _ in candidates]
+                )
+                for (skill, ctype), sim_row in zip(candidates, sims):
+                    feat = self._build_features(
+                        title, jd_text, skill, ctype, index=index, similarities=tuple(sim_row)
+                    )
+                    entries.append((skill, ctype, feat))
+                    features.append(feat)
+            per_jd.append(entries)
+        if not features:
+            return [[] for _ in per_jd]
+
+        labels, scores = self._predict(features)
+        out: list[list[dict[str, Any]]] = []
+        k = 0
+        for entries in per_jd:
+            rows = []
+            for skill, ctype, feat in entries:
+                score = float(scores[k]) if scores is not None else None
+                rows.append(
+                    {
+                        "skill": skill,
+                        "competency": skill,
+                        "competency_type": ctype,
+                        "importance_label": str(labels[k]),
+                        "importance_score": round(score, 4) if score is not None else None,
+                        "features": {
+                            "context_score": round(feat[0], 4),
+                            "section_score": round(feat[1], 4),
+                            "title_similarity": round(feat[2], 4),
+                            "semantic_similarity": round(feat[3], 4),
+                            "frequency_score": round(feat[4], 4),
+                            "competency_type_code": int(feat[5]),
+                        },
+                    }
+                )
+                k += 1
+            out.append(rows)
+        return out
+
+    def analyze_jd(self, title: str, jd_text: str) -> list[dict[str, Any]]:
+        return self.analyze_jds([(title, jd_text)])[0]
 
 
-model1_service = Model1Service()
+model1_service = register("model1", Model1Service)
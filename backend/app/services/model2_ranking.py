@@ -0,0 +1,202 @@
+"""
+Vectorized Model 2 ranking: score one user against many jobs at once.
+
+Each job's Model 1 rows are compiled once (cached per job, invalidated when its
+analysis or posting changes) into sparse rows over a shared skill vocabulary. A
+ranking request then needs only the user's skill and token vectors: weighted
+skill overlap and missing-core counts are sparse mat-vec products, experience
+and lexical terms are array expressions, and top-k comes from argpartition.
+The arithmetic mirrors Model2Service.score_user_job term by term, so scores are
+identical; full explanations are computed with score_user_job for the k returned
+jobs only.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+
+from app import models
+from app.services.job_skills_store import jd_fingerprint, job_title_and_jd
+from app.services.model2_service import (
+    CORE_MISS_PENALTY,
+    EXPERIENCE_BLEND,
+    IMPORTANCE_WEIGHT,
+    LEXICAL_BLEND,
+    SKILL_BLEND,
+    _normalize_user_skills,
+    model2_service,
+)
+from services.tokenizer import TokenCache, TokenVocabulary, token_set
+
+
+@dataclass
+class _CompiledJob:
+    signature: tuple
+    skill_cols: np.ndarray  # one entry per analyzed row (duplicates kept, as in score_user_job)
+    weights: np.ndarray
+    is_core: np.ndarray
+    token_cols: np.ndarray  # sorted token ids of "title jd_text[:2000]"
+
+
+def job_description(job: models.Job) -> dict[str, Any]:
+    title, jd_text = job_title_and_jd(job)
+    return {
+        "title": title or "Untitled Job",
+        "jd_text": jd_text,
+        "required_experience": job.min_experience_years or 0,
+        "job_id": job.id,
+    }
+
+
+class Model2Ranker:
+    def __init__(self) -> None:
+        self._skill_ids: dict[str, int] = {}
+        self.tokens = TokenCache(TokenVocabulary())
+        self._jobs: dict[int, _CompiledJob] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(job: models.Job, rows: list[dict[str, Any]]) -> tuple:
+        return (job.jd_analysis_hash, job.jd_analysis_status, job.updated_at, len(rows))
+
+    def _compile(self, job: models.Job, desc: dict[str, Any], rows: list[dict[str, Any]]) -> _CompiledJob:
+        signature = self._signature(job, rows)
+        cached = self._jobs.get(job.id)
+        if cached is not None and cached.signature == signature:
+            return cached
+        cols, weights, core = [], [], []
+        for row in rows:
+            skill = str(row.get("skill") or row.get("competency") or "").strip()
+            if not skill:
+                continue
+            importance = str(row.get("importance_label") or "supporting")
+            cols.append(self._skill_ids.setdefault(skill.lower(), len(self._skill_ids)))
+            weights.append(IMPORTANCE_WEIGHT.get(importance, 1.0))
+            core.append(importance == "core")
+        title, jd_text = desc["title"], desc["jd_text"]
+        # Keyed by JD fingerprint: duplicate postings share one token array.
+        token_cols = self.tokens.get(jd_fingerprint(title, jd_text), f"{title} {jd_text[:2000]}")
+        compiled = _CompiledJob(
+            signature=signature,
+            skill_cols=np.asarray(cols, dtype=np.int64),
+            weights=np.asarray(weights, dtype=np.float64),
+            is_core=np.asarray(core, dtype=np.float64),
+            token_cols=token_cols,
+        )
+        self._jobs[job.id] = compiled
+        return compiled
+
+    def forget(self, job_id: int) -> None:
+        self._jobs.pop(job_id, None)
+
+    @staticmethod
+    def _csr(parts: list[np.ndarray], values: list[np.ndarray] | None, n_cols: int) -> sparse.csr_matrix:
+        indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=indptr[1:])
+        indices = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        data = np.concatenate(values) if values is not None and parts else np.ones(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(parts), max(n_cols, 1)))
+
+    def scores(
+        self,
+        user_profile: dict[str, Any],
+        jobs: list[models.Job],
+        analyzed_by_job: dict[int, list[dict[str, Any]]],
+    ) -> tuple[list[models.Job], list[dict[str, Any]], np.ndarray]:
+        """(ranked jobs, their job_description dicts, similarity_score per job) for jobs with rows."""
+        ranked_jobs = [job for job in jobs if analyzed_by_job.get(job.id) is not None]
+        descs = [job_description(job) for job in ranked_jobs]
+        with self._lock:
+            compiled = [
+                self._compile(job, desc, analyzed_by_job[job.id]) for job, desc in zip(ranked_jobs, descs)
+            ]
+            n_skills, n_tokens = len(self._skill_ids), len(self.tokens.vocabulary)
+            user_skill_cols = [
+                self._skill_ids[s]
+                for s in _normalize_user_skills(user_profile.get("skills") or [])
+                if s in self._skill_ids
+            ]
+            profile_text = " ".join(
+                [
+                    " ".join(str(x) for x in (user_profile.get("skills") or [])),
+                    str(user_profile.get("projects", "")),
+                    str(user_profile.get("certifications", "")),
+                    str(user_profile.get("education", "")),
+                ]
+            )
+            profile_tokens = token_set(profile_text)
+            user_token_cols = self.tokens.vocabulary.lookup(profile_tokens)
+        if not compiled:
+            return [], [], np.zeros(0)
+
+        skill_cols = [c.skill_cols for c in compiled]
+        W = self._csr(skill_cols, [c.weights for c in compiled], n_skills)
+        C = self._csr(skill_cols, [c.is_core for c in compiled], n_skills)
+        T = self._csr([c.token_cols for c in compiled], None, n_tokens)
+        u = np.zeros(W.shape[1])
+        u[user_skill_cols] = 1.0
+        ut = np.zeros(T.shape[1])
+        ut[user_token_cols] = 1.0
+
+        weighted_match = W @ u
+        total_weight = np.asarray(W.sum(axis=1)).ravel()
+        skill_ratio = np.divide(
+            weighted_match, total_weight, out=np.zeros_like(total_weight), where=total_weight > 0
+        )
+        missing_core = np.asarray(C.sum(axis=1)).ravel() - C @ u
+
+        required_exp = np.array([float(d["required_experience"] or 0) for d in descs])
+        user_exp = float(user_profile.get("experience", 0) or 0)
+        experience_gap = np.maximum(0.0, required_exp - user_exp)
+        experience_score = np.maximum(0.0, 1.0 - (experience_gap / 6.0))
+
+        overlap = T @ ut
+        job_token_counts = np.diff(T.indptr).astype(np.float64)
+        denom = np.sqrt(job_token_counts * len(profile_tokens))
+        lexical = np.divide(overlap, denom, out=np.zeros_like(overlap), where=denom > 0)
+
+        core_penalty = np.minimum(0.35, missing_core * CORE_MISS_PENALTY)
+        raw = (
+            SKILL_BLEND * skill_ratio
+            + EXPERIENCE_BLEND * experience_score
+            + LEXICAL_BLEND * lexical
+            - core_penalty
+        )
+        raw = np.clip(raw, 0.0, 1.0)
+        # Python round() (not np.round) so ties and values match score_user_job exactly.
+        similarity = np.array([round(x * 100, 2) for x in raw.tolist()])
+        return ranked_jobs, descs, similarity
+
+    def rank(
+        self,
+        user_profile: dict[str, Any],
+        jobs: list[models.Job],
+        analyzed_by_job: dict[int, list[dict[str, Any]]],
+        top_k: int,
+    ) -> list[tuple[models.Job, dict[str, Any]]]:
+        """
+        Top-k (job, score_user_job result) by similarity_score, ties in input order
+        (same as a stable sort of every job's score_user_job result).
+        """
+        ranked_jobs, descs, similarity = self.scores(user_profile, jobs, analyzed_by_job)
+        n = len(ranked_jobs)
+        if n == 0 or top_k <= 0:
+            return []
+        k = min(top_k, n)
+        kth = np.argpartition(-similarity, k - 1)[:k]
+        candidates = np.flatnonzero(similarity >= similarity[kth].min())
+        order = candidates[np.lexsort((candidates, -similarity[candidates]))][:k]
+        return [
+            (
+                ranked_jobs[i],
+                model2_service.score_user_job(user_profile, descs[i], analyzed_by_job[ranked_jobs[i].id]),
+            )
+            for i in order.tolist()
+        ]
+
+
+model2_ranker = Model2Ranker()
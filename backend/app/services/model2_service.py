@@ -6,11 +6,10 @@ Returns similarity_score (0–100), matched/missing skill lists, and experience
 """
 from __future__ import annotations
 
-import math
-import re
 from typing import Any, Optional
 
 from app.services.model1_service import model1_service
+from services.tokenizer import lexical_similarity
 
 IMPORTANCE_WEIGHT = {"core": 3.0, "important": 2.0, "supporting": 1.0, "optional": 0.5}
 
@@ -21,17 +20,6 @@ LEXICAL_BLEND = 0.08
 CORE_MISS_PENALTY = 0.08  # per missing core skill (capped below)
 
 
-def _token_set(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9\+\#\.]+", (text or "").lower()))
-
-
-def _lexical_similarity(a: str, b: str) -> float:
-    ta, tb = _token_set(a), _token_set(b)
-    if not ta or not tb:
-        return 0.0
-    return len(ta & tb) / math.sqrt(len(ta) * len(tb))
-
-
 def _normalize_user_skills(skills: list) -> set[str]:
     out = {str(s).lower().strip() for s in (skills or []) if str(s).strip()}
     if "spring boot" in out:
@@ -101,7 +89,7 @@ class Model2Service:
                 str(user_profile.get("education", "")),
             ]
         )
-        profile_job_similarity = _lexical_similarity(profile_text, f"{title} {jd_text[:2000]}")
+        profile_job_similarity = lexical_similarity(profile_text, f"{title} {jd_text[:2000]}")
 
         core_penalty = min(0.35, missing["core"] * CORE_MISS_PENALTY)
         raw = (
@@ -0,0 +1,193 @@
+"""
+Cached resume text and derived matching features of a UserProfile.
+
+The resume text, its content hash and the skill extraction result are stored on
+the profile at upload time; re-uploading a file with a known hash (from any
+profile) skips text and skill extraction. Derived features (normalized skill
+set, Model 2 profile dict, Doc2Vec profile text and vector) are stored in
+user_profiles.profile_features and recomputed only when their inputs change, so
+the matching endpoints neither re-parse the resume nor rebuild the profile.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Any
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.llm import extract_text_from_file
+from app.services.ml.career_ml import recommend_careers_knn_batch
+from app.services.ml.job_vectors import doc2vec_version, infer_unit_vector
+from app.services.model2_service import _normalize_user_skills
+from app.utils.user_profile_builder import build_doc2vec_profile_text, build_model2_user_profile
+
+
+def file_content_hash(path: str) -> str | None:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def find_cached_resume(db: Session, resume_hash: str) -> tuple[str, dict[str, Any] | None] | None:
+    """(resume_text, stored skill extraction or None) of any profile that uploaded these bytes."""
+    row = (
+        db.query(models.UserProfile.resume_text, models.UserProfile.resume_skills)
+        .filter(models.UserProfile.resume_hash == resume_hash, models.UserProfile.resume_text.isnot(None))
+        .first()
+    )
+    if row is None:
+        return None
+    skills_data = row.resume_skills if isinstance(row.resume_skills, dict) else None
+    if skills_data and (skills_data.get("error") or skills_data.get("warning")):
+        skills_data = None  # local fallback / failed Gemini call: retry extraction, keep the text
+    return row.resume_text, skills_data
+
+
+def _signature(profile: models.UserProfile) -> str:
+    payload = json.dumps(
+        [
+            profile.degree,
+            profile.course,
+            profile.total_cgpa,
+            profile.skills,
+            profile.extracted_skills,
+            profile.certifications,
+            profile.achievements,
+            profile.resume_hash,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _ensure_resume_text(profile: models.UserProfile) -> None:
+    """Profiles uploaded before resume caching: parse the stored file once and keep the text."""
+    if profile.resume_text is not None or not profile.resume_path:
+        return
+    profile.resume_text = extract_text_from_file(profile.resume_path) or ""
+    profile.resume_hash = file_content_hash(profile.resume_path)
+
+
+def refresh_profile_features(profile: models.UserProfile, doc2vec_model: Any = None) -> dict[str, Any]:
+    """
+    Recompute the stored features if the profile changed (caller commits). The
+    Doc2Vec vector is (re)inferred only when doc2vec_model is given.
+    """
+    _ensure_resume_text(profile)
+    signature = _signature(profile)
+    features = profile.profile_features if isinstance(profile.profile_features, dict) else {}
+    if features.get("signature") != signature:
+        model2 = build_model2_user_profile(profile)
+        features = {
+            "signature": signature,
+            "skills": sorted(_normalize_user_skills(model2["skills"])),
+            "model2": model2,
+            "doc2vec_text": build_doc2vec_profile_text(profile),
+            "doc2vec_version": None,
+        }
+        profile.doc2vec_vector = None
+    if doc2vec_model is not None and features.get("doc2vec_version") != doc2vec_version():
+        text = features["doc2vec_text"]
+        if text and len(text.strip()) >= 10:
+            profile.doc2vec_vector = infer_unit_vector(doc2vec_model, text).tobytes()
+            features = {**features, "doc2vec_version": doc2vec_version()}
+    if features is not profile.profile_features:
+        profile.profile_features = features
+    return features
+
+
+def get_profile_features(db: Session, profile: models.UserProfile, doc2vec_model: Any = None) -> dict[str, Any]:
+    """Stored features of profile, refreshing and committing them when stale."""
+    before = profile.profile_features
+    vector_before = profile.doc2vec_vector
+    features = refresh_profile_features(profile, doc2vec_model)
+    if features is not before or profile.doc2vec_vector is not vector_before:
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not persist profile features (run alembic upgrade head): {e}")
+    return features
+
+
+def profile_doc2vec_vector(profile: models.UserProfile) -> np.ndarray | None:
+    """Stored unit Doc2Vec vector of the profile text, or None when missing or from another model."""
+    features = profile.profile_features if isinstance(profile.profile_features, dict) else {}
+    if profile.doc2vec_vector is None or features.get("doc2vec_version") != doc2vec_version():
+        return None
+    return np.frombuffer(profile.doc2vec_vector, dtype=np.float32)
+
+
+def _career_skills(profile: models.UserProfile) -> list[str]:
+    skills = profile.skills if isinstance(profile.skills, list) else []
+    extracted = profile.extracted_skills if isinstance(profile.extracted_skills, list) else []
+    return skills + extracted
+
+
+def _store_careers(profile: models.UserProfile, top_k: int, results: list[dict[str, Any]]) -> None:
+    features = refresh_profile_features(profile)
+    profile.profile_features = {**features, "careers": {"top_k": top_k, "results": results}}
+
+
+def career_recommendations(db: Session, profile: models.UserProfile, top_k: int = 5) -> list[dict[str, Any]]:
+    """
+    KNN career recommendations for the profile: the stored (precomputed) list while
+    the profile is unchanged, otherwise computed now and stored.
+    """
+    features = get_profile_features(db, profile)
+    cached = features.get("careers")
+    if cached and cached.get("top_k", 0) >= top_k and cached.get("results"):
+        return cached["results"][:top_k]
+    results = recommend_careers_knn_batch([_career_skills(profile)], top_k)[0]
+    if results:
+        _store_careers(profile, top_k, results)
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not persist career recommendations: {e}")
+    return results
+
+
+def precompute_career_recommendations(
+    db: Session,
+    user_ids: list[int] | None = None,
+    top_k: int = 5,
+    batch_size: int = 1000,
+) -> dict[str, Any]:
+    """
+    Nightly job: recommend careers for every profile (or user_ids) in batches of
+    batch_size with one vectorized KNN call each, storing the results in
+    profile_features (dropped automatically when the profile changes).
+    """
+    start = time.perf_counter()
+    n = with_skills = 0
+    last_id = 0
+    while True:
+        q = db.query(models.UserProfile).filter(models.UserProfile.id > last_id)
+        if user_ids is not None:
+            q = q.filter(models.UserProfile.user_id.in_(user_ids))
+        profiles = q.order_by(models.UserProfile.id).limit(batch_size).all()
+        if not profiles:
+            break
+        last_id = profiles[-1].id
+        skills = [_career_skills(p) for p in profiles]
+        results = recommend_careers_knn_batch(skills, top_k)
+        for profile, user_skills, recs in zip(profiles, skills, results):
+            n += 1
+            if user_skills and recs:
+                with_skills += 1
+                _store_careers(profile, top_k, recs)
+        db.commit()
+        db.expunge_all()
+    return {"profiles": n, "with_skills": with_skills, "seconds": round(time.perf_counter() - start, 3)}
@@ -9,6 +9,7 @@ import google.generativeai as genai
 from chromadb.utils import embedding_functions
 
 from app.config import GEMINI_API_KEY, CHROMA_DIR
+from app.services.registry import register
 
 
 class GeminiEmbeddingFunction(embedding_functions.EmbeddingFunction):
@@ -200,4 +201,4 @@ class RAGService:
         self.collection = self._open_collection(self.collection_name)
 
 
-rag_service = RAGService()
+rag_service = register("rag", RAGService)
@@ -0,0 +1,91 @@
+"""
+Lazy service registry: heavy ML services are built on first use (or by the
+background warm-up started in app.main) instead of at import time, so endpoints
+that need no ML can serve as soon as the process starts.
+
+    model1_service = register("model1", Model1Service)
+    model1_service.analyze_jd(...)   # loads Model1Service on first attribute access
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+
+class LazyService:
+    """Proxy that builds its target once (thread-safe) and forwards attribute access."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]) -> None:
+        self._name = name
+        self._factory = factory
+        self._instance: Any = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._load_seconds: float | None = None
+        self._error: str | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        if self._instance is not None:
+            return self._instance
+        with self._lock:
+            if self._instance is None:
+                self._loading = True
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                    self._error = None
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+                finally:
+                    self._loading = False
+                    self._load_seconds = round(time.perf_counter() - start, 3)
+                print(f"Service {self._name!r} loaded in {self._load_seconds}s")
+        return self._instance
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "loading": self._loading,
+            "load_seconds": self._load_seconds,
+            "error": self._error,
+        }
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+
+_services: dict[str, LazyService] = {}
+
+
+def register(name: str, factory: Callable[[], Any]) -> LazyService:
+    if name not in _services:
+        _services[name] = LazyService(name, factory)
+    return _services[name]
+
+
+def warm_up(names: list[str] | None = None) -> None:
+    """Load services in registration order; failures are recorded, not raised."""
+    for name, service in list(_services.items()):
+        if names is not None and name not in names:
+            continue
+        try:
+            service.get()
+        except Exception as e:
+            print(f"Warning: warm-up of {name!r} failed: {e}")
+
+
+def start_background_warm_up(names: list[str] | None = None) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(names,), name="ml-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness() -> dict[str, Any]:
+    models = {name: service.status() for name, service in _services.items()}
+    return {"ready": all(m["loaded"] for m in models.values()), "models": models}
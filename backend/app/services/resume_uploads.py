@@ -0,0 +1,252 @@
+"""
+Background resume processing for /api/user/upload-resume.
+
+The endpoint copies the upload to disk in chunks off the event loop (hashing as
+it goes), records a resume_uploads row and returns its id at once. A thread pool
+then parses the file (large PDFs page-parallel across processes), runs skill
+extraction (Gemini or the local fallback) and updates the profile; clients poll
+GET /api/user/upload-resume/{upload_id} until status is "done" or "failed".
+Uploads left queued or mid-flight by a restart are resubmitted at start-up.
+"""
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    RESUME_MAX_BYTES,
+    RESUME_PARSE_WORKERS,
+    RESUME_PDF_PARALLEL_MIN_PAGES,
+    RESUME_PDF_PROCESSES,
+)
+from app.db import SessionLocal
+from app.services.llm import extract_skills, extract_text_from_file
+from app.services.profile_features import find_cached_resume, refresh_profile_features
+from app.utils.pdf_text import extract_pdf_text
+
+CHUNK_BYTES = 1024 * 1024
+_OPEN = ("queued", "parsing", "extracting")
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def save_upload_stream(src: BinaryIO, dest: str, max_bytes: int = RESUME_MAX_BYTES) -> str:
+    """Copy src to dest in chunks (temp file + rename), returning the sha256 of the bytes."""
+    h = hashlib.sha256()
+    size = 0
+    tmp = f"{dest}.part"
+    try:
+        with open(tmp, "wb") as out:
+            while True:
+                chunk = src.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Resume exceeds {max_bytes // (1024 * 1024)} MB")
+                h.update(chunk)
+                out.write(chunk)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return h.hexdigest()
+
+
+def _upload_response(skills_data: dict[str, Any]) -> dict[str, Any]:
+    response = {
+        "message": "Resume Uploaded Successfully",
+        "extracted_skills": {
+            "technical_skills": skills_data.get("technical_skills", []),
+            "soft_skills": skills_data.get("soft_skills", []),
+        },
+    }
+    if skills_data.get("warning"):
+        response["extraction_warning"] = skills_data["warning"]
+        response["message"] = "Resume uploaded. Skills extracted locally (Gemini quota unavailable)."
+    elif skills_data.get("error"):
+        response["extraction_error"] = skills_data["error"]
+        response["message"] = "Resume uploaded, but skill extraction had issues"
+    return response
+
+
+class ResumeUploadWorker:
+    def __init__(
+        self,
+        workers: int = RESUME_PARSE_WORKERS,
+        pdf_processes: int = RESUME_PDF_PROCESSES,
+        pdf_min_pages: int = RESUME_PDF_PARALLEL_MIN_PAGES,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.pdf_processes = max(0, pdf_processes)
+        self.pdf_min_pages = pdf_min_pages
+        self._executor: ThreadPoolExecutor | None = None
+        self._pdf_pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="resume-parse")
+            return self._executor
+
+    def _pdf_executor(self) -> ProcessPoolExecutor | None:
+        if self.pdf_processes <= 1:
+            return None
+        with self._lock:
+            if self._pdf_pool is None:
+                self._pdf_pool = ProcessPoolExecutor(
+                    max_workers=self.pdf_processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pdf_pool
+
+    def create(self, user_id: int, file_path: str, resume_hash: str) -> str:
+        """Record a queued upload and hand it to the pool; returns the upload id."""
+        upload_id = uuid.uuid4().hex
+        db = SessionLocal()
+        try:
+            db.add(
+                models.ResumeUpload(
+                    id=upload_id, user_id=user_id, status="queued", file_path=file_path, resume_hash=resume_hash
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+        self._pool().submit(self.process, upload_id)
+        return upload_id
+
+    def extract_text(self, file_path: str) -> str:
+        if Path(file_path).suffix.lower() == ".pdf":
+            try:
+                return extract_pdf_text(
+                    file_path, self._pdf_executor(), self.pdf_processes, self.pdf_min_pages
+                )
+            except Exception as e:
+                print(f"PDF extraction error: {e}")
+                return ""
+        return extract_text_from_file(file_path)
+
+    @staticmethod
+    def _set_status(db: Session, upload: models.ResumeUpload, status: str, **fields: Any) -> None:
+        upload.status = status
+        for key, value in fields.items():
+            setattr(upload, key, value)
+        db.commit()
+
+    def process(self, upload_id: str) -> None:
+        db = SessionLocal()
+        try:
+            upload = db.get(models.ResumeUpload, upload_id)
+            if upload is None or upload.status not in _OPEN:
+                return
+            self._set_status(db, upload, "parsing")
+            # Same bytes uploaded before (by anyone): reuse the stored text and skill extraction.
+            cached = find_cached_resume(db, upload.resume_hash) if upload.resume_hash else None
+            resume_text, skills_data = cached if cached else (None, None)
+            if resume_text is None:
+                resume_text = self.extract_text(upload.file_path)
+            if not resume_text or len(resume_text.strip()) < 10:
+                self._set_status(
+                    db,
+                    upload,
+                    "failed",
+                    error="Could not extract text from resume. Please ensure the file is a valid PDF or DOC file.",
+                )
+                return
+            if skills_data is None:
+                self._set_status(db, upload, "extracting")
+                skills_data = extract_skills(resume_text)
+
+            profile = db.query(models.UserProfile).filter(models.UserProfile.user_id == upload.user_id).first()
+            if profile:
+                profile.resume_path = upload.file_path
+                profile.resume_text = resume_text
+                profile.resume_hash = upload.resume_hash
+                profile.resume_skills = skills_data
+                # Combine technical and soft skills, filter out any error messages
+                all_skills = []
+                if skills_data.get("technical_skills"):
+                    all_skills.extend(skills_data["technical_skills"])
+                if skills_data.get("soft_skills"):
+                    all_skills.extend(skills_data["soft_skills"])
+                profile.extracted_skills = all_skills
+                refresh_profile_features(profile)
+            self._set_status(db, upload, "done", result=_upload_response(skills_data), error=None)
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: resume upload {upload_id} failed: {e}")
+            try:
+                upload = db.get(models.ResumeUpload, upload_id)
+                if upload is not None:
+                    self._set_status(db, upload, "failed", error=str(e))
+            except Exception:
+                db.rollback()
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Resubmit uploads a previous process accepted but did not finish."""
+        db = SessionLocal()
+        try:
+            ids = [
+                upload_id
+                for (upload_id,) in db.query(models.ResumeUpload.id)
+                .filter(models.ResumeUpload.status.in_(_OPEN))
+                .all()
+            ]
+            if ids:
+                db.query(models.ResumeUpload).filter(models.ResumeUpload.id.in_(ids)).update(
+                    {models.ResumeUpload.status: "queued"}, synchronize_session=False
+                )
+                db.commit()
+                print(f"Resubmitting {len(ids)} unfinished resume uploads")
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not recover resume uploads: {e}")
+            ids = []
+        finally:
+            db.close()
+        for upload_id in ids:
+            self._pool().submit(self.process, upload_id)
+
+    def stop(self) -> None:
+        with self._lock:
+            executor, pdf_pool = self._executor, self._pdf_pool
+            self._executor = self._pdf_pool = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if pdf_pool is not None:
+            pdf_pool.shutdown(wait=True, cancel_futures=True)
+
+    def status(self, db: Session, upload_id: str, user_id: int) -> dict[str, Any] | None:
+        upload = (
+            db.query(models.ResumeUpload)
+            .filter(models.ResumeUpload.id == upload_id, models.ResumeUpload.user_id == user_id)
+            .first()
+        )
+        if upload is None:
+            return None
+        return {
+            "upload_id": upload.id,
+            "status": upload.status,
+            "ready": upload.status == "done",
+            "result": upload.result,
+            "error": upload.error,
+            "created_at": upload.created_at,
+            "updated_at": upload.updated_at,
+        }
+
+
+resume_upload_worker = ResumeUploadWorker()
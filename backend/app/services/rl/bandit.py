@@ -1,23 +1,37 @@
 """
 RL (constrained contextual bandit): roadmap actions, epsilon-greedy over a masked
-action set, linear SGD updates. Uses app.config for RL_MODEL_PATH.
+action set, linear SGD updates. Theta is shared by all workers through the
+bandit_policies table (app.services.rl.policy_store) and checkpointed
+write-behind to RL_THETA_PATH (app.services.rl.checkpoint).
 
 State is 10-D; actions are 7 roadmap operations. Legacy arm names from older clients
 are mapped to the new vocabulary for policy updates.
 """
 from __future__ import annotations
 
-import os
-import pickle
 import random
+import threading
 from datetime import datetime
 from typing import Any, Mapping, Optional, Sequence, Union
 
 import numpy as np
 from sqlalchemy.orm import Session
 
-from app.config import RL_MODEL_PATH
-from app.models import JobInteraction, RewardLog
+from app.config import (
+    RL_CHECKPOINT_EVERY,
+    RL_CHECKPOINT_SECONDS,
+    RL_MODEL_PATH,
+    RL_POLICY_SYNC_SECONDS,
+    RL_SHARED_POLICY,
+    RL_SNAPSHOT_DIR,
+    RL_SNAPSHOTS_KEEP,
+    RL_THETA_PATH,
+)
+from app.models import RewardLog
+from app.services.registry import register
+from app.services.rl.checkpoint import ThetaCheckpointer
+from app.services.rl.policy_store import PolicyStore, PolicySync
+from app.services.rl.interaction_stats import interaction_stats
 
 STATE_DIM = 10
 
@@ -45,6 +59,9 @@ ACTIONS: tuple[str, ...] = (
     "SKIP_OPTIONAL_TASK",
 )
 
+MODEL_VERSION = "v3_constrained_bandit_7x10"
+POLICY_NAME = MODEL_VERSION  # bandit_policies row shared by all workers
+
 # Older API / stored values -> current arms (for update_policy & persisted logs).
 LEGACY_ACTION_MAP: dict[str, str] = {
     "RECOMMEND_NEXT": "KEEP_NEXT_TASK",
@@ -169,73 +186,96 @@ def get_valid_actions(
     return order_subset(base)
 
 
-def _interaction_difficulty_signal(i: JobInteraction) -> Optional[float]:
-    at = (i.action_type or "").strip()
-    if at == "too_hard":
-        return 0.2
-    if at == "too_easy":
-        return 0.8
-    if at == "complete":
-        return 0.5
-    if at in ("skip", "skip_regenerate"):
-        return 0.5
-    if at == "rate_difficulty" and i.difficulty_rating is not None:
-        r = int(i.difficulty_rating)
-        if r <= 2:
-            return 0.2
-        if r == 3:
-            return 0.5
-        return 0.8
-    return None
-
-
-def _norm_scope_tid(task_id: Optional[str]) -> str:
-    if task_id is None:
-        return ""
-    return str(task_id).strip()
-
-
 class RLService:
     def __init__(self, epsilon: float = 0.15, learning_rate: float = 0.1):
         self.epsilon = epsilon
         self.learning_rate = learning_rate
         self.actions = list(ACTIONS)
-        self.model_path = RL_MODEL_PATH
+        self.model_path = RL_THETA_PATH
+        self._lock = threading.Lock()  # theta updates vs checkpoint copies
+        self.checkpointer = ThetaCheckpointer(
+            RL_THETA_PATH,
+            RL_SNAPSHOT_DIR,
+            every_updates=RL_CHECKPOINT_EVERY,
+            every_seconds=RL_CHECKPOINT_SECONDS,
+            keep=RL_SNAPSHOTS_KEEP,
+        )
         self.load_model()
+        self._base = self.theta.copy()
+        self._delta = np.zeros_like(self.theta)  # local updates not yet merged into the shared policy
+        self._policy_version: Optional[int] = None
+        self.policy_sync: Optional[PolicySync] = None
+        if RL_SHARED_POLICY:
+            try:
+                sync = PolicySync(self, PolicyStore(POLICY_NAME), interval=RL_POLICY_SYNC_SECONDS)
+                sync.attach()
+                sync.start()
+                self.policy_sync = sync
+            except Exception as e:
+                print(f"Warning: shared bandit policy unavailable, using local weights only: {e}")
+        if self.policy_sync is not None:
+            self.checkpointer.attach(self._checkpoint_source, versioned=True)
+        else:
+            self.checkpointer.attach(self.theta_copy)
 
     def load_model(self) -> None:
         try:
-            if os.path.exists(self.model_path):
-                with open(self.model_path, "rb") as f:
-                    loaded = pickle.load(f)
-                if isinstance(loaded, np.ndarray) and loaded.shape == (len(self.actions), STATE_DIM):
-                    self.theta = loaded.astype(np.float64)
-                    print(f"RL Model loaded from {self.model_path}")
-                else:
-                    print(
-                        "RL checkpoint shape or type mismatch; initializing new weights "
-                        f"(expected ({len(self.actions)}, {STATE_DIM}))."
-                    )
-                    self._init_theta()
-            else:
-                self._init_theta()
-                print("No existing RL model found. Initializing new weights.")
+            loaded = self.checkpointer.load((len(self.actions), STATE_DIM), legacy_pickle=RL_MODEL_PATH)
         except Exception as e:
             print(f"Error loading RL model: {e}")
+            loaded = None
+        if loaded is not None:
+            self.theta = loaded
+            print(f"RL Model loaded from {self.model_path}")
+        else:
             self._init_theta()
+            print("No existing RL model found. Initializing new weights.")
 
     def _init_theta(self) -> None:
         rng = np.random.default_rng(42)
         self.theta = rng.random((len(self.actions), STATE_DIM)).astype(np.float64)
 
+    def theta_copy(self) -> np.ndarray:
+        with self._lock:
+            return self.theta.copy()
+
+    def _checkpoint_source(self) -> tuple[int, np.ndarray]:
+        """Shared policy: checkpoint the last merged version (identical in every worker)."""
+        with self._lock:
+            return int(self._policy_version or 0), self._base.copy()
+
     def save_model(self) -> None:
+        """Checkpoint theta now (normally left to the write-behind checkpointer)."""
         try:
-            with open(self.model_path, "wb") as f:
-                pickle.dump(self.theta, f)
-            print(f"RL Model saved to {self.model_path}")
+            version = self.checkpointer.flush()
+            print(f"RL Model saved to {self.model_path} (snapshot v{version})")
         except Exception as e:
             print(f"Error saving RL model: {e}")
 
+    def rollback(self, version: Optional[int] = None) -> Optional[int]:
+        """
+        Restore theta from a snapshot (default: the one before the newest) and
+        checkpoint it as a new version. Returns the restored version, or None.
+        """
+        snap = self.checkpointer.snapshot(version)
+        if snap is None or snap[1].shape != self.theta.shape:
+            return None
+        theta = snap[1]
+        policy_version = self.policy_sync.store.replace(theta) if self.policy_sync is not None else None
+        with self._lock:
+            self.theta = theta.copy()
+            self._base = theta
+            self._delta = np.zeros_like(theta)
+            self._policy_version = policy_version
+        self.checkpointer.flush()
+        return snap[0]
+
+    def close(self) -> None:
+        """Merge and checkpoint pending updates (app shutdown)."""
+        if self.policy_sync is not None:
+            self.policy_sync.stop()
+        self.checkpointer.stop()
+
     def _normalize_action(self, action: str) -> str:
         return normalize_action(action)
 
@@ -264,53 +304,10 @@ class RLService:
         scope_task_id: Optional[str] = None,
         scope_roadmap_id: Optional[int] = None,
     ) -> dict[str, float]:
-        q = db.query(JobInteraction).filter(JobInteraction.user_id == user_id)
-        if scope_roadmap_id is not None:
-            q = q.filter(JobInteraction.roadmap_id == scope_roadmap_id)
-        interactions = q.order_by(JobInteraction.timestamp.asc()).all()
-        if not interactions:
-            return {}
-
-        def _last_difficulty_feedback(entries: Sequence[JobInteraction]) -> float:
-            tail = list(entries)[-25:] if len(entries) > 25 else list(entries)
-            for i in reversed(tail):
-                sig = _interaction_difficulty_signal(i)
-                if sig is not None:
-                    return float(sig)
-            return 0.5
-
-        stid = _norm_scope_tid(scope_task_id)
-        if stid:
-            scoped = [i for i in interactions if _norm_scope_tid(i.task_id) == stid]
-            count_pool = scoped
-            recent = interactions[-15:] if len(interactions) > 15 else interactions
-            recent_skips = sum(
-                1
-                for i in recent
-                if i.action_type in ("skip", "skip_regenerate")
-                and _norm_scope_tid(i.task_id) == stid
-            )
-            skips = sum(1 for i in count_pool if i.action_type in ("skip", "skip_regenerate"))
-            completes = sum(1 for i in count_pool if i.action_type == "complete")
-            rdf = _last_difficulty_feedback(scoped if scoped else interactions)
-            return {
-                "recent_difficulty_feedback": rdf,
-                "skip_count_norm": _clamp01(skips / 10.0),
-                "completion_count_norm": _clamp01(completes / 10.0),
-                "regenerate_count_norm": _clamp01(recent_skips / 4.0),
-            }
-
-        recent = interactions[-15:] if len(interactions) > 15 else interactions
-        skips = sum(1 for i in interactions if i.action_type in ("skip", "skip_regenerate"))
-        completes = sum(1 for i in interactions if i.action_type == "complete")
-        recent_skips = sum(1 for i in recent if i.action_type in ("skip", "skip_regenerate"))
-
-        return {
-            "recent_difficulty_feedback": _last_difficulty_feedback(interactions),
-            "skip_count_norm": _clamp01(skips / 20.0),
-            "completion_count_norm": _clamp01(completes / 25.0),
-            "regenerate_count_norm": _clamp01(recent_skips / 5.0),
-        }
+        """Skip / completion / difficulty features from the per-user interaction aggregates."""
+        return interaction_stats(
+            db, user_id, scope_task_id=scope_task_id, scope_roadmap_id=scope_roadmap_id
+        )
 
     def _merge_roadmap_context(
         self,
@@ -353,7 +350,7 @@ class RLService:
         scope_roadmap_id: Optional[int] = None,
     ) -> np.ndarray:
         """
-        Build a 10-D context vector. Uses JobInteraction history when db is provided;
+        Build a 10-D context vector. Uses the interaction aggregates when db is provided;
         merges optional roadmap_context for phase/task/JD/skill features.
         When scope_task_id (+ optional scope_roadmap_id) is set, skip/completion/difficulty
         aggregates use interactions for that task (and roadmap) only.
@@ -427,26 +424,16 @@ class RLService:
         roadmap_context: Optional[Mapping[str, Any]] = None,
         state_vector: Optional[Union[Sequence[float], np.ndarray]] = None,
         interaction_id: Optional[int] = None,
+        commit: bool = True,
     ) -> None:
         """
         Linear contextual bandit update for one arm; compatible with legacy action names.
         If state_vector is provided (e.g. from RoadmapBanditDecision), use it for the update
-        so credit matches the context at decision time.
+        so credit matches the context at decision time. commit=False leaves the RewardLog
+        row in the caller's transaction.
         """
-        arm = self._normalize_action(action)
-        if arm not in self.actions:
-            arm = "KEEP_NEXT_TASK"
-
-        if state_vector is not None:
-            state = np.asarray(state_vector, dtype=np.float64).reshape(-1)
-            if state.shape[0] != STATE_DIM:
-                state = self.get_state(user_id, db, roadmap_context=roadmap_context)
-        else:
-            state = self.get_state(user_id, db, roadmap_context=roadmap_context)
-        action_idx = self.actions.index(arm)
-        prediction = float(np.dot(self.theta[action_idx], state))
-        error = float(reward) - prediction
-        self.theta[action_idx] += self.learning_rate * error * state
+        state = self.resolve_state(user_id, db, state_vector, roadmap_context=roadmap_context)
+        self.update_policy_batch([action], state.reshape(1, -1), [reward])
 
         if db is not None:
             db.add(
@@ -454,12 +441,58 @@ class RLService:
                     user_id=user_id,
                     interaction_id=interaction_id,
                     reward_value=reward,
-                    model_version="v3_constrained_bandit_7x10",
+                    model_version=MODEL_VERSION,
                     timestamp=datetime.utcnow(),
                 )
             )
-            db.commit()
-        self.save_model()
+            if commit:
+                db.commit()
+
+    def arm_index(self, action: str) -> int:
+        arm = self._normalize_action(action)
+        if arm not in self.actions:
+            arm = "KEEP_NEXT_TASK"
+        return self.actions.index(arm)
 
+    def resolve_state(
+        self,
+        user_id: int,
+        db: Optional[Session],
+        state_vector: Optional[Union[Sequence[float], np.ndarray]] = None,
+        roadmap_context: Optional[Mapping[str, Any]] = None,
+    ) -> np.ndarray:
+        """Stored decision-time state when valid, else the user's current state."""
+        if state_vector is not None:
+            state = np.asarray(state_vector, dtype=np.float64).reshape(-1)
+            if state.shape[0] == STATE_DIM:
+                return state
+        return self.get_state(user_id, db, roadmap_context=roadmap_context)
 
-rl_service = RLService()
+    def update_policy_batch(
+        self,
+        actions: Sequence[str],
+        states: np.ndarray,
+        rewards: Sequence[float],
+    ) -> None:
+        """
+        One vectorized SGD step for a batch of (arm, state, reward): every error is
+        taken against theta before the batch and each arm moves by the mean of its
+        samples' gradients (summing them would overshoot once an arm has several
+        rewards in one batch). A batch of one is exactly the single-sample update.
+        """
+        if not len(actions):
+            return
+        idx = np.fromiter((self.arm_index(a) for a in actions), dtype=np.intp, count=len(actions))
+        states = np.asarray(states, dtype=np.float64).reshape(len(idx), STATE_DIM)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        with self._lock:
+            errors = rewards - np.einsum("ij,ij->i", self.theta[idx], states)
+            step = np.zeros_like(self.theta)
+            np.add.at(step, idx, (self.learning_rate * errors)[:, None] * states)
+            step /= np.maximum(np.bincount(idx, minlength=len(self.actions)), 1)[:, None]
+            self.theta += step
+            self._delta += step
+        self.checkpointer.mark_dirty(len(idx))
+
+
+rl_service = register("rl_bandit", RLService)
@@ -0,0 +1,209 @@
+"""
+Write-behind checkpoints of the bandit weights (theta).
+
+update_policy only marks theta dirty; a background thread writes it every
+RL_CHECKPOINT_EVERY updates or RL_CHECKPOINT_SECONDS, whichever comes first,
+and on shutdown. Every write is a .npy file (np.save, no pickle) written to a
+temporary name, fsynced and renamed over the target, so readers never see a
+torn file. Each checkpoint is also kept as a numbered snapshot under
+RL_SNAPSHOT_DIR (the newest RL_SNAPSHOTS_KEEP) for rollback:
+
+    rl_snapshots/theta_v000042.npy
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+_SNAPSHOT_RE = re.compile(r"^theta_v(\d+)\.npy$")
+
+
+def write_array_atomic(path: Path, array: np.ndarray) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_array(path: Path, shape: tuple[int, ...]) -> np.ndarray | None:
+    """float64 array from a .npy file, or None when missing, unreadable or of another shape."""
+    try:
+        arr = np.load(path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if arr.shape != shape:
+        return None
+    return arr.astype(np.float64)
+
+
+class ThetaCheckpointer:
+    def __init__(
+        self,
+        path: str,
+        snapshot_dir: str,
+        every_updates: int = 50,
+        every_seconds: float = 30.0,
+        keep: int = 20,
+    ) -> None:
+        self.path = Path(path)
+        self.snapshot_dir = Path(snapshot_dir)
+        self.every_updates = max(1, every_updates)
+        self.every_seconds = max(0.1, every_seconds)
+        self.keep = max(1, keep)
+        self._source: Callable[[], Any] | None = None
+        self._versioned = False
+        self._pending = 0
+        self._lock = threading.Lock()  # _pending, thread start/stop
+        self._flush_lock = threading.Lock()  # one writer at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._version = max((v for v, _ in self.snapshots()), default=0)
+        self._flushes = 0
+        self._last_flush: float | None = None
+        self._last_error: str | None = None
+
+    def attach(self, source: Callable[[], Any], versioned: bool = False) -> None:
+        """
+        source returns a consistent copy of theta (called from the writer thread),
+        or (version, theta) when versioned: snapshots then carry that version
+        (the shared policy version) instead of a local counter.
+        """
+        self._source = source
+        self._versioned = versioned
+
+    def snapshots(self) -> list[tuple[int, Path]]:
+        """(version, path) of the kept snapshots, oldest first."""
+        if not self.snapshot_dir.is_dir():
+            return []
+        out = []
+        for p in self.snapshot_dir.iterdir():
+            m = _SNAPSHOT_RE.match(p.name)
+            if m:
+                out.append((int(m.group(1)), p))
+        return sorted(out)
+
+    def load(self, shape: tuple[int, ...], legacy_pickle: str | None = None) -> np.ndarray | None:
+        """
+        Current checkpoint; if it is missing or unreadable, the newest valid
+        snapshot; then the legacy pickled theta (converted on the next flush).
+        """
+        arr = read_array(self.path, shape)
+        if arr is not None:
+            return arr
+        for version, p in reversed(self.snapshots()):
+            arr = read_array(p, shape)
+            if arr is not None:
+                print(f"RL checkpoint {self.path} unreadable; using snapshot v{version}")
+                return arr
+        if legacy_pickle and os.path.exists(legacy_pickle):
+            with open(legacy_pickle, "rb") as f:
+                loaded = pickle.load(f)
+            if isinstance(loaded, np.ndarray) and loaded.shape == shape:
+                print(f"RL weights loaded from legacy {legacy_pickle}; saving as {self.path}")
+                self.mark_dirty()
+                return loaded.astype(np.float64)
+        return None
+
+    def snapshot(self, version: int | None = None) -> tuple[int, np.ndarray] | None:
+        """(version, theta) of a snapshot; default: the one before the newest."""
+        snaps = self.snapshots()
+        if version is None:
+            if len(snaps) < 2:
+                return None
+            version, p = snaps[-2]
+        else:
+            p = dict(snaps).get(version)
+            if p is None:
+                return None
+        return version, np.load(p, allow_pickle=False).astype(np.float64)
+
+    def mark_dirty(self, n: int = 1) -> None:
+        """Record n theta updates; wakes the writer once every_updates have accumulated."""
+        with self._lock:
+            self._pending += n
+            due = self._pending >= self.every_updates
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="rl-checkpoint", daemon=True)
+                self._thread.start()
+        if due:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.every_seconds)
+            self._wake.clear()
+            if self._pending:
+                try:
+                    self.flush()
+                except Exception as e:
+                    self._last_error = str(e)
+                    print(f"Error saving RL checkpoint: {e}")
+
+    def flush(self) -> int | None:
+        """Write theta now (checkpoint + new snapshot); returns the snapshot version."""
+        if self._source is None:
+            return None
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, 0
+            try:
+                if self._versioned:
+                    version, theta = self._source()
+                else:
+                    version, theta = self._version + 1, self._source()
+                write_array_atomic(self.path, theta)
+                write_array_atomic(self.snapshot_dir / f"theta_v{version:06d}.npy", theta)
+                self._version = version
+            except BaseException:
+                with self._lock:
+                    self._pending += pending
+                raise
+            for _, p in self.snapshots()[: -self.keep]:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            self._flushes += 1
+            self._last_flush = time.time()
+            self._last_error = None
+            return self._version
+
+    def stop(self) -> None:
+        """Stop the writer thread and flush pending updates (shutdown)."""
+        with self._lock:
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=10)
+        if self._pending:
+            self.flush()
+        self._stop.clear()  # a later update starts a new writer (e.g. app restarted in-process)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "version": self._version,
+            "pending_updates": self._pending,
+            "flushes": self._flushes,
+            "last_flush": self._last_flush,
+            "last_error": self._last_error,
+            "snapshots": [v for v, _ in self.snapshots()],
+        }
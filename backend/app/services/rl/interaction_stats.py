@@ -0,0 +1,230 @@
+"""
+Incremental per-user interaction aggregates for the bandit state.
+
+RLService.get_state used to load a user's whole JobInteraction history (per
+roadmap when scoped) on every request. Instead, each logged interaction updates
+up to four interaction_aggregates rows in the same transaction: user-wide,
+per roadmap, per task, and per roadmap + task (roadmap_key 0 / task_key "" mean
+"all"). Each row keeps counters, its own interaction ordinal and the ordinal of
+the last difficulty signal. Rows covering all tasks also keep the last
+RECENT_WINDOW (task, skipped) pairs. The state features are then rebuilt from
+one or two rows, with the same windows as the history scan they replace.
+
+A user's rows are rebuilt from JobInteraction history the first time they are
+needed (interactions logged before this table existed).
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import InteractionAggregate, JobInteraction
+
+RECENT_WINDOW = 15  # recent skips: last 15 interactions of the scope
+SIGNAL_WINDOW = 25  # recent difficulty feedback: last signal within the last 25 interactions
+SKIP_ACTIONS = ("skip", "skip_regenerate")
+
+
+def difficulty_signal(action_type: Optional[str], difficulty_rating: Optional[int]) -> Optional[float]:
+    at = (action_type or "").strip()
+    if at == "too_hard":
+        return 0.2
+    if at == "too_easy":
+        return 0.8
+    if at == "complete":
+        return 0.5
+    if at in SKIP_ACTIONS:
+        return 0.5
+    if at == "rate_difficulty" and difficulty_rating is not None:
+        r = int(difficulty_rating)
+        if r <= 2:
+            return 0.2
+        if r == 3:
+            return 0.5
+        return 0.8
+    return None
+
+
+def task_key(task_id: Optional[str]) -> str:
+    return "" if task_id is None else str(task_id).strip()
+
+
+def _scope_keys(roadmap_id: Optional[int], tkey: str) -> list[tuple[int, str]]:
+    keys = [(0, "")]
+    if tkey:
+        keys.append((0, tkey))
+    if roadmap_id is not None:
+        keys.append((roadmap_id, ""))
+        if tkey:
+            keys.append((roadmap_id, tkey))
+    return keys
+
+
+def _apply(row: InteractionAggregate, interaction: JobInteraction, tkey: str) -> None:
+    at = interaction.action_type
+    row.interaction_count = (row.interaction_count or 0) + 1
+    if at in SKIP_ACTIONS:
+        row.skip_count = (row.skip_count or 0) + 1
+    if at == "skip_regenerate":
+        row.regenerate_count = (row.regenerate_count or 0) + 1
+    if at == "complete":
+        row.complete_count = (row.complete_count or 0) + 1
+    if at == "too_hard":
+        row.too_hard_count = (row.too_hard_count or 0) + 1
+    sig = difficulty_signal(at, interaction.difficulty_rating)
+    if sig is not None:
+        row.last_difficulty_signal = sig
+        row.last_signal_index = row.interaction_count
+    if row.task_key == "":
+        recent = list(row.recent or [])
+        recent.append([tkey, 1 if at in SKIP_ACTIONS else 0])
+        row.recent = recent[-RECENT_WINDOW:]
+    row.updated_at = datetime.utcnow()
+
+
+def _new_row(user_id: int, roadmap_key: int, tkey: str) -> InteractionAggregate:
+    return InteractionAggregate(
+        user_id=user_id,
+        roadmap_key=roadmap_key,
+        task_key=tkey,
+        interaction_count=0,
+        skip_count=0,
+        complete_count=0,
+        regenerate_count=0,
+        too_hard_count=0,
+        recent=[] if tkey == "" else None,
+    )
+
+
+def rebuild_user(db: Session, user_id: int) -> None:
+    """Replace the user's aggregate rows with a replay of their JobInteraction history (caller commits)."""
+    db.query(InteractionAggregate).filter(InteractionAggregate.user_id == user_id).delete(
+        synchronize_session=False
+    )
+    rows: dict[tuple[int, str], InteractionAggregate] = {}
+    history = (
+        db.query(JobInteraction)
+        .filter(JobInteraction.user_id == user_id)
+        .order_by(JobInteraction.timestamp.asc(), JobInteraction.id.asc())
+        .yield_per(1000)
+    )
+    for interaction in history:
+        tkey = task_key(interaction.task_id)
+        for key in _scope_keys(interaction.roadmap_id, tkey):
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = _new_row(user_id, *key)
+            _apply(row, interaction, tkey)
+    db.add_all(rows.values())
+    db.flush()
+
+
+def record_interaction(db: Session, interaction: JobInteraction) -> None:
+    """
+    Fold one new (flushed) interaction into its scopes' rows, locking them
+    (SELECT ... FOR UPDATE where supported). Runs in the caller's transaction.
+    """
+    user_id = interaction.user_id
+    tkey = task_key(interaction.task_id)
+    keys = _scope_keys(interaction.roadmap_id, tkey)
+    existing = {
+        (r.roadmap_key, r.task_key): r
+        for r in db.query(InteractionAggregate)
+        .filter(
+            InteractionAggregate.user_id == user_id,
+            InteractionAggregate.roadmap_key.in_({k[0] for k in keys}),
+            InteractionAggregate.task_key.in_({k[1] for k in keys}),
+        )
+        .with_for_update()
+        .all()
+    }
+    if (0, "") not in existing:
+        # First aggregate for this user: replay the whole history (includes this interaction).
+        rebuild_user(db, user_id)
+        return
+    for key in keys:
+        row = existing.get(key)
+        if row is None:
+            row = _new_row(user_id, *key)
+            db.add(row)
+        _apply(row, interaction, tkey)
+    db.flush()
+
+
+def _recent_signal(row: InteractionAggregate) -> float:
+    if row.last_signal_index is None or row.interaction_count - row.last_signal_index >= SIGNAL_WINDOW:
+        return 0.5
+    return float(row.last_difficulty_signal)
+
+
+def _load_rows(db: Session, user_id: int, roadmap_key: int, tkey: str) -> dict[tuple[int, str], InteractionAggregate]:
+    keys = {(roadmap_key, "")} | ({(roadmap_key, tkey)} if tkey else set())
+    rows = (
+        db.query(InteractionAggregate)
+        .filter(
+            InteractionAggregate.user_id == user_id,
+            InteractionAggregate.roadmap_key == roadmap_key,
+            InteractionAggregate.task_key.in_({k[1] for k in keys}),
+        )
+        .all()
+    )
+    return {(r.roadmap_key, r.task_key): r for r in rows}
+
+
+def _needs_backfill(db: Session, user_id: int) -> bool:
+    """User has interactions but no aggregate rows yet (history from before the table)."""
+    has_rows = db.query(InteractionAggregate.id).filter(
+        InteractionAggregate.user_id == user_id,
+        InteractionAggregate.roadmap_key == 0,
+        InteractionAggregate.task_key == "",
+    ).first()
+    if has_rows is not None:
+        return False
+    return db.query(JobInteraction.id).filter(JobInteraction.user_id == user_id).first() is not None
+
+
+def _clamp01(x: float) -> float:
+    return float(max(0.0, min(1.0, x)))
+
+
+def interaction_stats(
+    db: Session,
+    user_id: int,
+    scope_task_id: Optional[str] = None,
+    scope_roadmap_id: Optional[int] = None,
+) -> dict[str, float]:
+    """
+    Skip / completion / regenerate / difficulty features for get_state from the
+    aggregate rows ({} when the scope has no interactions).
+    """
+    roadmap_key = scope_roadmap_id if scope_roadmap_id is not None else 0
+    tkey = task_key(scope_task_id)
+    rows = _load_rows(db, user_id, roadmap_key, tkey)
+    if (roadmap_key, "") not in rows and _needs_backfill(db, user_id):
+        rebuild_user(db, user_id)
+        db.commit()
+        rows = _load_rows(db, user_id, roadmap_key, tkey)
+    pool = rows.get((roadmap_key, ""))
+    if pool is None or not pool.interaction_count:
+        return {}
+
+    if tkey:
+        task = rows.get((roadmap_key, tkey))
+        recent_skips = sum(flag for t, flag in (pool.recent or []) if t == tkey)
+        return {
+            "recent_difficulty_feedback": _recent_signal(task if task is not None else pool),
+            "skip_count_norm": _clamp01((task.skip_count if task else 0) / 10.0),
+            "completion_count_norm": _clamp01((task.complete_count if task else 0) / 10.0),
+            "regenerate_count_norm": _clamp01(recent_skips / 4.0),
+        }
+
+    recent_skips = sum(flag for _, flag in (pool.recent or []))
+    return {
+        "recent_difficulty_feedback": _recent_signal(pool),
+        "skip_count_norm": _clamp01(pool.skip_count / 20.0),
+        "completion_count_norm": _clamp01(pool.complete_count / 25.0),
+        "regenerate_count_norm": _clamp01(recent_skips / 5.0),
+    }
+
@@ -0,0 +1,220 @@
+"""
+Offline replay training of the 7x10 linear bandit from logged decisions.
+
+RoadmapBanditDecision rows with a reward are read in id-ordered chunks into
+NumPy arrays (state, arm, reward and the get_valid_actions mask of the row's
+feedback type). They are then replayed through the same squared-error SGD
+update as RLService.update_policy_batch, in shuffled mini-batches over several
+epochs with an optional learning-rate decay. Rows whose logged arm is outside
+their mask are skipped. Per-arm updates of a mini-batch are one
+(arms x batch) @ (batch x features) product, so millions of rows train in
+seconds.
+
+evaluate() reports the reward-prediction MSE on the logged arms and the replay
+estimate of the greedy masked policy: mean logged reward over the rows where
+the greedy arm equals the logged arm.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import RoadmapBanditDecision
+from app.services.rl.bandit import ACTIONS, STATE_DIM, STATE_FEATURE_NAMES, normalize_action
+
+_ARM = {a: i for i, a in enumerate(ACTIONS)}
+_FEEDBACK_CODES = {"complete": 1, "too_hard": 2, "too_easy": 3, "skip_regenerate": 4, "skip": 4}
+_JD, _USER_MATCH = STATE_FEATURE_NAMES.index("jd_importance_score"), STATE_FEATURE_NAMES.index("user_skill_match_score")
+
+
+def _arm_mask(*arms: str) -> np.ndarray:
+    m = np.zeros(len(ACTIONS), dtype=bool)
+    m[[_ARM[a] for a in arms]] = True
+    return m
+
+
+def feedback_code(feedback_type: Optional[str]) -> int:
+    return _FEEDBACK_CODES.get((feedback_type or "").strip().lower(), 0)
+
+
+def valid_action_mask(feedback_codes: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """(N, 7) boolean mask; row i equals get_valid_actions(feedback_i, states[i])."""
+    n = len(feedback_codes)
+    jd = np.clip(states[:, _JD], 0.0, 1.0)
+    um = np.clip(states[:, _USER_MATCH], 0.0, 1.0)
+    skip = _ARM["SKIP_OPTIONAL_TASK"]
+    mask = np.ones((n, len(ACTIONS)), dtype=bool)
+    mask[:, skip] = jd < 0.7  # no / other feedback: every arm, SKIP only for low-JD tasks
+
+    rows = feedback_codes == 1
+    mask[rows] = _arm_mask("KEEP_NEXT_TASK")
+    rows = feedback_codes == 2
+    mask[rows] = _arm_mask("ADD_PREREQUISITE_TASK", "DECREASE_DIFFICULTY", "REORDER_NEARBY_TASK", "REPEAT_WITH_VARIATION")
+    rows = feedback_codes == 3
+    mask[rows] = _arm_mask("INCREASE_DIFFICULTY", "KEEP_NEXT_TASK", "REPEAT_WITH_VARIATION")
+    mask[rows, skip] = (jd < 0.7)[rows] & (um >= 0.8)[rows]
+    rows = feedback_codes == 4
+    mask[rows] = _arm_mask("REPEAT_WITH_VARIATION", "DECREASE_DIFFICULTY", "ADD_PREREQUISITE_TASK", "REORDER_NEARBY_TASK")
+    mask[rows, skip] = (jd < 0.7)[rows]
+    return mask
+
+
+@dataclass
+class ReplayData:
+    states: np.ndarray  # (N, STATE_DIM) float64
+    arms: np.ndarray  # (N,) intp, logged arm
+    rewards: np.ndarray  # (N,) float64
+    masks: np.ndarray  # (N, 7) bool, valid arms at decision time
+
+    def __len__(self) -> int:
+        return len(self.arms)
+
+    @classmethod
+    def from_arrays(cls, states: np.ndarray, arms: np.ndarray, rewards: np.ndarray, feedback_codes: np.ndarray) -> "ReplayData":
+        """Masks from the feedback codes; rows whose logged arm is masked out are dropped."""
+        states = np.asarray(states, dtype=np.float64).reshape(-1, STATE_DIM)
+        arms = np.asarray(arms, dtype=np.intp)
+        masks = valid_action_mask(np.asarray(feedback_codes), states)
+        keep = masks[np.arange(len(arms)), arms]
+        return cls(states[keep], arms[keep], np.asarray(rewards, dtype=np.float64)[keep], masks[keep])
+
+
+def _state_row(state_vector: Any) -> Optional[list[float]]:
+    if isinstance(state_vector, dict):
+        return [float(state_vector.get(name, 0.5)) for name in STATE_FEATURE_NAMES]
+    if isinstance(state_vector, (list, tuple)) and len(state_vector) == STATE_DIM:
+        return [float(v) for v in state_vector]
+    return None
+
+
+def iter_decision_chunks(db: Session, chunk_size: int = 50_000, limit: Optional[int] = None) -> Iterable[list[tuple]]:
+    """Rewarded decisions as (selected_action, feedback_type, state_vector, reward_value) tuples, keyset-paged by id."""
+    D = RoadmapBanditDecision
+    last_id, seen = 0, 0
+    while limit is None or seen < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - seen)
+        rows = (
+            db.query(D.id, D.selected_action, D.feedback_type, D.state_vector, D.reward_value)
+            .filter(D.id > last_id, D.reward_value.isnot(None))
+            .order_by(D.id)
+            .limit(size)
+            .all()
+        )
+        if not rows:
+            return
+        last_id = rows[-1].id
+        seen += len(rows)
+        yield [tuple(r)[1:] for r in rows]
+
+
+def load_decisions(db: Session, chunk_size: int = 50_000, limit: Optional[int] = None) -> tuple[ReplayData, dict[str, int]]:
+    states: list[list[float]] = []
+    arms: list[int] = []
+    rewards: list[float] = []
+    codes: list[int] = []
+    read = bad_state = 0
+    for chunk in iter_decision_chunks(db, chunk_size, limit):
+        read += len(chunk)
+        for action, feedback_type, state_vector, reward in chunk:
+            row = _state_row(state_vector)
+            if row is None:
+                bad_state += 1
+                continue
+            states.append(row)
+            arms.append(_ARM[normalize_action(action)])
+            rewards.append(float(reward))
+            codes.append(feedback_code(feedback_type))
+    data = ReplayData.from_arrays(
+        np.array(states, dtype=np.float64).reshape(-1, STATE_DIM),
+        np.array(arms, dtype=np.intp),
+        np.array(rewards, dtype=np.float64),
+        np.array(codes, dtype=np.int8),
+    )
+    return data, {"rows_read": read, "bad_state": bad_state, "masked_out": len(states) - len(data), "rows_used": len(data)}
+
+
+def evaluate(theta: np.ndarray, data: ReplayData) -> dict[str, float]:
+    if not len(data):
+        return {"rows": 0, "mse": 0.0, "replay_value": 0.0, "replay_match_rate": 0.0}
+    scores = data.states @ theta.T
+    pred = scores[np.arange(len(data)), data.arms]
+    greedy = np.where(data.masks, scores, -np.inf).argmax(axis=1)
+    match = greedy == data.arms
+    return {
+        "rows": int(len(data)),
+        "mse": float(np.mean((data.rewards - pred) ** 2)),
+        "replay_value": float(data.rewards[match].mean()) if match.any() else 0.0,
+        "replay_match_rate": float(match.mean()),
+    }
+
+
+def train(
+    theta: np.ndarray,
+    data: ReplayData,
+    epochs: int = 5,
+    learning_rate: float = 0.1,
+    decay: float = 1.0,
+    batch_size: int = 256,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Mini-batch SGD replay (errors against theta at the start of each batch, like
+    update_policy_batch) with the per-arm gradient averaged over the batch and
+    step learning_rate * decay**epoch.
+    """
+    theta = np.array(theta, dtype=np.float64, copy=True)
+    n = len(data)
+    if not n:
+        return theta
+    rng = np.random.default_rng(seed)
+    onehot_eye = np.eye(theta.shape[0])
+    batch_size = max(1, batch_size)
+    for epoch in range(epochs):
+        lr = learning_rate * decay**epoch
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            idx = order[start : start + batch_size]
+            s, a = data.states[idx], data.arms[idx]
+            errors = data.rewards[idx] - np.einsum("ij,ij->i", theta[a], s)
+            theta += (lr / len(idx)) * (onehot_eye[a].T @ (errors[:, None] * s))
+    return theta
+
+
+def synthetic_decisions(n: int, seed: int = 0) -> ReplayData:
+    """Random logged decisions from a hidden linear reward model (benchmarks)."""
+    rng = np.random.default_rng(seed)
+    states = rng.random((n, STATE_DIM))
+    codes = rng.integers(0, 5, n)
+    masks = valid_action_mask(codes, states)
+    # Uniform logging policy over each row's valid arms.
+    arms = (rng.random((n, len(ACTIONS))) * masks).argmax(axis=1)
+    true_theta = rng.normal(0.0, 0.5, (len(ACTIONS), STATE_DIM))
+    rewards = np.einsum("ij,ij->i", true_theta[arms], states) + rng.normal(0.0, 0.1, n)
+    return ReplayData(states, arms.astype(np.intp), rewards, masks)
+
+
+def run(
+    theta: np.ndarray,
+    data: ReplayData,
+    epochs: int = 5,
+    learning_rate: float = 0.1,
+    decay: float = 1.0,
+    batch_size: int = 256,
+    seed: int = 0,
+) -> tuple[np.ndarray, dict[str, Any]]:
+    """Train and return (new theta, {before, after, seconds})."""
+    before = evaluate(theta, data)
+    start = time.perf_counter()
+    new_theta = train(theta, data, epochs, learning_rate, decay, batch_size, seed)
+    seconds = time.perf_counter() - start
+    return new_theta, {
+        "before": before,
+        "after": evaluate(new_theta, data),
+        "train_seconds": round(seconds, 3),
+        "rows_per_second": int(len(data) * epochs / seconds) if seconds > 0 else None,
+    }
+
@@ -0,0 +1,220 @@
+"""
+Bandit weights shared by every uvicorn worker through the database.
+
+Each worker serves from its own copy of theta = base + delta:
+
+    base   theta of the bandit_policies row at the version last seen
+    delta  this worker's SGD updates not yet merged into the row
+
+PolicySync runs a background thread every RL_POLICY_SYNC_SECONDS (and on
+shutdown). It pushes the delta as row theta + delta with an optimistic
+compare-and-set on version, re-reading and retrying on conflict. When the
+worker has no updates, it just pulls a newer version. Updates from all workers
+are therefore summed into the shared policy instead of the last writer
+overwriting the others. Between syncs, recommendations use the cached local
+copy.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from app.db import SessionLocal
+from app.models import BanditPolicy
+
+
+class PolicyStore:
+    """bandit_policies row access; every call uses its own short session."""
+
+    def __init__(self, name: str, session_factory: Callable[[], Any] = SessionLocal) -> None:
+        self.name = name
+        self._session_factory = session_factory
+
+    def read(self) -> tuple[int, np.ndarray] | None:
+        db = self._session_factory()
+        try:
+            row = db.get(BanditPolicy, self.name)
+            if row is None:
+                return None
+            theta = np.frombuffer(row.theta, dtype=np.float64).reshape(row.rows, row.cols).copy()
+            return row.version, theta
+        finally:
+            db.close()
+
+    def version(self) -> int | None:
+        db = self._session_factory()
+        try:
+            return db.query(BanditPolicy.version).filter(BanditPolicy.name == self.name).scalar()
+        finally:
+            db.close()
+
+    def create(self, theta: np.ndarray) -> tuple[int, np.ndarray]:
+        """Insert the policy at version 1 unless another worker already did; returns the stored row."""
+        db = self._session_factory()
+        try:
+            db.add(
+                BanditPolicy(
+                    name=self.name,
+                    version=1,
+                    rows=theta.shape[0],
+                    cols=theta.shape[1],
+                    theta=np.ascontiguousarray(theta, dtype=np.float64).tobytes(),
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+            return 1, theta.copy()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+        stored = self.read()
+        if stored is None:
+            raise RuntimeError(f"bandit policy {self.name!r} vanished during create")
+        return stored
+
+    def compare_and_set(self, version: int, theta: np.ndarray) -> bool:
+        """Write theta as version + 1 only if the row is still at version."""
+        db = self._session_factory()
+        try:
+            updated = (
+                db.query(BanditPolicy)
+                .filter(BanditPolicy.name == self.name, BanditPolicy.version == version)
+                .update(
+                    {
+                        BanditPolicy.version: version + 1,
+                        BanditPolicy.theta: np.ascontiguousarray(theta, dtype=np.float64).tobytes(),
+                        BanditPolicy.updated_at: datetime.utcnow(),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return updated == 1
+        finally:
+            db.close()
+
+    def replace(self, theta: np.ndarray) -> int:
+        """Unconditionally store theta as a new version (rollback); returns it."""
+        while True:
+            current = self.read()
+            if current is None:
+                return self.create(theta)[0]
+            if self.compare_and_set(current[0], theta):
+                return current[0] + 1
+
+
+class PolicySync:
+    """
+    Merges an RLService's local updates into the shared row and refreshes its copy.
+    The service provides _lock, theta, _base, _delta and _policy_version.
+    """
+
+    def __init__(self, service: Any, store: PolicyStore, interval: float = 2.0, max_retries: int = 8) -> None:
+        self.service = service
+        self.store = store
+        self.interval = max(0.1, interval)
+        self.max_retries = max_retries
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pushes = 0
+        self._pulls = 0
+        self._conflicts = 0
+        self._last_sync: float | None = None
+        self._last_error: str | None = None
+
+    def attach(self) -> None:
+        """Adopt the stored policy, or seed the row with the service's current theta."""
+        svc = self.service
+        stored = self.store.read()
+        if stored is None:
+            stored = self.store.create(svc.theta)
+        elif stored[1].shape != svc.theta.shape:
+            print("Stored bandit policy has another shape; replacing it with this worker's weights")
+            stored = (self.store.replace(svc.theta), svc.theta.copy())
+        version, theta = stored
+        with svc._lock:
+            svc._policy_version = version
+            svc._base = theta
+            svc._delta = np.zeros_like(theta)
+            svc.theta = theta.copy()
+
+    def _adopt(self, version: int, base: np.ndarray, merged: np.ndarray | None = None) -> None:
+        svc = self.service
+        with svc._lock:
+            if merged is not None:
+                svc._delta -= merged
+            svc._policy_version = version
+            svc._base = base
+            svc.theta = base + svc._delta
+
+    def sync(self) -> bool:
+        """Push pending updates (or pull a newer version). False after max_retries conflicts."""
+        svc = self.service
+        with svc._lock:
+            pending = svc._delta.copy()
+            version = svc._policy_version
+        if not pending.any():
+            if self.store.version() == version:
+                return True
+            stored = self.store.read()
+            if stored is not None:
+                self._adopt(*stored)
+                self._pulls += 1
+            return True
+        for _ in range(self.max_retries):
+            stored = self.store.read()
+            if stored is None:
+                stored = self.store.create(svc._base)
+            version, base = stored
+            merged = base + pending
+            if self.store.compare_and_set(version, merged):
+                self._adopt(version + 1, merged, pending)
+                self._pushes += 1
+                return True
+            self._conflicts += 1
+        return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sync_logged()
+
+    def _sync_logged(self) -> None:
+        try:
+            if not self.sync():
+                print("Warning: bandit policy sync gave up after repeated conflicts; will retry")
+            self._last_sync = time.time()
+            self._last_error = None
+        except Exception as e:
+            self._last_error = str(e)
+            print(f"Warning: bandit policy sync failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rl-policy-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and push what is left (shutdown)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self._sync_logged()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "version": self.service._policy_version,
+            "pending": bool(self.service._delta.any()),
+            "pushes": self._pushes,
+            "pulls": self._pulls,
+            "conflicts": self._conflicts,
+            "last_sync": self._last_sync,
+            "last_error": self._last_error,
+        }
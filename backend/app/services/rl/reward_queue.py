@@ -0,0 +1,198 @@
+"""
+Asynchronous, micro-batched bandit reward ingestion.
+
+/interactions/log used to run the SGD step and commit a RewardLog row for every
+click. Instead it enqueues the reward once the interaction row is committed. A
+consumer thread drains the queue in batches of up to RL_REWARD_BATCH_SIZE
+(waiting at most RL_REWARD_BATCH_WAIT_MS for a batch to fill). Each batch gets
+one vectorized policy update (RLService.update_policy_batch), one bulk RewardLog
+insert and one commit, and marks the checkpointer dirty once.
+
+The queue is in memory. Rewards still queued when a worker dies are lost to the
+online policy, but the interaction and decision rows are durable, so the
+offline trainer can still learn from them. When the queue is full or
+RL_REWARD_ASYNC=0, callers fall back to the synchronous update_policy.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from app.config import RL_REWARD_ASYNC, RL_REWARD_BATCH_SIZE, RL_REWARD_BATCH_WAIT_MS, RL_REWARD_QUEUE_MAX
+from app.db import SessionLocal
+from app.models import RewardLog
+from app.services.rl.bandit import MODEL_VERSION, rl_service
+
+
+@dataclass
+class RewardEvent:
+    user_id: int
+    action: str
+    reward: float
+    state_vector: Optional[Sequence[float]] = None
+    interaction_id: Optional[int] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RewardQueue:
+    def __init__(
+        self,
+        service: Any = rl_service,
+        batch_size: int = RL_REWARD_BATCH_SIZE,
+        max_wait: float = RL_REWARD_BATCH_WAIT_MS / 1000.0,
+        maxsize: int = RL_REWARD_QUEUE_MAX,
+        enabled: bool = RL_REWARD_ASYNC,
+        session_factory: Callable[[], Any] = SessionLocal,
+    ) -> None:
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.enabled = enabled
+        self._queue: queue.Queue[RewardEvent] = queue.Queue(maxsize=max(1, maxsize))
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._enqueued = 0
+        self._processed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_batch_size = 0
+        self._last_batch_ms = 0.0
+        self._last_lag_ms = 0.0
+        self._max_lag_ms = 0.0
+
+    def submit(
+        self,
+        user_id: int,
+        action: str,
+        reward: float,
+        state_vector: Optional[Sequence[float]] = None,
+        interaction_id: Optional[int] = None,
+    ) -> bool:
+        """Enqueue a reward; False (caller updates synchronously) when disabled, stopped or full."""
+        if not self.enabled or self._stop.is_set():
+            return False
+        try:
+            self._queue.put_nowait(RewardEvent(user_id, action, float(reward), state_vector, interaction_id))
+        except queue.Full:
+            self._rejected += 1
+            return False
+        self._enqueued += 1
+        self._ensure_thread()
+        return True
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rl-reward-queue", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self, timeout: float) -> list[RewardEvent]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch(timeout=0.5)
+            if batch:
+                self.process(batch)
+
+    def process(self, batch: list[RewardEvent]) -> None:
+        """One policy update, one bulk RewardLog insert and one commit for the batch."""
+        start = time.monotonic()
+        lag_ms = (start - batch[0].enqueued_at) * 1000.0
+        service = self.service.get() if hasattr(self.service, "get") else self.service
+        db = self._session_factory()
+        try:
+            states = np.stack([service.resolve_state(e.user_id, db, e.state_vector) for e in batch])
+            service.update_policy_batch([e.action for e in batch], states, [e.reward for e in batch])
+            now = datetime.utcnow()
+            db.bulk_save_objects(
+                [
+                    RewardLog(
+                        user_id=e.user_id,
+                        interaction_id=e.interaction_id,
+                        reward_value=e.reward,
+                        model_version=MODEL_VERSION,
+                        timestamp=now,
+                    )
+                    for e in batch
+                ]
+            )
+            db.commit()
+            self._processed += len(batch)
+        except Exception as e:
+            db.rollback()
+            self._failed += len(batch)
+            print(f"Error applying bandit reward batch of {len(batch)}: {e}")
+        finally:
+            db.close()
+        self._batches += 1
+        self._last_batch_size = len(batch)
+        self._last_batch_ms = (time.monotonic() - start) * 1000.0
+        self._last_lag_ms = lag_ms
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+
+    def drain(self) -> None:
+        """Process everything queued now, in the calling thread."""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self.process(batch)
+
+    def stop(self) -> None:
+        """Stop the consumer and apply what is still queued (shutdown, before the policy is flushed)."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=10)
+        self.drain()
+        self._stop.clear()
+
+    def stats(self) -> dict[str, Any]:
+        oldest = None
+        with self._queue.mutex:
+            if self._queue.queue:
+                oldest = self._queue.queue[0].enqueued_at
+        return {
+            "enabled": self.enabled,
+            "depth": self._queue.qsize(),
+            "oldest_age_ms": round((time.monotonic() - oldest) * 1000.0, 1) if oldest is not None else 0.0,
+            "enqueued": self._enqueued,
+            "processed": self._processed,
+            "failed": self._failed,
+            "rejected_full": self._rejected,
+            "batches": self._batches,
+            "last_batch_size": self._last_batch_size,
+            "last_batch_ms": round(self._last_batch_ms, 2),
+            "last_lag_ms": round(self._last_lag_ms, 1),
+            "max_lag_ms": round(self._max_lag_ms, 1),
+        }
+
+
+reward_queue = RewardQueue()
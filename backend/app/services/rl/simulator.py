@@ -0,0 +1,309 @@
+"""
+Synthetic learners for load-testing and convergence checks of the roadmap bandit.
+
+A LearnerPopulation holds N learners with a skill level and a skip propensity.
+Every step, each learner meets a new task (difficulty, JD importance), reacts
+with feedback (too_hard when the task is well above their skill, too_easy well
+below, sometimes skip, otherwise complete), and is rewarded for the bandit's
+arm by a hidden linear model TRUE_THETA plus noise. Regret per decision is the
+noise-free reward of the best valid arm minus that of the chosen arm.
+
+Three drivers exercise the real bandit code:
+
+    run_in_process  get_state -> get_valid_actions -> RLService.get_recommendation
+                    -> update_policy, one learner at a time (no DB)
+    run_vectorized  all N learners per step: masks and epsilon-greedy over theta,
+                    RLService.update_policy_batch in reward-queue sized batches
+    run_http        FastAPI TestClient: /api/phase2/recommend -> /roadmap/adapt
+                    -> /interactions/log per learner (see scripts/bench_bandit.py)
+
+Each returns a SimulationReport (decisions/sec, p50/p99 latency, cumulative
+regret and its first-/last-decile averages for convergence).
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from app.config import RL_REWARD_BATCH_SIZE
+from app.services.rl.bandit import ACTIONS, STATE_DIM, STATE_FEATURE_NAMES, get_valid_actions, normalize_action
+from app.services.rl.offline_trainer import feedback_code, valid_action_mask
+
+FEEDBACK_TYPES = (None, "complete", "too_hard", "too_easy", "skip_regenerate")  # index = feedback_code
+_F = {name: i for i, name in enumerate(STATE_FEATURE_NAMES)}
+_A = {a: i for i, a in enumerate(ACTIONS)}
+
+
+def _true_theta() -> np.ndarray:
+    weights = {
+        "KEEP_NEXT_TASK": {"user_skill_match_score": 0.8, "task_difficulty": -0.5},
+        "ADD_PREREQUISITE_TASK": {"prerequisite_missing_score": 1.0, "user_skill_match_score": -0.3},
+        "DECREASE_DIFFICULTY": {"task_difficulty": 0.9, "user_skill_match_score": -0.6},
+        "INCREASE_DIFFICULTY": {"user_skill_match_score": 0.9, "task_difficulty": -0.8},
+        "REPEAT_WITH_VARIATION": {"task_difficulty": 0.3, "recent_difficulty_feedback": 0.4},
+        "REORDER_NEARBY_TASK": {"prerequisite_missing_score": 0.6, "phase_index_norm": 0.2},
+        "SKIP_OPTIONAL_TASK": {"jd_importance_score": -1.0, "user_skill_match_score": 0.7},
+    }
+    theta = np.zeros((len(ACTIONS), STATE_DIM))
+    for arm, w in weights.items():
+        for feature, value in w.items():
+            theta[_A[arm], _F[feature]] = value
+    return theta
+
+
+TRUE_THETA = _true_theta()
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class LearnerPopulation:
+    def __init__(
+        self,
+        n: int,
+        seed: int = 0,
+        skill_mean: float = 0.5,
+        skill_spread: float = 0.2,
+        skip_rate: float = 0.1,
+        tasks_per_phase: int = 5,
+        phases: int = 4,
+        reward_noise: float = 0.1,
+    ) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.n = n
+        self.skill = np.clip(self.rng.normal(skill_mean, skill_spread, n), 0.0, 1.0)
+        self.skip_propensity = np.clip(self.rng.normal(skip_rate, skip_rate / 2, n), 0.0, 1.0)
+        self.tasks_per_phase = tasks_per_phase
+        self.phases = phases
+        self.reward_noise = reward_noise
+        self.step_index = np.zeros(n, dtype=np.int64)
+
+    def next_tasks(self) -> dict[str, np.ndarray]:
+        """roadmap_context columns of each learner's next task (get_state inputs)."""
+        n, rng = self.n, self.rng
+        total = self.tasks_per_phase * self.phases
+        pos = self.step_index % total
+        difficulty = np.clip(rng.normal(self.skill, 0.25), 0.0, 1.0)
+        self.step_index += 1
+        return {
+            "phase_index": pos // self.tasks_per_phase,
+            "max_phase_index": np.full(n, self.phases - 1),
+            "task_index": pos % self.tasks_per_phase,
+            "max_task_index": np.full(n, self.tasks_per_phase - 1),
+            "task_difficulty": difficulty,
+            "jd_importance_score": rng.random(n),
+            "user_skill_match_score": np.clip(self.skill + rng.normal(0.0, 0.1, n), 0.0, 1.0),
+            "prerequisite_missing_score": np.clip(difficulty - self.skill + 0.5 + rng.normal(0.0, 0.1, n), 0.0, 1.0),
+        }
+
+    def feedback(self, difficulty: np.ndarray) -> np.ndarray:
+        """feedback_code per learner for tasks of the given difficulty."""
+        gap = difficulty - self.skill
+        u = self.rng.random(self.n)
+        p_hard = _sigmoid(10.0 * (gap - 0.2))
+        p_easy = _sigmoid(10.0 * (-gap - 0.2))
+        codes = np.full(self.n, feedback_code("complete"))
+        codes[u < p_hard + p_easy + self.skip_propensity] = feedback_code("skip_regenerate")
+        codes[u < p_hard + p_easy] = feedback_code("too_easy")
+        codes[u < p_hard] = feedback_code("too_hard")
+        return codes
+
+    def rewards(self, arms: np.ndarray, states: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(observed rewards, regret) of the chosen arms."""
+        expected = states @ TRUE_THETA.T
+        best = np.where(masks, expected, -np.inf).max(axis=1)
+        chosen = expected[np.arange(len(arms)), arms]
+        noise = self.rng.normal(0.0, self.reward_noise, len(arms))
+        return chosen + noise, best - chosen
+
+
+def context_states(ctx: dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized RLService.get_state(db=None, roadmap_context=ctx) for every learner."""
+    n = len(ctx["task_difficulty"])
+    states = np.tile(np.array([0.5, 0.5, 0.5, 0.5, 0.0, 0.0, 0.0, 0.5, 0.5, 0.5]), (n, 1))
+    states[:, 0] = np.clip(ctx["phase_index"] / np.maximum(ctx["max_phase_index"], 1), 0.0, 1.0)
+    states[:, 1] = np.clip(ctx["task_index"] / np.maximum(ctx["max_task_index"], 1), 0.0, 1.0)
+    for name in ("task_difficulty", "jd_importance_score", "user_skill_match_score", "prerequisite_missing_score"):
+        states[:, _F[name]] = np.clip(ctx[name], 0.0, 1.0)
+    return states
+
+
+@dataclass
+class SimulationReport:
+    mode: str
+    learners: int
+    decisions: int
+    seconds: float
+    decisions_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    cumulative_regret: float
+    mean_regret_first_decile: float
+    mean_regret_last_decile: float
+    extra: Optional[dict[str, Any]] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _report(mode: str, learners: int, seconds: float, latencies: list[float], regrets: np.ndarray, **extra: Any) -> SimulationReport:
+    lat = np.asarray(latencies, dtype=np.float64) * 1000.0
+    tenth = max(1, len(regrets) // 10)
+    return SimulationReport(
+        mode=mode,
+        learners=learners,
+        decisions=int(len(regrets)),
+        seconds=round(seconds, 3),
+        decisions_per_sec=round(len(regrets) / seconds, 1) if seconds > 0 else 0.0,
+        p50_ms=round(float(np.percentile(lat, 50)), 4) if len(lat) else 0.0,
+        p99_ms=round(float(np.percentile(lat, 99)), 4) if len(lat) else 0.0,
+        cumulative_regret=round(float(regrets.sum()), 3),
+        mean_regret_first_decile=round(float(regrets[:tenth].mean()), 4) if len(regrets) else 0.0,
+        mean_regret_last_decile=round(float(regrets[-tenth:].mean()), 4) if len(regrets) else 0.0,
+        extra=extra or None,
+    )
+
+
+def run_in_process(service: Any, population: LearnerPopulation, steps: int) -> SimulationReport:
+    """One decision at a time through the same RLService calls as /recommend + /interactions/log."""
+    latencies: list[float] = []
+    regrets: list[float] = []
+    start = time.perf_counter()
+    for _ in range(steps):
+        ctx = population.next_tasks()
+        states = context_states(ctx)
+        codes = population.feedback(ctx["task_difficulty"])
+        masks = valid_action_mask(codes, states)
+        chosen = np.zeros(population.n, dtype=np.intp)
+        t_step: list[float] = []
+        for i in range(population.n):
+            t0 = time.perf_counter()
+            roadmap_context = {k: float(v[i]) for k, v in ctx.items()}
+            state = service.get_state(i, None, roadmap_context=roadmap_context)
+            valid = get_valid_actions(FEEDBACK_TYPES[codes[i]], state)
+            rec = service.get_recommendation(i, None, roadmap_context=roadmap_context, valid_actions=valid)
+            chosen[i] = _A[normalize_action(rec["action"])]
+            t_step.append(time.perf_counter() - t0)
+        rewards, regret = population.rewards(chosen, states, masks)
+        for i in range(population.n):
+            t0 = time.perf_counter()
+            service.update_policy(i, ACTIONS[chosen[i]], float(rewards[i]), None, state_vector=states[i])
+            latencies.append(t_step[i] + time.perf_counter() - t0)
+        regrets.extend(regret.tolist())
+    return _report("in_process", population.n, time.perf_counter() - start, latencies, np.asarray(regrets))
+
+
+def run_vectorized(
+    service: Any,
+    population: LearnerPopulation,
+    steps: int,
+    epsilon: Optional[float] = None,
+    update_batch_size: int = RL_REWARD_BATCH_SIZE,
+) -> SimulationReport:
+    """
+    All learners per step: vectorized masked epsilon-greedy on the service's theta,
+    then update_policy_batch in reward-queue sized micro-batches (one summed SGD
+    step over thousands of rewards would overshoot).
+    """
+    eps = service.epsilon if epsilon is None else epsilon
+    rng = population.rng
+    latencies: list[float] = []
+    regrets: list[np.ndarray] = []
+    start = time.perf_counter()
+    for _ in range(steps):
+        ctx = population.next_tasks()
+        t0 = time.perf_counter()
+        states = context_states(ctx)
+        codes = population.feedback(ctx["task_difficulty"])
+        masks = valid_action_mask(codes, states)
+        scores = np.where(masks, states @ service.theta.T, -np.inf)
+        greedy = scores.argmax(axis=1)
+        explore = rng.random(population.n) < eps
+        random_valid = (rng.random(masks.shape) * masks).argmax(axis=1)
+        arms = np.where(explore, random_valid, greedy)
+        rewards, regret = population.rewards(arms, states, masks)
+        names = [ACTIONS[a] for a in arms]
+        for b in range(0, population.n, update_batch_size):
+            service.update_policy_batch(names[b : b + update_batch_size], states[b : b + update_batch_size], rewards[b : b + update_batch_size])
+        latencies.append(time.perf_counter() - t0)
+        regrets.append(regret)
+    report = _report("vectorized", population.n, time.perf_counter() - start, latencies, np.concatenate(regrets))
+    report.extra = {"latency_is": "per step of all learners"}
+    return report
+
+
+def run_http(
+    request: Callable[..., Any],
+    users: list[dict[str, Any]],
+    population: LearnerPopulation,
+    steps: int,
+) -> SimulationReport:
+    """
+    /recommend -> /roadmap/adapt -> /interactions/log for each learner per step.
+    users[i] = {"headers": ..., "roadmap_id": ..., "task_ids": [...]}; request(method, url, **kw)
+    is TestClient.request. Regret is scored on the state the API returned.
+    """
+    latencies: list[float] = []
+    regrets: list[float] = []
+    per_endpoint: dict[str, list[float]] = {"recommend": [], "adapt": [], "log": []}
+    app_reward = 0.0
+    start = time.perf_counter()
+    for step in range(steps):
+        ctx = population.next_tasks()
+        codes = population.feedback(ctx["task_difficulty"])
+        for i, user in enumerate(users):
+            ft = FEEDBACK_TYPES[codes[i]] or "complete"
+            task_id = user["task_ids"][step % len(user["task_ids"])]
+            t0 = time.perf_counter()
+            rec = request(
+                "GET",
+                "/api/phase2/recommend",
+                params={"roadmap_id": user["roadmap_id"], "task_id": task_id, "feedback_type": ft},
+                headers=user["headers"],
+            )
+            t1 = time.perf_counter()
+            body = rec.json()
+            request(
+                "POST",
+                "/api/phase2/roadmap/adapt",
+                json={"roadmap_id": user["roadmap_id"], "task_id": task_id, "decision_id": body["decision_id"]},
+                headers=user["headers"],
+            )
+            t2 = time.perf_counter()
+            log = request(
+                "POST",
+                "/api/phase2/interactions/log",
+                json={"roadmap_id": user["roadmap_id"], "task_id": task_id, "action_type": ft},
+                headers=user["headers"],
+            )
+            t3 = time.perf_counter()
+            per_endpoint["recommend"].append(t1 - t0)
+            per_endpoint["adapt"].append(t2 - t1)
+            per_endpoint["log"].append(t3 - t2)
+            latencies.append(t3 - t0)
+            app_reward += float(log.json().get("reward_calculated", 0.0))
+            state = np.array([body["state_vector"][name] for name in STATE_FEATURE_NAMES])
+            mask = valid_action_mask(np.array([feedback_code(ft)]), state[None])
+            _, regret = population.rewards(np.array([_A[normalize_action(body["action"])]]), state[None], mask)
+            regrets.append(float(regret[0]))
+    endpoint_ms = {
+        name: {
+            "p50_ms": round(float(np.percentile(v, 50)) * 1000.0, 3),
+            "p99_ms": round(float(np.percentile(v, 99)) * 1000.0, 3),
+        }
+        for name, v in per_endpoint.items()
+        if v
+    }
+    return _report(
+        "http",
+        len(users),
+        time.perf_counter() - start,
+        latencies,
+        np.asarray(regrets),
+        endpoints=endpoint_ms,
+        app_reward_total=round(app_reward, 3),
+    )
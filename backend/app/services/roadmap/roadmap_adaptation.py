@@ -9,12 +9,15 @@ import json
 import re
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from app.config import GEMINI_API_KEY
 from app.services.llm.gemini_client import generate_with_fallback
 from app.services.rl.bandit import ACTIONS, LEGACY_ACTION_MAP, normalize_action
 
+if TYPE_CHECKING:
+    from app.services.roadmap.task_index import RoadmapTaskIndex
+
 _DEFAULT_STATUS = ["start", "already_know", "need_easier", "skip", "finished"]
 _EASIER_KEYWORDS = (
     "intro",
@@ -66,7 +69,15 @@ def _norm_tid(tid: Optional[str]) -> str:
 def _find_task_location(
     phases: list,
     task_id: str,
+    task_index: Optional["RoadmapTaskIndex"] = None,
 ) -> Optional[tuple[int, int, dict[str, Any]]]:
+    """task_index (built from the same roadmap version, or a deep copy of it) skips the scan."""
+    if task_index is not None:
+        entry = task_index.locate(task_id)
+        if entry is None:
+            return None
+        pi, ti = entry.phase_index, entry.task_index
+        return pi, ti, phases[pi]["tasks"][ti]
     tid = _norm_tid(task_id)
     if not tid:
         return None
@@ -216,6 +227,7 @@ def _find_next_task_id(phases: list, phase_idx: int, task_idx: int) -> Optional[
 def _apply_complete(
     roadmap_data: dict[str, Any],
     task_id: str,
+    task_index: Optional["RoadmapTaskIndex"] = None,
 ) -> dict[str, Any]:
     data = copy.deepcopy(roadmap_data)
     inner, phases = _unwrap_roadmap(data)
@@ -229,7 +241,7 @@ def _apply_complete(
             "inserted_task_id": None,
             "next_task_id": None,
         }
-    loc = _find_task_location(phases, task_id)
+    loc = _find_task_location(phases, task_id, task_index)
     if loc is None:
         return {
             "updated_roadmap": data,
@@ -272,9 +284,11 @@ def apply_roadmap_action(
     state_vector: Any = None,
     user_context: Optional[dict[str, Any]] = None,
     feedback_type: Optional[str] = None,
+    task_index: Optional["RoadmapTaskIndex"] = None,
 ) -> dict[str, Any]:
     """
     Mutate a copy of roadmap_data according to the bandit action (Gemini only rewrites text).
+    task_index: optional app.services.roadmap.task_index index of this roadmap_data.
 
     Returns:
       updated_roadmap, applied, selected_action, message,
@@ -282,7 +296,7 @@ def apply_roadmap_action(
     """
     ft = _norm_feedback(feedback_type)
     if ft == "complete":
-        return _apply_complete(roadmap_data, task_id)
+        return _apply_complete(roadmap_data, task_id, task_index)
 
     action = normalize_action(selected_action)
     if action not in ACTIONS:
@@ -308,7 +322,7 @@ def apply_roadmap_action(
             "next_task_id": None,
         }
 
-    loc = _find_task_location(phases, task_id)
+    loc = _find_task_location(phases, task_id, task_index)
     if loc is None:
         return {
             "updated_roadmap": copy.deepcopy(roadmap_data),
@@ -349,7 +363,7 @@ def apply_roadmap_action(
     data = copy.deepcopy(roadmap_data)
     _, phases_m = _unwrap_roadmap(data)
     assert phases_m is not None
-    loc2 = _find_task_location(phases_m, task_id)
+    loc2 = _find_task_location(phases_m, task_id, task_index)
     if loc2 is None:
         return {
             "updated_roadmap": roadmap_data,
@@ -4,6 +4,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from app import models
+from app.services.roadmap.task_index import mark_roadmap_changed
 
 
 def get_roadmap_for_job(db: Session, user_id: int, job_id: int) -> Optional[models.Roadmap]:
@@ -40,6 +41,7 @@ def upsert_job_roadmap(
     if duplicates:
         primary = duplicates[0]
         primary.roadmap_data = roadmap_data
+        mark_roadmap_changed(primary)
         primary.title = title
         primary.target_career = target_career
         primary.roadmap_type = "job"
@@ -0,0 +1,215 @@
+"""
+Per-roadmap task index: task_id / title -> phase and task position, JD importance, skills.
+
+/recommend, /roadmap/adapt, /interactions/log and task regeneration each used to
+reload roadmap_data and walk every phase to find one task. The index is built
+in one pass per roadmap version and kept in a process-wide LRU. The version is
+Roadmap.data_version, which mark_roadmap_changed bumps on every roadmap_data
+write, plus created_at, so a reused id never hits a stale entry.
+
+A lookup costs one (job_id, data_version, created_at) query and a dict hit. The
+JSON is only loaded again after the roadmap changes. Other workers see the
+bumped version in the database and rebuild on their next read.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from app import models
+from app.config import ROADMAP_TASK_INDEX_CACHE_SIZE
+from app.services.roadmap.roadmap_adaptation import _norm_tid, _unwrap_roadmap
+
+
+def jd_importance_from_alignment(jd_alignment: list) -> float:
+    """roadmap_context jd_importance_score heuristic: more JD bullets -> more important."""
+    return float(min(1.0, max(0.0, 0.15 + 0.17 * min(len(jd_alignment), 5))))
+
+
+@dataclass(frozen=True)
+class TaskEntry:
+    phase_index: int
+    task_index: int
+    n_tasks: int  # tasks in the phase
+    task_id: str  # normalized, "" when missing
+    title: str
+    difficulty: Optional[float]
+    jd_importance: Optional[float]  # None when jd_alignment is not a list
+    skills: Optional[list]  # skills_gained; None when not a list
+
+
+@dataclass
+class RoadmapTaskIndex:
+    n_phases: int
+    entries: list[TaskEntry] = field(default_factory=list)
+    by_id: dict[str, int] = field(default_factory=dict)
+    by_title: dict[str, int] = field(default_factory=dict)
+    by_title_without_id: dict[str, int] = field(default_factory=dict)
+
+    def _first(self, *positions: Optional[int]) -> Optional[TaskEntry]:
+        hits = [p for p in positions if p is not None]
+        return self.entries[min(hits)] if hits else None
+
+    def find(self, task_id: Optional[str]) -> Optional[TaskEntry]:
+        """First task (document order) whose task_id or title equals task_id."""
+        tid = _norm_tid(task_id)
+        if not tid:
+            return None
+        return self._first(self.by_id.get(tid), self.by_title.get(tid))
+
+    def locate(self, task_id: Optional[str]) -> Optional[TaskEntry]:
+        """First task whose task_id equals task_id, or whose title does when it has no task_id."""
+        tid = _norm_tid(task_id)
+        if not tid:
+            return None
+        return self._first(self.by_id.get(tid), self.by_title_without_id.get(tid))
+
+
+def build_task_index(roadmap_data: Any) -> Optional[RoadmapTaskIndex]:
+    """One pass over roadmap_data; None when it has no phases list."""
+    _, phases = _unwrap_roadmap(roadmap_data)
+    if not phases:
+        return None
+    index = RoadmapTaskIndex(n_phases=len(phases))
+    for pi, phase in enumerate(phases):
+        tasks = phase.get("tasks") if isinstance(phase, dict) else None
+        if not isinstance(tasks, list):
+            continue
+        for ti, task in enumerate(tasks):
+            if not isinstance(task, dict):
+                continue
+            td = task.get("difficulty") or task.get("task_difficulty")
+            try:
+                difficulty = float(td) if td is not None else None
+            except (TypeError, ValueError):
+                difficulty = None
+            ja = task.get("jd_alignment") or []
+            sg = task.get("skills_gained") or []
+            entry = TaskEntry(
+                phase_index=pi,
+                task_index=ti,
+                n_tasks=len(tasks),
+                task_id=_norm_tid(task.get("task_id")),
+                title=_norm_tid(task.get("title")),
+                difficulty=difficulty,
+                jd_importance=jd_importance_from_alignment(ja) if isinstance(ja, list) else None,
+                skills=list(sg) if isinstance(sg, list) else None,
+            )
+            pos = len(index.entries)
+            index.entries.append(entry)
+            if entry.task_id:
+                index.by_id.setdefault(entry.task_id, pos)
+            if entry.title:
+                index.by_title.setdefault(entry.title, pos)
+                if not entry.task_id:
+                    index.by_title_without_id.setdefault(entry.title, pos)
+    return index
+
+
+def _version_token(data_version: Optional[int], created_at: Any) -> tuple:
+    return (data_version or 1, created_at)
+
+
+class TaskIndexCache:
+    def __init__(self, maxsize: int = ROADMAP_TASK_INDEX_CACHE_SIZE) -> None:
+        self.maxsize = max(1, maxsize)
+        self._entries: OrderedDict[int, tuple[tuple, Optional[RoadmapTaskIndex]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def _get(self, roadmap_id: int, token: tuple) -> tuple[bool, Optional[RoadmapTaskIndex]]:
+        with self._lock:
+            cached = self._entries.get(roadmap_id)
+            if cached is None or cached[0] != token:
+                return False, None
+            self._entries.move_to_end(roadmap_id)
+            self.hits += 1
+            return True, cached[1]
+
+    def _put(self, roadmap_id: int, token: tuple, index: Optional[RoadmapTaskIndex]) -> None:
+        with self._lock:
+            self._entries[roadmap_id] = (token, index)
+            self._entries.move_to_end(roadmap_id)
+            self.builds += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def for_roadmap(self, roadmap: models.Roadmap) -> Optional[RoadmapTaskIndex]:
+        """Index of a loaded Roadmap row (built from roadmap.roadmap_data on a miss)."""
+        token = _version_token(roadmap.data_version, roadmap.created_at)
+        found, index = self._get(roadmap.id, token)
+        if not found:
+            index = build_task_index(roadmap.roadmap_data)
+            self._put(roadmap.id, token, index)
+        return index
+
+    def for_version(
+        self,
+        db: Session,
+        roadmap_id: int,
+        data_version: Optional[int],
+        created_at: Any,
+    ) -> Optional[RoadmapTaskIndex]:
+        """Index of a roadmap whose (data_version, created_at) the caller already selected."""
+        found, index = self._get(roadmap_id, _version_token(data_version, created_at))
+        if found:
+            return index
+        # Data and version in one read, so the entry never pairs new data with an old version.
+        R = models.Roadmap
+        fresh = (
+            db.query(R.roadmap_data, R.data_version, R.created_at)
+            .filter(R.id == roadmap_id)
+            .first()
+        )
+        if fresh is None:
+            return None
+        index = build_task_index(fresh.roadmap_data)
+        self._put(roadmap_id, _version_token(fresh.data_version, fresh.created_at), index)
+        return index
+
+    def load(
+        self,
+        db: Session,
+        user_id: int,
+        roadmap_id: int,
+    ) -> tuple[Optional[RoadmapTaskIndex], Optional[int]]:
+        """
+        (index, job_id) of the user's roadmap; (None, None) when it does not exist.
+        roadmap_data is only selected when the cached index is missing or stale.
+        """
+        R = models.Roadmap
+        row = (
+            db.query(R.job_id, R.data_version, R.created_at)
+            .filter(R.id == roadmap_id, R.user_id == user_id)
+            .first()
+        )
+        if row is None:
+            return None, None
+        return self.for_version(db, roadmap_id, row.data_version, row.created_at), row.job_id
+
+    def invalidate(self, roadmap_id: int) -> None:
+        with self._lock:
+            self._entries.pop(roadmap_id, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "builds": self.builds}
+
+
+task_index_cache = TaskIndexCache()
+
+
+def mark_roadmap_changed(roadmap: models.Roadmap) -> None:
+    """
+    Call after mutating or replacing roadmap.roadmap_data (before commit). The
+    version is incremented in SQL, so concurrent writers never share a version.
+    """
+    flag_modified(roadmap, "roadmap_data")
+    roadmap.data_version = models.Roadmap.data_version + 1
+    task_index_cache.invalidate(roadmap.id)
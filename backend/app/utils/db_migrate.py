@@ -20,6 +20,11 @@ def ensure_job_analysis_columns() -> None:
             statements.append("ALTER TABLE jobs ADD COLUMN jd_analysis_hash VARCHAR")
         if "jd_skills_analyzed_at" not in cols:
             statements.append("ALTER TABLE jobs ADD COLUMN jd_skills_analyzed_at DATETIME")
+        if "jd_analysis_status" not in cols:
+            statements.append("ALTER TABLE jobs ADD COLUMN jd_analysis_status VARCHAR")
+        indexes = {ix["name"] for ix in insp.get_indexes("jobs")}
+        if "ix_jobs_jd_analysis_hash" not in indexes:
+            statements.append("CREATE INDEX ix_jobs_jd_analysis_hash ON jobs (jd_analysis_hash)")
         if not statements:
             return
         with engine.begin() as conn:
@@ -28,3 +33,51 @@ def ensure_job_analysis_columns() -> None:
         print("Applied jobs table column patch:", statements)
     except Exception as e:
         print(f"Warning: ensure_job_analysis_columns failed: {e}")
+
+
+def ensure_profile_feature_columns() -> None:
+    """Add cached resume / profile feature columns to user_profiles if missing."""
+    try:
+        insp = inspect(engine)
+        if "user_profiles" not in insp.get_table_names():
+            return
+        cols = {c["name"] for c in insp.get_columns("user_profiles")}
+        statements = []
+        if "resume_text" not in cols:
+            statements.append("ALTER TABLE user_profiles ADD COLUMN resume_text TEXT")
+        if "resume_hash" not in cols:
+            statements.append("ALTER TABLE user_profiles ADD COLUMN resume_hash VARCHAR")
+        if "resume_skills" not in cols:
+            statements.append("ALTER TABLE user_profiles ADD COLUMN resume_skills JSON")
+        if "profile_features" not in cols:
+            statements.append("ALTER TABLE user_profiles ADD COLUMN profile_features JSON")
+        if "doc2vec_vector" not in cols:
+            statements.append("ALTER TABLE user_profiles ADD COLUMN doc2vec_vector BLOB")
+        indexes = {ix["name"] for ix in insp.get_indexes("user_profiles")}
+        if "ix_user_profiles_resume_hash" not in indexes:
+            statements.append("CREATE INDEX ix_user_profiles_resume_hash ON user_profiles (resume_hash)")
+        if not statements:
+            return
+        with engine.begin() as conn:
+            for stmt in statements:
+                conn.execute(text(stmt))
+        print("Applied user_profiles column patch:", statements)
+    except Exception as e:
+        print(f"Warning: ensure_profile_feature_columns failed: {e}")
+
+
+def ensure_roadmap_version_column() -> None:
+    """Add roadmaps.data_version (task index invalidation) if missing."""
+    try:
+        insp = inspect(engine)
+        if "roadmaps" not in insp.get_table_names():
+            return
+        cols = {c["name"] for c in insp.get_columns("roadmaps")}
+        if "data_version" in cols:
+            return
+        stmt = "ALTER TABLE roadmaps ADD COLUMN data_version INTEGER NOT NULL DEFAULT 1"
+        with engine.begin() as conn:
+            conn.execute(text(stmt))
+        print("Applied roadmaps column patch:", [stmt])
+    except Exception as e:
+        print(f"Warning: ensure_roadmap_version_column failed: {e}")
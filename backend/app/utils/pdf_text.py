@@ -0,0 +1,41 @@
+"""
+Page-parallel PDF text extraction.
+
+PyPDF2 is pure Python, so pages are split into contiguous ranges and extracted
+in worker processes (spawned: this module imports nothing from the app). Small
+PDFs, or no pool, are extracted in the calling thread.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Executor
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+
+def page_count(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def extract_pages(path: str, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop); pages without text give ""."""
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_pdf_text(path: str, pool: Executor | None = None, parts: int = 1, min_pages: int = 16) -> str:
+    """Same output as extracting every page in order and joining non-empty pages with newlines."""
+    if PyPDF2 is None:
+        return ""
+    n = page_count(path)
+    if pool is None or parts <= 1 or n < max(2, min_pages):
+        pages = extract_pages(path, 0, n)
+    else:
+        step = -(-n // parts)
+        futures = [pool.submit(extract_pages, path, i, min(i + step, n)) for i in range(0, n, step)]
+        pages = [text for fut in futures for text in fut.result()]
+    return "\n".join(t for t in pages if t)
@@ -33,7 +33,11 @@ def build_model2_user_profile(profile: models.UserProfile) -> dict:
     }
 
 
-def build_doc2vec_profile_text(profile: models.UserProfile, gemini_service) -> str:
+def build_doc2vec_profile_text(profile: models.UserProfile, gemini_service=None) -> str:
+    """
+    Profile text for Doc2Vec matching. Uses the resume text cached at upload;
+    gemini_service is only needed to parse the file of profiles without it.
+    """
     parts = []
     if profile.degree:
         parts.append(f"Degree: {profile.degree}")
@@ -59,11 +63,12 @@ def build_doc2vec_profile_text(profile: models.UserProfile, gemini_service) -> s
         ach = profile.achievements if isinstance(profile.achievements, list) else [profile.achievements]
         parts.append(f"Achievements: {', '.join(ach)}")
     text = " ".join(parts)
-    if profile.resume_path:
+    resume_text = getattr(profile, "resume_text", None)
+    if resume_text is None and profile.resume_path and gemini_service is not None:
         try:
             resume_text = gemini_service.extract_text_from_file(profile.resume_path)
-            if resume_text and len(resume_text.strip()) > 10:
-                text += f" Resume: {resume_text[:2000]}"
         except Exception:
-            pass
+            resume_text = None
+    if resume_text and len(resume_text.strip()) > 10:
+        text += f" Resume: {resume_text[:2000]}"
     return text
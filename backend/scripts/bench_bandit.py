@@ -0,0 +1,132 @@
+"""
+Load and convergence benchmark of the roadmap bandit with synthetic learners
+(app.services.rl.simulator).
+
+Modes:
+    in_process   get_state + get_valid_actions + get_recommendation + update_policy per decision
+    vectorized   every learner per step, one batched policy update (thousands of learners)
+    http         TestClient: /recommend -> /roadmap/adapt -> /interactions/log per learner
+
+Prints decisions/sec, p50/p99 latency and cumulative regret per mode as JSON.
+Runs against throwaway weights (temp checkpoint, shared policy off) and, for
+http, a temporary SQLite database with Gemini disabled. Exits non-zero when a
+--min-decisions-per-sec / --max-p99-ms threshold is missed, for CI.
+
+    python backend/scripts/bench_bandit.py [--mode all] [--learners 2000] [--steps 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_TMP = tempfile.mkdtemp(prefix="bench_bandit_")
+os.environ["RL_THETA_PATH"] = os.path.join(_TMP, "rl_model.npy")
+os.environ["RL_SNAPSHOT_DIR"] = os.path.join(_TMP, "rl_snapshots")
+os.environ["RL_SHARED_POLICY"] = "0"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'bench.db')}")
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["ML_WARMUP"] = "0"
+os.environ["JD_ANALYSIS_WORKERS"] = "0"
+
+from app.services.rl.bandit import RLService
+from app.services.rl.simulator import LearnerPopulation, run_http, run_in_process, run_vectorized
+
+STUB_TASKS_PER_PHASE = 3
+
+
+def stub_roadmap(phases: int = 2) -> tuple[dict, list[str]]:
+    task_ids = []
+    out_phases = []
+    for p in range(phases):
+        tasks = []
+        for t in range(STUB_TASKS_PER_PHASE):
+            tid = f"p{p + 1}_t{t + 1}"
+            task_ids.append(tid)
+            tasks.append(
+                {
+                    "task_id": tid,
+                    "title": f"Task {tid}",
+                    "description": "Synthetic benchmark task.",
+                    "difficulty": round(0.2 + 0.15 * t + 0.1 * p, 2),
+                    "jd_alignment": ["Backend APIs"] * (t + 1),
+                    "skill_tags": ["python"],
+                }
+            )
+        out_phases.append({"phase_id": p + 1, "phase_name": f"Phase {p + 1}", "tasks": tasks})
+    return {"roadmap": {"phases": out_phases}}, task_ids
+
+
+def http_bench(learners: int, steps: int, seed: int):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    os.chdir(_TMP)
+    with TestClient(app) as client:
+        users = []
+        for i in range(learners):
+            email = f"bench{i}@example.com"
+            client.post("/api/auth/register-user", json={"email": email, "password": "Bench-passw0rd", "full_name": f"Bench {i}"})
+            token = client.post("/api/auth/login", data={"username": email, "password": "Bench-passw0rd"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            roadmap, task_ids = stub_roadmap()
+            saved = client.post(
+                "/api/roadmaps/save",
+                headers=headers,
+                json={"roadmap_data": roadmap, "title": "Bandit benchmark", "roadmap_type": "career"},
+            )
+            saved.raise_for_status()
+            users.append({"headers": headers, "roadmap_id": saved.json()["id"], "task_ids": task_ids})
+        return run_http(client.request, users, LearnerPopulation(learners, seed=seed), steps)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bandit simulator / load benchmark")
+    parser.add_argument("--mode", choices=("all", "in_process", "vectorized", "http"), default="all")
+    parser.add_argument("--learners", type=int, default=2000, help="learners for the vectorized mode")
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--in-process-learners", type=int, default=200)
+    parser.add_argument("--http-learners", type=int, default=5)
+    parser.add_argument("--http-steps", type=int, default=20)
+    parser.add_argument("--epsilon", type=float, default=None, help="exploration rate (default: RLService's)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-decisions-per-sec", type=float, default=None, help="fail if any mode is slower")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="fail if any mode's p99 latency is higher")
+    args = parser.parse_args()
+
+    modes = ("in_process", "vectorized", "http") if args.mode == "all" else (args.mode,)
+    reports = []
+    for mode in modes:
+        if mode == "http":
+            report = http_bench(args.http_learners, args.http_steps, args.seed)
+        else:
+            service = RLService() if args.epsilon is None else RLService(epsilon=args.epsilon)
+            if mode == "in_process":
+                report = run_in_process(service, LearnerPopulation(args.in_process_learners, seed=args.seed), args.steps)
+            else:
+                report = run_vectorized(service, LearnerPopulation(args.learners, seed=args.seed), args.steps)
+            service.close()
+        reports.append(report.as_dict())
+        print(json.dumps(report.as_dict(), indent=2))
+
+    failed = []
+    for r in reports:
+        if args.min_decisions_per_sec is not None and r["decisions_per_sec"] < args.min_decisions_per_sec:
+            failed.append(f"{r['mode']}: {r['decisions_per_sec']} decisions/s < {args.min_decisions_per_sec}")
+        if args.max_p99_ms is not None and r["p99_ms"] > args.max_p99_ms:
+            failed.append(f"{r['mode']}: p99 {r['p99_ms']} ms > {args.max_p99_ms}")
+    if failed:
+        sys.exit("Benchmark thresholds missed:\n  " + "\n  ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Per-request SQL statements, commits and latency of POST /api/phase2/interactions/log.
+
+Registers a user, saves a small career roadmap, then for each request asks
+/recommend for a decision (not measured) and logs feedback for that task, cycling
+complete / too_hard / skip / too_easy / rate_difficulty=3. Statements and commits
+are counted with SQLAlchemy engine events while the request runs, auth lookup
+included and the reward queue consumer thread excluded. Runs against a temporary
+SQLite database and throwaway bandit weights (see bench_bandit.py).
+
+    python backend/scripts/bench_interaction_log.py [--requests 300] [--warmup 20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Importing bench_bandit points the app at throwaway weights and a temp SQLite DB.
+from bench_bandit import _TMP, stub_roadmap
+
+FEEDBACK = (
+    {"action_type": "complete"},
+    {"action_type": "too_hard"},
+    {"action_type": "skip"},
+    {"action_type": "too_easy"},
+    {"action_type": "rate_difficulty", "difficulty_rating": 3},
+)
+RECOMMEND_FEEDBACK = {"complete": "complete", "too_hard": "too_hard", "skip": "skip_regenerate", "too_easy": "too_easy"}
+
+
+class StatementCounter:
+    """Statements / commits between start() and stop(), ignoring the reward queue consumer."""
+
+    def __init__(self, engine) -> None:
+        self.active = False
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _counted(self) -> bool:
+        return self.active and threading.current_thread().name != "rl-reward-queue"
+
+    def _on_execute(self, *_args) -> None:
+        if self._counted():
+            self.statements += 1
+
+    def _on_commit(self, *_args) -> None:
+        if self._counted():
+            self.commits += 1
+
+    def start(self) -> None:
+        self.active = True
+        self.statements = self.commits = 0
+
+    def stop(self) -> tuple[int, int]:
+        self.active = False
+        return self.statements, self.commits
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/interactions/log SQL count and latency benchmark")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app.database import engine
+    from app.main import app
+    from app.services.rl.reward_queue import reward_queue
+
+    os.chdir(_TMP)
+    counter = StatementCounter(engine)
+    per_request: list[dict] = []
+
+    with TestClient(app) as client:
+        email = "bench-log@example.com"
+        client.post("/api/auth/register-user", json={"email": email, "password": "Bench-passw0rd", "full_name": "Bench"})
+        token = client.post("/api/auth/login", data={"username": email, "password": "Bench-passw0rd"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        roadmap, task_ids = stub_roadmap()
+        saved = client.post(
+            "/api/roadmaps/save",
+            headers=headers,
+            json={"roadmap_data": roadmap, "title": "Interaction log benchmark", "roadmap_type": "career"},
+        )
+        saved.raise_for_status()
+        roadmap_id = saved.json()["id"]
+
+        latencies: list[float] = []
+        for i in range(args.warmup + args.requests):
+            body = dict(FEEDBACK[i % len(FEEDBACK)])
+            task_id = task_ids[i % len(task_ids)]
+            client.get(
+                "/api/phase2/recommend",
+                headers=headers,
+                params={
+                    "roadmap_id": roadmap_id,
+                    "task_id": task_id,
+                    "feedback_type": RECOMMEND_FEEDBACK.get(body["action_type"], "too_easy"),
+                },
+            ).raise_for_status()
+            counter.start()
+            start = time.perf_counter()
+            resp = client.post(
+                "/api/phase2/interactions/log",
+                headers=headers,
+                json={"roadmap_id": roadmap_id, "task_id": task_id, **body},
+            )
+            elapsed = (time.perf_counter() - start) * 1000.0
+            sql, commits = counter.stop()
+            resp.raise_for_status()
+            if i >= args.warmup:
+                latencies.append(elapsed)
+                per_request.append({"sql": sql, "commits": commits})
+        reward_queue.drain()
+
+    sql = [r["sql"] for r in per_request]
+    commits = [r["commits"] for r in per_request]
+    print(
+        json.dumps(
+            {
+                "requests": len(latencies),
+                "sql_per_request_mean": round(statistics.mean(sql), 2),
+                "sql_per_request_max": max(sql),
+                "commits_per_request_mean": round(statistics.mean(commits), 2),
+                "commits_per_request_max": max(commits),
+                "latency_ms_mean": round(statistics.mean(latencies), 2),
+                "latency_ms_p50": round(_pct(latencies, 0.5), 2),
+                "latency_ms_p99": round(_pct(latencies, 0.99), 2),
+                "reward_queue": reward_queue.stats(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the compiled lexicon matcher against the per-synonym regex loop it replaced.
+
+Runs both over every JD in datasets/jobs.csv, checks that they find the same
+canonical skills, and prints per-JD timings.
+
+    python backend/scripts/bench_lexicon_matcher.py [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from services.lexicon_matcher import LexiconMatcher
+
+
+def regex_loop(lexicon: dict[str, list[str]], text: str, min_len: int = 1) -> list[str]:
+    """Previous implementation: one regex per synonym per call."""
+    found = []
+    for canonical, synonyms in lexicon.items():
+        for token in synonyms:
+            t = str(token).strip()
+            if not t or len(t) < min_len:
+                continue
+            parts = [re.escape(p) for p in t.lower().split()]
+            if parts:
+                parts[-1] = parts[-1] + r"s?"
+            pattern = r"\b" + r"\s+".join(parts) + r"\b"
+            if re.search(pattern, text, flags=re.IGNORECASE):
+                found.append(canonical)
+                break
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lexicon matcher benchmark")
+    parser.add_argument("--jobs", default=str(REPO_ROOT / "datasets/jobs.csv"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lexicon = json.loads((REPO_ROOT / "datasets/skills.json").read_text(encoding="utf-8"))
+    texts = [str(t) for t in pd.read_csv(args.jobs)["jd_text"].fillna("")]
+
+    t0 = time.perf_counter()
+    matcher = LexiconMatcher(lexicon)
+    build_s = time.perf_counter() - t0
+
+    mismatches = 0
+    for text in texts:
+        for min_len in (1, 2):
+            if matcher.find(text, min_synonym_length=min_len) != regex_loop(lexicon, text, min_len):
+                mismatches += 1
+
+    def timed(fn) -> float:
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            for text in texts:
+                fn(text)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    old_s = timed(lambda t: regex_loop(lexicon, t))
+    new_s = timed(matcher.find)
+
+    n = max(len(texts), 1)
+    print(f"JDs: {len(texts)}  synonyms: {sum(len(v) for v in lexicon.values())}")
+    print(f"Matcher build: {build_s * 1000:.1f} ms")
+    print(f"Regex loop:    {old_s / n * 1000:.3f} ms/JD")
+    print(f"Lexicon trie:  {new_s / n * 1000:.3f} ms/JD")
+    print(f"Speedup:       {old_s / new_s if new_s else float('inf'):.1f}x")
+    print(f"Mismatched results: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
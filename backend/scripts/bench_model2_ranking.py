@@ -0,0 +1,113 @@
+"""
+Benchmark the vectorized Model 2 ranker against the per-job score_user_job loop.
+
+Analyzes the JDs in datasets/jobs.csv with Model 1 once, then ranks random user
+profiles (skills sampled from datasets/skills.json) both ways, checks the top-k
+results are identical (job ids, order and full score_user_job output) and prints
+per-request timings.
+
+    python backend/scripts/bench_model2_ranking.py [--jobs 500] [--users 50] [--top-k 20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.model1_service import model1_service
+from app.services.model2_ranking import Model2Ranker, job_description
+from app.services.model2_service import model2_service
+
+
+def loop_rank(user, jobs, analyzed_by_job, top_k):
+    """Previous implementation: score every job, stable sort, slice."""
+    scored = []
+    for job in jobs:
+        rows = analyzed_by_job.get(job.id)
+        if rows is None:
+            continue
+        scored.append((job, model2_service.score_user_job(user, job_description(job), rows)))
+    scored.sort(key=lambda r: r[1]["similarity_score"], reverse=True)
+    return scored[:top_k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model 2 ranking benchmark")
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    df = pd.read_csv(REPO_ROOT / "datasets/jobs.csv").head(args.jobs)
+    jobs = [
+        SimpleNamespace(
+            id=i + 1,
+            job_title=str(r.job_title),
+            title=None,
+            jd_text=str(r.jd_text),
+            description=None,
+            min_experience_years=rng.choice([0, 1, 2, 3, 5, 8]),
+            jd_analysis_hash=f"bench-{i}",
+            jd_analysis_status="done",
+            updated_at=None,
+        )
+        for i, r in enumerate(df.itertuples())
+    ]
+    t0 = time.perf_counter()
+    rows = model1_service.analyze_jds([(j.job_title, j.jd_text) for j in jobs])
+    analyzed_by_job = {j.id: r for j, r in zip(jobs, rows)}
+    print(f"Model 1 analysis of {len(jobs)} JDs: {time.perf_counter() - t0:.1f}s")
+
+    lexicon = list(json.loads((REPO_ROOT / "datasets/skills.json").read_text(encoding="utf-8")))
+    users = [
+        {
+            "skills": rng.sample(lexicon, rng.randint(3, 15)),
+            "experience": rng.choice([0, 1, 2, 4, 6]),
+            "projects": "built a data pipeline and a web app",
+            "certifications": "",
+            "education": "B.Tech computer science",
+        }
+        for _ in range(args.users)
+    ]
+
+    ranker = Model2Ranker()
+    t0 = time.perf_counter()
+    ranker.scores(users[0], jobs, analyzed_by_job)
+    print(f"Ranker compile (first request): {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    mismatches = 0
+    loop_s = vec_s = 0.0
+    for user in users:
+        t0 = time.perf_counter()
+        expected = loop_rank(user, jobs, analyzed_by_job, args.top_k)
+        t1 = time.perf_counter()
+        got = ranker.rank(user, jobs, analyzed_by_job, args.top_k)
+        t2 = time.perf_counter()
+        loop_s += t1 - t0
+        vec_s += t2 - t1
+        if [(j.id, p) for j, p in expected] != [(j.id, p) for j, p in got]:
+            mismatches += 1
+
+    n = max(len(users), 1)
+    print(f"Jobs: {len(jobs)}  users: {len(users)}  top-k: {args.top_k}")
+    print(f"score_user_job loop: {loop_s / n * 1000:.2f} ms/request")
+    print(f"Sparse ranker:       {vec_s / n * 1000:.2f} ms/request")
+    print(f"Speedup:             {loop_s / vec_s if vec_s else float('inf'):.1f}x")
+    print(f"Mismatched top-k:    {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
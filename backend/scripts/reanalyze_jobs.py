@@ -0,0 +1,146 @@
+"""
+Re-run Model 1 for every job whose stored analysis is stale (JD edited, or
+model1.pkl / skills.json changed since it was analyzed).
+
+Stale jobs are grouped by jd_fingerprint so duplicate postings are analyzed once;
+fingerprints already in jd_analyses are only relinked. The rest are split into
+chunks and analyzed across a process pool (each worker loads Model 1 once). Results are written back one chunk per transaction. The run is resumable:
+a committed chunk carries the current fingerprint, so an interrupted run simply
+picks up the remaining stale jobs next time.
+
+    python backend/scripts/reanalyze_jobs.py [--workers 4] [--chunk 64] [--limit N] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models
+from app.db import SessionLocal
+from app.services.job_skills_store import jd_fingerprint, load_analyses
+from app.services.model1_service import analysis_version, model1_service
+
+
+def _init_worker() -> None:
+    model1_service.get()
+
+
+def _analyze_chunk(pairs: list[tuple[str, str]]) -> list[list[dict[str, Any]]]:
+    return model1_service.analyze_jds(pairs)
+
+
+def find_stale(db, limit: int | None = None) -> dict[str, tuple[tuple[str, str], list[int]]]:
+    """{fingerprint: ((title, jd), [job_id, ...])} for jobs whose stored hash is not current."""
+    Job = models.Job
+    stale: dict[str, tuple[tuple[str, str], list[int]]] = {}
+    n = 0
+    q = db.query(
+        Job.id, Job.job_title, Job.title, Job.jd_text, Job.description, Job.jd_analysis_hash
+    ).yield_per(1000)
+    for job_id, job_title, legacy_title, jd_text, description, stored_hash in q:
+        title, jd = job_title or legacy_title or "", jd_text or description or ""
+        fp = jd_fingerprint(title, jd)
+        if stored_hash == fp:
+            continue
+        stale.setdefault(fp, ((title, jd), []))[1].append(job_id)
+        n += 1
+        if limit is not None and n >= limit:
+            break
+    return stale
+
+
+def write_chunk(db, fps: list[str], results: list[list[dict[str, Any]] | None], stale: dict) -> int:
+    """Insert new jd_analyses rows (results[i] is None when fps[i] is already stored) and relink jobs."""
+    analyzed_at = datetime.utcnow()
+    version = analysis_version()
+    db.bulk_insert_mappings(
+        models.JDAnalysis,
+        [
+            {"fingerprint": fp, "model_version": version, "skills": rows, "analyzed_at": analyzed_at}
+            for fp, rows in zip(fps, results)
+            if rows is not None
+        ],
+    )
+    mappings = [
+        {
+            "id": job_id,
+            "jd_analyzed_skills": None,
+            "jd_analysis_hash": fp,
+            "jd_skills_analyzed_at": analyzed_at,
+            "jd_analysis_status": "done",
+        }
+        for fp in fps
+        for job_id in stale[fp][1]
+    ]
+    db.bulk_update_mappings(models.Job, mappings)
+    db.commit()
+    return len(mappings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk Model 1 re-analysis of stale jobs")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="process pool size (0 = analyze in this process)")
+    parser.add_argument("--chunk", type=int, default=64, help="distinct JDs per task and per commit")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many stale jobs")
+    parser.add_argument("--dry-run", action="store_true", help="only count stale jobs")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stale = find_stale(db, args.limit)
+        n_jobs = sum(len(ids) for _, ids in stale.values())
+        print(f"Model 1 version {analysis_version()}: {n_jobs} stale jobs, "
+              f"{len(stale)} distinct JDs (scan {time.perf_counter() - start:.1f}s)")
+        if args.dry_run or not stale:
+            return
+
+        done = 0
+        start = time.perf_counter()
+        stored = set(load_analyses(db, stale))
+        if stored:
+            done += write_chunk(db, list(stored), [None] * len(stored), stale)
+            print(f"  relinked {done} jobs to {len(stored)} stored analyses")
+        fps = [fp for fp in stale if fp not in stored]
+        chunks = [fps[i:i + args.chunk] for i in range(0, len(fps), max(1, args.chunk))]
+
+        def report(chunk_fps: list[str], results: list[list[dict[str, Any]]]) -> None:
+            nonlocal done
+            done += write_chunk(db, chunk_fps, results, stale)
+            elapsed = time.perf_counter() - start
+            print(f"  {done}/{n_jobs} jobs  {done / elapsed if elapsed else 0:.1f} jobs/sec")
+
+        if args.workers <= 0:
+            model1_service.get()
+            for chunk in chunks:
+                report(chunk, _analyze_chunk([stale[fp][0] for fp in chunk]))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+                futures = {
+                    pool.submit(_analyze_chunk, [stale[fp][0] for fp in chunk]): chunk
+                    for chunk in chunks
+                }
+                for fut in as_completed(futures):
+                    report(futures[fut], fut.result())
+
+        elapsed = time.perf_counter() - start
+        print(f"Updated {done} jobs ({len(fps)} JDs analyzed) in {elapsed:.1f}s "
+              f"= {done / elapsed if elapsed else 0:.1f} jobs/sec")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-worker memory of the career ML artifacts: pickled copies vs memory-mapped.
+
+Starts N worker processes per mode (like N uvicorn workers), each loading the
+career models and running one Doc2Vec match so the artifact pages are touched,
+and prints RSS before / after loading and PSS (shared pages divided between the
+workers mapping them) while all N are alive. Linux only (reads /proc).
+
+    python backend/scripts/report_worker_rss.py [--workers 4]
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+
+
+def _worker(mmap_flag: str, results, ready, release) -> None:
+    os.environ["ML_MMAP_ARTIFACTS"] = mmap_flag
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.ml.artifacts import memory_usage
+    from app.services.ml.career_ml import career_models, match_jobs_doc2vec
+
+    before = memory_usage()
+    career_models.get()
+    match_jobs_doc2vec("python developer with sql, docker and machine learning experience", top_k=10)
+    results.put((os.getpid(), before, memory_usage()))
+    ready.wait()
+    results.put((os.getpid(), "pss", memory_usage()))
+    release.wait()
+
+
+def run(mode: str, n: int) -> None:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    ready, release = ctx.Event(), ctx.Event()
+    flag = "1" if mode == "mmap" else "0"
+    procs = [ctx.Process(target=_worker, args=(flag, results, ready, release)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    loaded = [results.get() for _ in procs]
+    ready.set()  # every worker holds its models now: PSS splits the shared pages between them
+    alive = {pid: usage for pid, _, usage in (results.get() for _ in procs)}
+    release.set()
+    for p in procs:
+        p.join()
+
+    print(f"\n{mode}: {n} workers")
+    print(f"{'pid':>8} {'RSS before':>11} {'RSS after':>10} {'delta':>8} {'PSS':>8}  (MB)")
+    total_rss = total_pss = 0.0
+    for pid, before, after in loaded:
+        rss0, rss1 = before.get("rss_kb", 0) / 1024, after.get("rss_kb", 0) / 1024
+        pss = alive.get(pid, {}).get("pss_kb", 0) / 1024
+        total_rss += rss1
+        total_pss += pss
+        print(f"{pid:>8} {rss0:>11.1f} {rss1:>10.1f} {rss1 - rss0:>8.1f} {pss:>8.1f}")
+    print(f"{'total':>8} {'':>11} {total_rss:>10.1f} {'':>8} {total_pss:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-worker RSS of career ML artifacts")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    # Convert up front so the mmap run measures loading, not the one-time conversion.
+    os.environ["ML_MMAP_ARTIFACTS"] = "1"
+    from app.services.ml.career_ml import career_models
+
+    career_models.get()
+    for mode in ("pickle", "mmap"):
+        run(mode, args.workers)
+
+
+if __name__ == "__main__":
+    main()
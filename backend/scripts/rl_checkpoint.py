@@ -0,0 +1,59 @@
+"""
+List or roll back the bandit theta snapshots (RL_SNAPSHOT_DIR).
+
+Rollback writes the chosen snapshot as the shared policy (bandit_policies, a
+new version that running workers pick up on their next sync) and atomically as
+the current checkpoint (RL_THETA_PATH). Updates a worker has not merged yet are
+applied on top of the restored weights.
+
+    python backend/scripts/rl_checkpoint.py list
+    python backend/scripts/rl_checkpoint.py rollback [--version N]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import RL_SHARED_POLICY, RL_SNAPSHOT_DIR, RL_THETA_PATH
+from app.services.rl.bandit import POLICY_NAME
+from app.services.rl.checkpoint import ThetaCheckpointer
+from app.services.rl.policy_store import PolicyStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bandit theta snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    rb = sub.add_parser("rollback")
+    rb.add_argument("--version", type=int, default=None, help="snapshot version (default: the one before the newest)")
+    args = parser.parse_args()
+
+    ckpt = ThetaCheckpointer(RL_THETA_PATH, RL_SNAPSHOT_DIR)
+    if args.command == "list":
+        for version, path in ckpt.snapshots():
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(path.stat().st_mtime))
+            print(f"v{version:<6} {stamp}  {path}")
+        return
+
+    snap = ckpt.snapshot(args.version)
+    if snap is None:
+        sys.exit("No such snapshot (need at least two snapshots for the default rollback).")
+    version, theta = snap
+    if RL_SHARED_POLICY:
+        policy_version = PolicyStore(POLICY_NAME).replace(theta)
+        ckpt.attach(lambda: (policy_version, theta), versioned=True)
+    else:
+        ckpt.attach(lambda: theta)
+    new_version = ckpt.flush()
+    print(f"Restored v{version} to {RL_THETA_PATH} (saved as v{new_version})")
+
+
+if __name__ == "__main__":
+    main()
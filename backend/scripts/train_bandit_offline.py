@@ -0,0 +1,96 @@
+"""
+Offline replay training of the roadmap bandit from RoadmapBanditDecision logs.
+
+Reads every rewarded decision (chunked by id), replays it through the 7x10
+linear model for several epochs (app.services.rl.offline_trainer) and writes
+the new theta as .npy, printing before/after metrics as JSON. With --publish it
+also becomes the live policy: a new bandit_policies version (workers pick it up
+on their next sync) and a checkpoint snapshot, so it can be rolled back with
+scripts/rl_checkpoint.py.
+
+    python backend/scripts/train_bandit_offline.py [--epochs 5] [--lr 0.1] [--decay 0.8]
+        [--batch-size 256] [--init current|random] [--output theta.npy] [--publish]
+    python backend/scripts/train_bandit_offline.py --synthetic 1000000   # benchmark, no DB
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import RL_MODEL_PATH, RL_SHARED_POLICY, RL_SNAPSHOT_DIR, RL_THETA_PATH
+from app.db import SessionLocal
+from app.services.rl.bandit import ACTIONS, POLICY_NAME, STATE_DIM
+from app.services.rl.checkpoint import ThetaCheckpointer, write_array_atomic
+from app.services.rl.offline_trainer import load_decisions, run, synthetic_decisions
+from app.services.rl.policy_store import PolicyStore
+
+
+def current_theta(checkpointer: ThetaCheckpointer) -> np.ndarray | None:
+    """Live weights: the shared policy row, else the checkpoint file."""
+    if RL_SHARED_POLICY:
+        try:
+            stored = PolicyStore(POLICY_NAME).read()
+            if stored is not None:
+                return stored[1]
+        except Exception as e:
+            print(f"Warning: could not read shared policy: {e}", file=sys.stderr)
+    return checkpointer.load((len(ACTIONS), STATE_DIM), legacy_pickle=RL_MODEL_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline replay trainer for the roadmap bandit")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--lr", type=float, default=0.1)
+    parser.add_argument("--decay", type=float, default=1.0, help="learning-rate factor per epoch")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--chunk", type=int, default=50_000, help="decisions read per query")
+    parser.add_argument("--limit", type=int, default=None, help="read at most N decisions")
+    parser.add_argument("--init", choices=("current", "random"), default="current", help="warm start or fresh weights")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--synthetic", type=int, default=0, help="train on N synthetic decisions instead of the DB")
+    parser.add_argument("--output", default=str(Path(RL_SNAPSHOT_DIR) / "offline_theta.npy"))
+    parser.add_argument("--publish", action="store_true", help="make the result the live policy")
+    args = parser.parse_args()
+
+    checkpointer = ThetaCheckpointer(RL_THETA_PATH, RL_SNAPSHOT_DIR)
+    start = time.perf_counter()
+    if args.synthetic:
+        data, read_stats = synthetic_decisions(args.synthetic, args.seed), {"synthetic": args.synthetic}
+    else:
+        db = SessionLocal()
+        try:
+            data, read_stats = load_decisions(db, args.chunk, args.limit)
+        finally:
+            db.close()
+    load_seconds = time.perf_counter() - start
+
+    theta = current_theta(checkpointer) if args.init == "current" else None
+    if theta is None:
+        theta = np.random.default_rng(42).random((len(ACTIONS), STATE_DIM))  # same as RLService._init_theta
+    new_theta, metrics = run(theta, data, args.epochs, args.lr, args.decay, args.batch_size, args.seed)
+
+    output = Path(args.output)
+    write_array_atomic(output, new_theta)
+    report = {"data": read_stats, "load_seconds": round(load_seconds, 3), **metrics, "output": str(output)}
+    if args.publish:
+        if RL_SHARED_POLICY:
+            version = PolicyStore(POLICY_NAME).replace(new_theta)
+            checkpointer.attach(lambda: (version, new_theta), versioned=True)
+        else:
+            checkpointer.attach(lambda: new_theta)
+        report["published_version"] = checkpointer.flush()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
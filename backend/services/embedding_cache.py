@@ -0,0 +1,166 @@
+"""
+Bounded embedding cache for sentence-transformer vectors.
+
+Memory tier: LRU keyed by a content hash of the text, evicted to stay under a
+byte budget. Optional disk tier: a float32 matrix (`vectors.f32`, opened with
+np.memmap so every worker shares one page-cache copy) plus a JSON key -> row index
+(`index.json`). New vectors are appended to the disk tier by flush(), which writes
+both files to temp paths and renames them into place, so readers never see a torn
+file. Workers opened with read_only=True only read the disk tier.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.json"
+
+
+def content_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk_dir: Optional[Path] = None,
+        read_only: bool = False,
+        flush_every: int = 256,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.read_only = read_only
+        self.flush_every = max(1, int(flush_every))
+        self._mem: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[str, np.ndarray] = {}
+        self._disk_index: dict[str, int] = {}
+        self._disk: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.disk_dir is not None:
+            self._open_disk()
+            if not read_only:
+                atexit.register(self.flush)
+
+    def _open_disk(self) -> None:
+        vec_path = self.disk_dir / VECTORS_FILE
+        idx_path = self.disk_dir / INDEX_FILE
+        if not vec_path.exists() or not idx_path.exists():
+            return
+        try:
+            meta = json.loads(idx_path.read_text(encoding="utf-8"))
+            rows, dim = int(meta["rows"]), int(meta["dim"])
+            if rows == 0:
+                return
+            self._disk = np.memmap(vec_path, dtype=np.float32, mode="r", shape=(rows, dim))
+            self._disk_index = {k: int(v) for k, v in meta["keys"].items()}
+        except Exception as e:
+            print(f"Warning: could not open embedding cache at {self.disk_dir}: {e}")
+            self._disk, self._disk_index = None, {}
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        if key in self._mem:
+            self._mem.move_to_end(key)
+            return
+        self._mem[key] = vec
+        self._bytes += vec.nbytes
+        while self._bytes > self.max_bytes and self._mem:
+            _, old = self._mem.popitem(last=False)
+            self._bytes -= old.nbytes
+            self.evictions += 1
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = content_key(text)
+        with self._lock:
+            vec = self._mem.get(key)
+            if vec is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return vec
+            vec = self._pending.get(key)
+            if vec is None and self._disk is not None and key in self._disk_index:
+                vec = np.array(self._disk[self._disk_index[key]])
+            if vec is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, vec)
+            return vec
+
+    def put(self, text: str, vec: np.ndarray) -> None:
+        key = content_key(text)
+        vec = np.asarray(vec, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._remember(key, vec)
+            if self.disk_dir is None or self.read_only or key in self._disk_index:
+                return
+            self._pending[key] = vec
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append pending vectors to the disk tier (atomic rename of both files)."""
+        if self.disk_dir is None or self.read_only:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            # Pick up rows written by other processes since we opened the tier.
+            self._open_disk()
+            pending = {k: v for k, v in self._pending.items() if k not in self._disk_index}
+            dim = next(iter(self._pending.values())).shape[0]
+            if self._disk is not None and self._disk.shape[1] != dim:
+                print("Warning: embedding cache dimension changed; rebuilding disk tier")
+                self._disk, self._disk_index = None, {}
+            old_rows = 0 if self._disk is None else self._disk.shape[0]
+            keys = dict(self._disk_index)
+            for offset, k in enumerate(pending):
+                keys[k] = old_rows + offset
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                vec_tmp = self.disk_dir / f".{VECTORS_FILE}.{os.getpid()}.tmp"
+                idx_tmp = self.disk_dir / f".{INDEX_FILE}.{os.getpid()}.tmp"
+                with open(vec_tmp, "wb") as f:
+                    if self._disk is not None:
+                        f.write(np.ascontiguousarray(self._disk).tobytes())
+                    for v in pending.values():
+                        f.write(v.tobytes())
+                idx_tmp.write_text(
+                    json.dumps({"rows": len(keys), "dim": dim, "keys": keys}), encoding="utf-8"
+                )
+                os.replace(vec_tmp, self.disk_dir / VECTORS_FILE)
+                os.replace(idx_tmp, self.disk_dir / INDEX_FILE)
+                self._pending.clear()
+                self._open_disk()
+            except Exception as e:
+                print(f"Warning: could not flush embedding cache: {e}")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk_index),
+                "pending_disk_writes": len(self._pending),
+            }
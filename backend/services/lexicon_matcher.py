@@ -0,0 +1,87 @@
+"""
+Compiled multi-pattern matcher over the skills lexicon (datasets/skills.json).
+
+Equivalent to running, for every synonym, the per-synonym regex
+
+    \\b part1 \\s+ part2 ... partN s? \\b        (re.IGNORECASE)
+
+but the lexicon is compiled once into a character trie (whitespace runs are a
+single edge) and the text is scanned in one pass from its word boundaries.
+"""
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+_BOUNDARY = re.compile(r"\b")
+_WS = " "  # trie edge for a run of whitespace between synonym parts
+_END = ""  # trie key holding [(canonical, synonym_length), ...]
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing string length (keeps offsets aligned with `text`)."""
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class LexiconMatcher:
+    def __init__(self, lexicon: dict[str, list[str]]) -> None:
+        self._root: dict = {}
+        self._order: dict[str, int] = {}
+        for canonical, synonyms in lexicon.items():
+            self._order.setdefault(canonical, len(self._order))
+            for token in synonyms:
+                t = str(token).strip()
+                parts = t.lower().split()
+                if not parts:
+                    continue
+                node = self._root
+                for k, part in enumerate(parts):
+                    if k:
+                        node = node.setdefault(_WS, {})
+                    for ch in part:
+                        node = node.setdefault(ch, {})
+                node.setdefault(_END, []).append((canonical, len(t)))
+
+    def find(self, text: str, min_synonym_length: int = 1) -> list[str]:
+        """Canonical skills with at least one synonym in `text`, in lexicon order."""
+        if not text:
+            return []
+        low = _fold(text)
+        n = len(low)
+        bounds = {m.start() for m in _BOUNDARY.finditer(low)}
+        root = self._root
+        hits: set[str] = set()
+        for i in sorted(bounds):
+            node = root.get(low[i]) if i < n else None
+            j = i + 1
+            while node is not None:
+                ends = node.get(_END)
+                if ends and (j in bounds or (j < n and low[j] == "s" and j + 1 in bounds)):
+                    hits.update(c for c, length in ends if length >= min_synonym_length)
+                if j >= n:
+                    break
+                if low[j].isspace():
+                    node = node.get(_WS)
+                    while j < n and low[j].isspace():
+                        j += 1
+                    continue
+                node = node.get(low[j])
+                j += 1
+        return sorted(hits, key=self._order.__getitem__)
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> LexiconMatcher:
+    p = Path(path)
+    lexicon = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+    return LexiconMatcher(lexicon)
+
+
+def load_lexicon_matcher(skills_path: Path) -> LexiconMatcher:
+    """One compiled matcher per lexicon file, shared across modules."""
+    return _load(str(Path(skills_path).resolve()))
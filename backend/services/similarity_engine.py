@@ -0,0 +1,97 @@
+"""
+Sentence-embedding similarity (all-MiniLM-L6-v2) with a lexical fallback.
+
+Shared by Model 1 serving (app.services.model1_service) and the Model 1 dataset
+builder (data_pipeline/build_skill_dataset.py) so both compute the
+title / JD-prefix similarity features the same way.
+"""
+from __future__ import annotations
+
+from typing import Callable, Sequence
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+from services.tokenizer import lexical_similarity as token_lexical_similarity
+
+try:
+    from sentence_transformers import SentenceTransformer
+except Exception:  # pragma: no cover
+    SentenceTransformer = None
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class SimilarityEngine:
+    def __init__(
+        self,
+        lexical_similarity: Callable[[str, str], float] = token_lexical_similarity,
+        use_transformer: bool = True,
+        cache: EmbeddingCache | None = None,
+    ) -> None:
+        self.model = None
+        self.lexical_similarity = lexical_similarity
+        self.cache = cache if cache is not None else EmbeddingCache()
+        if use_transformer and SentenceTransformer is not None:
+            try:
+                self.model = SentenceTransformer(MODEL_NAME)
+            except Exception:
+                self.model = None
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """L2-normalized float32 rows for texts; uncached texts go through one encode call."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        found: dict[str, np.ndarray] = {}
+        missing: list[str] = []
+        for t in dict.fromkeys(texts):
+            vec = self.cache.get(t)
+            if vec is None:
+                missing.append(t)
+            else:
+                found[t] = vec
+        if missing:
+            vecs = self.model.encode(
+                missing,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            for text, vec in zip(missing, np.asarray(vecs, dtype=np.float32)):
+                self.cache.put(text, vec)
+                found[text] = vec
+        return np.stack([found[t] for t in texts])
+
+    def similarity(self, a: str, b: str) -> float:
+        if not a or not b:
+            return 0.0
+        if self.model is not None:
+            ea, eb = self.embed_many([a, b])
+            return float(ea @ eb)
+        return self.lexical_similarity(a, b)
+
+    def similarity_columns(self, left: Sequence[str], right: Sequence[str]) -> np.ndarray:
+        """
+        Cosine similarity of every right text against every left text, shape
+        (len(right), len(left)). With the transformer, all texts are embedded in
+        one batch and the columns come from one normalized matrix product.
+        Empty texts score 0.0, as in similarity().
+        """
+        out = np.zeros((len(right), len(left)), dtype=np.float64)
+        if not left or not right:
+            return out
+        if self.model is None:
+            for i, r in enumerate(right):
+                for j, l in enumerate(left):
+                    out[i, j] = self.similarity(l, r)
+            return out
+        unique = list(dict.fromkeys(t for t in (*left, *right) if t))
+        emb = self.embed_many(unique)
+        row = {t: k for k, t in enumerate(unique)}
+        li = [j for j, t in enumerate(left) if t]
+        ri = [i for i, t in enumerate(right) if t]
+        if li and ri:
+            L = emb[[row[left[j]] for j in li]]
+            R = emb[[row[right[i]] for i in ri]]
+            out[np.ix_(ri, li)] = R @ L.T
+        return out
@@ -4,6 +4,7 @@ import json
 import re
 from pathlib import Path
 
+from services.lexicon_matcher import load_lexicon_matcher
 from services.skill_normalizer import competency_normalizer
 
 def _repo_root() -> Path:
@@ -15,6 +16,7 @@ class SkillExtractor:
         root = _repo_root()
         self.skills_path = skills_path or (root / "datasets/skills.json")
         self.lexicon = json.loads(self.skills_path.read_text(encoding="utf-8"))
+        self.matcher = load_lexicon_matcher(self.skills_path)
 
     def extract(self, text: str) -> list[str]:
         txt = text or ""
@@ -43,18 +45,8 @@ class SkillExtractor:
             normalized = synonym_lookup.get(cleaned, cleaned)
             if competency_normalizer.classify_competency_type(normalized) != "discard":
                 found.add(normalized)
-        for canonical, synonyms in self.lexicon.items():
-            for token in synonyms:
-                t = str(token).strip()
-                if not t:
-                    continue
-                parts = [re.escape(p) for p in t.lower().split()]
-                if parts:
-                    parts[-1] = parts[-1] + r"s?"
-                pattern = r"\b" + r"\s+".join(parts) + r"\b"
-                if re.search(pattern, txt, flags=re.IGNORECASE):
-                    add_candidate(canonical)
-                    break
+        for canonical in self.matcher.find(txt):
+            add_candidate(canonical)
 
         skills_match = re.search(r"skills\s*:\s*(.+)", txt, flags=re.IGNORECASE | re.DOTALL)
         if skills_match:
@@ -0,0 +1,96 @@
+"""
+Shared lexical tokenizer for Model 1 (similarity fallback), Model 2 (profile / JD
+lexical similarity) and the dataset builders in data_pipeline/.
+
+Tokens are runs of [a-z0-9+#.] in the lowercased text, so "c++", "c#" and
+"node.js" stay whole. TokenVocabulary maps tokens to integer ids; TokenCache keeps
+the sorted id array of each JD keyed by its jd_fingerprint, so ranking tokenizes
+a JD once per process (and once for all duplicate postings) and only the user
+profile per request.
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9\+\#\.]+")
+
+
+def token_set(text: str) -> set[str]:
+    return set(TOKEN_PATTERN.findall((text or "").lower()))
+
+
+def lexical_similarity(a: str, b: str) -> float:
+    """Cosine overlap of token sets: |A & B| / sqrt(|A| * |B|)."""
+    ta, tb = token_set(a), token_set(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / math.sqrt(len(ta) * len(tb))
+
+
+class TokenVocabulary:
+    """Thread-safe token -> integer id map (ids are dense and never reused)."""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, tokens: Iterable[str]) -> np.ndarray:
+        """Sorted int64 ids of tokens, assigning new ids as needed."""
+        with self._lock:
+            ids = [self._ids.setdefault(t, len(self._ids)) for t in tokens]
+        return np.unique(np.asarray(ids, dtype=np.int64))
+
+    def lookup(self, tokens: Iterable[str]) -> np.ndarray:
+        """Sorted ids of the tokens already in the vocabulary (unknown tokens cannot overlap)."""
+        ids = self._ids
+        return np.unique(np.asarray([ids[t] for t in tokens if t in ids], dtype=np.int64))
+
+
+def overlap_count(a_ids: np.ndarray, b_ids: np.ndarray) -> int:
+    """Size of the intersection of two sorted, duplicate-free id arrays."""
+    return int(np.intersect1d(a_ids, b_ids, assume_unique=True).size)
+
+
+class TokenCache:
+    """LRU of text key (e.g. jd_fingerprint) -> sorted token id array."""
+
+    def __init__(self, vocabulary: TokenVocabulary, max_entries: int = 200_000) -> None:
+        self.vocabulary = vocabulary
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, text: str) -> np.ndarray:
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return ids
+            self.misses += 1
+        ids = self.vocabulary.add(token_set(text))
+        with self._lock:
+            self._entries[key] = ids
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return ids
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "vocabulary": len(self.vocabulary),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -5,18 +5,11 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
-import re
+import sys
 from pathlib import Path
 
 import pandas as pd
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-except Exception:  # pragma: no cover
-    SentenceTransformer = None
-    util = None
-
 
 ROLE_KEYWORDS = {
     "Data Analyst": ["analysis", "dashboard", "report", "sql", "bi"],
@@ -36,38 +29,14 @@ ROLE_KEYWORDS = {
 IMPORTANCE_WEIGHT = {"core": 3.0, "important": 2.0, "supporting": 1.0, "optional": 0.5}
 
 
-def tokenize(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9\+\#\.]+", (text or "").lower()))
-
-
-class SimilarityEngine:
-    def __init__(self, use_transformer: bool = False) -> None:
-        self.model = None
-        self._cache = {}
-        if use_transformer and SentenceTransformer is not None:
-            try:
-                self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-            except Exception:
-                self.model = None
-
-    def _embed(self, text: str):
-        if text in self._cache:
-            return self._cache[text]
-        emb = self.model.encode(text, convert_to_tensor=True)
-        self._cache[text] = emb
-        return emb
-
-    def similarity(self, a: str, b: str) -> float:
-        if not a or not b:
-            return 0.0
-        if self.model is not None:
-            ea = self._embed(a)
-            eb = self._embed(b)
-            return float(util.cos_sim(ea, eb).item())
-        ta, tb = tokenize(a), tokenize(b)
-        if not ta or not tb:
-            return 0.0
-        return len(ta & tb) / math.sqrt(len(ta) * len(tb))
+def get_similarity_engine(use_transformer: bool = False):
+    """Shared backend engine (bounded LRU embedding cache, services.tokenizer lexical fallback)."""
+    backend_dir = Path(__file__).resolve().parents[1] / "backend"
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+    from services.similarity_engine import SimilarityEngine
+
+    return SimilarityEngine(use_transformer=use_transformer)
 
 
 def normalize_user_skills(skills_str: str, lexicon: dict[str, list[str]]) -> set[str]:
@@ -122,7 +91,7 @@ def main() -> None:
     jobs = pd.read_csv(jobs_path if jobs_path.exists() else "datasets/jobs.csv")
     skill_labels = pd.read_csv("datasets/skill_importance_labeled.csv")
     lexicon = json.loads(Path("datasets/skills.json").read_text(encoding="utf-8"))
-    sim = SimilarityEngine(use_transformer=args.use_transformer_similarity)
+    sim = get_similarity_engine(use_transformer=args.use_transformer_similarity)
 
     comp_col = "competency" if "competency" in skill_labels.columns else "skill"
     grouped = {}
@@ -3,19 +3,12 @@ Build Model-1 dataset: one row per (job, competency) with engineered features.
 """
 from __future__ import annotations
 
-import math
 import re
 import sys
 from pathlib import Path
 
 import pandas as pd
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-except Exception:  # pragma: no cover
-    SentenceTransformer = None
-    util = None
-
 
 CONTEXT_PATTERNS = {
     "required": 1.0,
@@ -94,43 +87,12 @@ def section_score(jd_text: str, competency: str) -> float:
     return float(score)
 
 
-class SimilarityEngine:
-    def __init__(self) -> None:
-        self.model = None
-        self._cache = {}
-        if SentenceTransformer is not None:
-            try:
-                self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-            except Exception:
-                self.model = None
-
-    def _embed(self, text: str):
-        if text in self._cache:
-            return self._cache[text]
-        emb = self.model.encode(text, convert_to_tensor=True)
-        self._cache[text] = emb
-        return emb
-
-    def similarity(self, a: str, b: str) -> float:
-        if not a or not b:
-            return 0.0
-        if self.model is not None:
-            emb_a = self._embed(a)
-            emb_b = self._embed(b)
-            return float(util.cos_sim(emb_a, emb_b).item())
-        # Deterministic lexical fallback.
-        a_set = set(re.findall(r"[a-z0-9]+", a.lower()))
-        b_set = set(re.findall(r"[a-z0-9]+", b.lower()))
-        if not a_set or not b_set:
-            return 0.0
-        return len(a_set & b_set) / math.sqrt(len(a_set) * len(b_set))
-
-    def similarity_with_left_embedding(self, left_emb, text_right: str) -> float:
-        """Cosine similarity when left side was pre-embedded (faster per-job loops)."""
-        if not text_right:
-            return 0.0
-        emb_r = self._embed(text_right)
-        return float(util.cos_sim(left_emb, emb_r).item())
+def _get_similarity_engine():
+    _get_competency_tools()  # puts backend/ on sys.path
+    from services.similarity_engine import SimilarityEngine
+
+    # Lexical fallback (no sentence-transformers) is services.tokenizer, same as serving.
+    return SimilarityEngine()
 
 
 def frequency_score(jd_text: str, competency: str) -> float:
@@ -141,7 +103,7 @@ def frequency_score(jd_text: str, competency: str) -> float:
 def main() -> None:
     jobs = load_jobs()
     competency_extractor, _ = _get_competency_tools()
-    sim = SimilarityEngine()
+    sim = _get_similarity_engine()
 
     rows = []
     for _, job in jobs.iterrows():
@@ -151,24 +113,16 @@ def main() -> None:
         jd_text = str(job.get("jd_text", "")).strip()
         if not jd_text:
             continue
-        competencies = competency_extractor.extract_with_types(jd_text)
+        competencies = [
+            row for row in competency_extractor.extract_with_types(jd_text)
+            if row["competency_type"] != "discard"
+        ]
         jd_prefix = jd_text[:2500]
-        if sim.model is not None:
-            title_emb = sim._embed(title)
-            jd_emb = sim._embed(jd_prefix)
-        else:
-            title_emb = jd_emb = None
-        for row in competencies:
+        # Title and JD-prefix similarity for every competency from one embedding batch.
+        sims = sim.similarity_columns([title, jd_prefix], [row["competency"] for row in competencies])
+        for row, (t_sim, s_sim) in zip(competencies, sims):
             competency = row["competency"]
             ctype = row["competency_type"]
-            if ctype == "discard":
-                continue
-            if title_emb is not None:
-                t_sim = sim.similarity_with_left_embedding(title_emb, competency)
-                s_sim = sim.similarity_with_left_embedding(jd_emb, competency)
-            else:
-                t_sim = sim.similarity(title, competency)
-                s_sim = sim.similarity(jd_prefix, competency)
             rows.append(
                 {
                     "job_id": job_id,
@@ -183,8 +137,8 @@ def main() -> None:
                     "skill": competency,
                     "context_score": round(context_score(jd_text, competency), 4),
                     "section_score": round(section_score(jd_text, competency), 4),
-                    "title_similarity": round(t_sim, 4),
-                    "semantic_similarity": round(s_sim, 4),
+                    "title_similarity": round(float(t_sim), 4),
+                    "semantic_similarity": round(float(s_sim), 4),
                     "frequency_score": round(frequency_score(jd_text, competency), 4),
                 }
             )
@@ -35,7 +35,16 @@ const ResumeUpload = () => {
 
     try {
       const response = await userAPI.uploadResume(file);
-      setUploadResult(response.data);
+      // Parsing and skill extraction run in the background; poll until they finish.
+      let status = response.data;
+      while (status.status !== 'done' && status.status !== 'failed') {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        status = (await userAPI.getResumeUploadStatus(response.data.upload_id)).data;
+      }
+      if (status.status === 'failed') {
+        throw new Error(status.error || 'Failed to process resume');
+      }
+      setUploadResult(status.result);
       setFile(null);
       document.getElementById('file-input').value = '';
     } catch (error) {
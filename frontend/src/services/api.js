@@ -50,6 +50,7 @@ export const userAPI = {
     formData.append('file', file);
     return api.post('/api/user/upload-resume', formData);
   },
+  getResumeUploadStatus: (uploadId) => api.get(`/api/user/upload-resume/${uploadId}`),
 };
 
 export const jobAPI = {